@@ -0,0 +1,151 @@
+# app/core/cache.py
+"""
+Cache em memória (por processo) com LRU + TTL.
+
+- tamanho máximo: ao passar do limite, remove o item usado há mais tempo
+- TTL: item expirado conta como miss e é descartado
+- thread-safe (handlers sync rodam no threadpool do AnyIO)
+- contadores de hit/miss/eviction para dimensionar o cache
+- "geração": um set() iniciado antes de uma invalidação é descartado,
+  evitando gravar no cache um valor calculado com dados antigos
+- com `name`, hits/misses/evictions e tamanho também vão para o /metrics
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from app.core.metrics import counter, gauge, register_sampler
+
+_MISSING = object()
+
+CACHE_LOOKUPS = counter("cache_lookups", "Leituras de cache em memória", ("cache", "result"))
+CACHE_EVICTIONS = counter("cache_evictions", "Itens removidos por falta de espaço", ("cache",))
+CACHE_ENTRIES = gauge("cache_entries", "Itens no cache", ("cache",))
+
+_named: dict[str, "TTLCache"] = {}
+
+
+@register_sampler
+def _sample_caches() -> None:
+    for name, cache in list(_named.items()):
+        CACHE_ENTRIES.labels(name).set(len(cache._data))
+
+
+class TTLCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 60.0, name: str | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        self.generation = 0
+
+        self._hit = self._miss = self._evicted = None
+        if name:
+            self._hit = CACHE_LOOKUPS.labels(name, "hit")
+            self._miss = CACHE_LOOKUPS.labels(name, "miss")
+            self._evicted = CACHE_EVICTIONS.labels(name)
+            _named[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                if self._miss:
+                    self._miss.inc()
+                return default
+
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                if self._miss:
+                    self._miss.inc()
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            if self._hit:
+                self._hit.inc()
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """
+        `generation`: valor de self.generation lido ANTES de calcular o item.
+        Se houve invalidação no meio do caminho, o item não é gravado.
+        """
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+                if self._evicted:
+                    self._evicted.inc()
+
+    def purge_expired(self) -> int:
+        """
+        Remove já os itens vencidos (senão saem só quando alguém os lê).
+        """
+        now = time.monotonic()
+        with self._lock:
+            keys = [k for k, (expires_at, _) in self._data.items() if expires_at <= now]
+            for k in keys:
+                del self._data[k]
+            self.expirations += len(keys)
+            return len(keys)
+
+    def values(self) -> list:
+        with self._lock:
+            return [v for _, v in self._data.values()]
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Remove os itens em que predicate(key, value) for True.
+        Retorna quantos foram removidos.
+        """
+        with self._lock:
+            self.generation += 1
+            keys = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+            for k in keys:
+                del self._data[k]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
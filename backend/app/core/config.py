@@ -8,6 +8,89 @@ ENV = os.getenv("ENV", "dev")
 
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 
+# Pool de conexões (um engine por processo; total por worker = size + overflow)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "300"))
+DB_SSLMODE = os.getenv("DB_SSLMODE", "require")  # vazio = não força (ex: banco local)
+
 JWT_SECRET = os.getenv("JWT_SECRET", "change-me")
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
 JWT_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES_MINUTES", "120"))
+
+# Cache da listagem pública de locais (por processo)
+PLACES_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_CACHE_MAX_ENTRIES", "256"))
+PLACES_CACHE_TTL_SECONDS = float(os.getenv("PLACES_CACHE_TTL_SECONDS", "60"))
+
+# Índice de recursos de acessibilidade (por processo): reconstrução periódica
+FEATURE_INDEX_MAX_AGE_SECONDS = float(os.getenv("FEATURE_INDEX_MAX_AGE_SECONDS", "300"))
+
+# Índice de busca textual (por processo): reconstrução periódica
+SEARCH_INDEX_MAX_AGE_SECONDS = float(os.getenv("SEARCH_INDEX_MAX_AGE_SECONDS", "300"))
+
+# Ollama (assistente do /chat)
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "phi3:mini")
+OLLAMA_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_CONNECT_TIMEOUT_SECONDS", "5"))
+OLLAMA_DEADLINE_SECONDS = float(os.getenv("OLLAMA_DEADLINE_SECONDS", "120"))
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "10"))
+
+# Cache das respostas do Ollama (ANSWER_CACHE_PATH vazio = só memória)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "")
+
+# Sessões do /chat: "memory" (por processo) ou "sqlite" (compartilhado entre workers)
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory")
+CHAT_SESSION_PATH = os.getenv("CHAT_SESSION_PATH", "chat_sessions.sqlite")
+CHAT_SESSION_TTL_SECONDS = float(os.getenv("CHAT_SESSION_TTL_SECONDS", "1800"))
+CHAT_SESSION_MAX_ENTRIES = int(os.getenv("CHAT_SESSION_MAX_ENTRIES", "10000"))
+
+# Upload de avatar: pool de processos para sanitização + NudeNet
+AVATAR_WORKERS = int(os.getenv("AVATAR_WORKERS", "2"))
+AVATAR_MAX_QUEUE = int(os.getenv("AVATAR_MAX_QUEUE", "8"))  # além dos que estão rodando
+# 1 = sobe o pool/modelo em segundo plano no startup; 0 = só no primeiro upload
+AVATAR_WARMUP = os.getenv("AVATAR_WARMUP", "1") == "1"
+
+# Fotos dos locais: limite do upload e pool que gera as versões redimensionadas
+PHOTO_MAX_BYTES = int(os.getenv("PHOTO_MAX_BYTES", str(5 * 1024 * 1024)))
+PHOTO_WORKERS = int(os.getenv("PHOTO_WORKERS", "2"))
+PHOTO_MAX_QUEUE = int(os.getenv("PHOTO_MAX_QUEUE", "200"))  # além dos que estão rodando
+# upload em lote: máximo de arquivos por request e gravações em paralelo
+PHOTO_BATCH_MAX_FILES = int(os.getenv("PHOTO_BATCH_MAX_FILES", "20"))
+PHOTO_BATCH_WORKERS = int(os.getenv("PHOTO_BATCH_WORKERS", "4"))
+
+# Cache de quem está logado (token -> usuário/perfil), por processo: TTL curto
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "2048"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "5"))
+
+# Hash de senha (pbkdf2_sha256): custo e pool próprio para login/cadastro.
+# Mudar os rounds refaz o hash de cada usuário no próximo login.
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+# Leituras públicas quentes (listagem, detalhes, ids de favoritos) num engine
+# async (asyncpg) em vez do threadpool; usa os mesmos limites de pool acima
+DB_ASYNC_READS = os.getenv("DB_ASYNC_READS", "0") == "1"
+
+# Réplicas de leitura (opcional, separadas por vírgula). Leituras de quem
+# acabou de escrever vão para o primário por DB_REPLICA_PIN_SECONDS.
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+DB_REPLICA_PIN_SECONDS = float(os.getenv("DB_REPLICA_PIN_SECONDS", "5"))
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))  # réplica com falha fica fora
+
+# Server-Timing por request (db/serialize/llm/image), contagem de SQL e
+# alerta de N+1. Desligado: sem middleware nem eventos nos engines.
+REQUEST_TIMING = os.getenv("REQUEST_TIMING", "0") == "1"
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))  # mesmo SQL N vezes na request
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "0"))  # 0 = não loga query lenta
+SQL_EXPLAIN_SLOW = os.getenv("SQL_EXPLAIN_SLOW", "0") == "1"  # loga o EXPLAIN junto
+
+# GET /metrics (Prometheus), desligado por padrão. Fora de ENV=dev exige
+# METRICS_TOKEN (a API não sobe sem ele). Com vários workers, defina também
+# PROMETHEUS_MULTIPROC_DIR (diretório vazio, limpo a cada deploy).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # se definido: Authorization: Bearer <token>
+METRICS_SAMPLE_SECONDS = float(os.getenv("METRICS_SAMPLE_SECONDS", "1"))  # gauges de estado (pool, caches)
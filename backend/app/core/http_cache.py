@@ -0,0 +1,133 @@
+# app/core/http_cache.py
+"""
+GET condicional (ETag / Last-Modified / 304).
+
+O endpoint calcula validadores baratos (timestamps do banco) e, se o
+cliente já tem a versão atual (If-None-Match / If-Modified-Since),
+responde 304 sem montar nem serializar o corpo.
+"""
+import hashlib
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "public, no-cache"  # pode guardar, mas revalida sempre
+
+
+def _as_utc(dt: datetime | None) -> datetime | None:
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def latest(*values: datetime | None) -> datetime | None:
+    vals = [_as_utc(v) for v in values if v is not None]
+    return max(vals) if vals else None
+
+
+def make_etag(*parts) -> str:
+    """
+    ETag forte: hash dos componentes (timestamps, contagens, filtros).
+    """
+    raw = "|".join("" if p is None else str(_as_utc(p) if isinstance(p, datetime) else p) for p in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [c.strip() for c in header.split(",")]
+    # If-None-Match usa comparação fraca: ignora o prefixo W/
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        # If-None-Match tem precedência sobre If-Modified-Since
+        return _etag_matches(inm, etag)
+
+    ims = request.headers.get("if-modified-since")
+    if ims and last_modified is not None:
+        try:
+            since = _as_utc(parsedate_to_datetime(ims))
+        except (TypeError, ValueError):
+            return False
+        # header HTTP tem precisão de segundos
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+
+    return False
+
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: datetime | None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+class ConditionalStats:
+    """
+    Contadores do caminho 304 por endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: dict[str, dict] = {}
+
+    def record(self, endpoint: str, conditional: bool, not_modified: bool) -> None:
+        with self._lock:
+            s = self._data.setdefault(
+                endpoint, {"requests": 0, "conditional": 0, "not_modified": 0}
+            )
+            s["requests"] += 1
+            if conditional:
+                s["conditional"] += 1
+            if not_modified:
+                s["not_modified"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for endpoint, s in self._data.items():
+                out[endpoint] = {
+                    **s,
+                    "hit_rate": (s["not_modified"] / s["conditional"]) if s["conditional"] else 0.0,
+                }
+            return out
+
+
+conditional_stats = ConditionalStats()
+
+
+def check_conditional(
+    request: Request,
+    response: Response,
+    endpoint: str,
+    etag: str,
+    last_modified: datetime | None,
+) -> Response | None:
+    """
+    Atalho para os endpoints:
+    - devolve a resposta 304 se o cliente já tem a versão atual
+    - senão coloca ETag/Last-Modified na resposta normal e devolve None
+    """
+    conditional = bool(
+        request.headers.get("if-none-match") or request.headers.get("if-modified-since")
+    )
+    hit = conditional and is_not_modified(request, etag, last_modified)
+    conditional_stats.record(endpoint, conditional, hit)
+
+    if hit:
+        return not_modified_response(etag, last_modified)
+
+    response.headers.update(validator_headers(etag, last_modified))
+    return None
@@ -0,0 +1,154 @@
+# app/core/metrics.py
+"""
+Métricas Prometheus (GET /metrics, formato texto).
+
+- HTTP (middleware): latência por rota (template, ex: /public/places/{place_id},
+  nunca o id), requests em andamento, total por status e exceções não tratadas
+- subsistemas criam as suas com counter()/histogram()/gauge() no import do
+  módulo e atualizam onde já juntam estatística (pool do banco, Ollama,
+  moderação do avatar, uploads, caches com nome)
+- register_sampler(fn): estado do momento (conexões em uso, itens no cache)
+  copiado para gauges no fim das requests (no máximo 1x a cada
+  METRICS_SAMPLE_SECONDS por processo) e a cada scrape
+
+Vários workers (uvicorn --workers / gunicorn): defina PROMETHEUS_MULTIPROC_DIR
+apontando para um diretório vazio (limpe a cada deploy). Cada processo grava
+os seus valores lá e qualquer worker que responder o /metrics soma todos (modo
+multiprocess do prometheus_client). Sem ele, cada worker mostra só os seus.
+"""
+import os
+import threading
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import METRICS_SAMPLE_SECONDS
+
+NAMESPACE = "venhajunto"
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# de 5ms a 30s: cobre leitura em cache até chat sem stream
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def counter(name: str, doc: str, labels: tuple[str, ...] = ()) -> Counter:
+    return Counter(name, doc, labels, namespace=NAMESPACE)
+
+
+def histogram(name: str, doc: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+    return Histogram(name, doc, labels, namespace=NAMESPACE, buckets=buckets)
+
+
+def gauge(name: str, doc: str, labels: tuple[str, ...] = (), mode: str = "livesum") -> Gauge:
+    """
+    mode: como somar entre workers (multiprocess). "livesum" = soma dos
+    processos vivos; "liveall" = uma série por pid.
+    """
+    return Gauge(name, doc, labels, namespace=NAMESPACE, multiprocess_mode=mode)
+
+
+# =====================================================
+# Samplers (estado do momento -> gauges)
+# =====================================================
+_samplers: list[Callable[[], None]] = []
+_sample_lock = threading.Lock()
+_last_sample = 0.0
+
+
+def register_sampler(fn: Callable[[], None]) -> Callable[[], None]:
+    _samplers.append(fn)
+    return fn
+
+
+def sample(force: bool = False) -> None:
+    global _last_sample
+    if not force and time.monotonic() - _last_sample < METRICS_SAMPLE_SECONDS:
+        return
+    # outra thread já está amostrando: não espera
+    if not _sample_lock.acquire(blocking=force):
+        return
+    try:
+        _last_sample = time.monotonic()
+        for fn in _samplers:
+            try:
+                fn()
+            except Exception:
+                pass  # métrica nunca derruba request
+    finally:
+        _sample_lock.release()
+
+
+def render() -> bytes:
+    sample(force=True)
+    if not MULTIPROCESS:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def shutdown() -> None:
+    # gauges "live*" deste worker saem da soma
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+# =====================================================
+# Middleware HTTP
+# =====================================================
+HTTP_REQUESTS = counter("http_requests", "Requests HTTP por rota e status", ("method", "route", "status"))
+HTTP_LATENCY = histogram("http_request_duration_seconds", "Latência HTTP por rota", ("method", "route"))
+HTTP_IN_PROGRESS = gauge("http_requests_in_progress", "Requests HTTP em andamento", ("method",))
+HTTP_EXCEPTIONS = counter("http_exceptions", "Exceções não tratadas por rota", ("method", "route", "exception"))
+
+
+def _route(scope: Scope) -> str:
+    # rota casada pelo router; path sem rota (404) não vira série nova
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class PrometheusMetrics:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            HTTP_EXCEPTIONS.labels(method, _route(scope), type(e).__name__).inc()
+            raise
+        finally:
+            # stream (chat): conta até o fim do corpo
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = _route(scope)
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            sample()
@@ -0,0 +1,110 @@
+# app/core/pagination.py
+"""
+Paginação por cursor (keyset), sem OFFSET.
+
+O cursor é opaco para o cliente: base64 de um JSON com os valores das
+colunas de ordenação do último item da página. A próxima página filtra
+"tudo que vem depois" desse item, então qualquer página custa o mesmo
+que a primeira (usa o índice da ordenação).
+
+A resposta continua sendo a lista; o cursor da próxima página vai no
+header X-Next-Cursor (ausente = não há mais páginas).
+"""
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, literal
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def clamp_limit(limit: int | None) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def _to_json(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _from_json(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("tamanho")
+        return [_from_json(v) for v in values]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _equals(col, value):
+    return col.is_(None) if value is None else col == literal(value, col.type)
+
+
+def _after(col, value):
+    # DESC NULLS FIRST: depois de NULL vem qualquer valor; depois de um
+    # valor só os menores (NULL já ficou para trás)
+    # literal(): permite comparar com booleanos (verified) usando "<"
+    return col.is_not(None) if value is None else col < literal(value, col.type)
+
+
+def keyset_after(columns: list, values: list):
+    """
+    Filtro "depois do cursor" para ordenação DESC NULLS FIRST em todas as
+    colunas:
+      (a < x) OR (a = x AND b < y) OR (a = x AND b = y AND c < z)
+    com "= NULL" / "< NULL" trocados por IS NULL / IS NOT NULL (ex: local
+    antigo sem created_at não some nem repete entre páginas).
+    """
+    clauses = []
+    for i, col in enumerate(columns):
+        prefix = [_equals(columns[j], values[j]) for j in range(i)]
+        clauses.append(and_(*prefix, _after(col, values[i])))
+    return or_(*clauses)
+
+
+def paginate_desc(q, columns: list, cursor: str | None, limit: int | None, response: Response):
+    """
+    Aplica ordenação DESC + cursor + limite à query e devolve os itens.
+    Preenche o header X-Next-Cursor quando existe próxima página.
+
+    `columns` são as colunas de ordenação; a última deve ser única (id).
+    """
+    limit = clamp_limit(limit)
+
+    if cursor:
+        q = q.filter(keyset_after(columns, decode_cursor(cursor, len(columns))))
+
+    # NULLS FIRST = padrão do Postgres no DESC: mesma ordem do índice
+    q = q.order_by(*[c.desc().nulls_first() for c in columns])
+
+    rows = q.limit(limit + 1).all()
+    items = rows[:limit]
+
+    if len(rows) > limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, c.key) for c in columns]
+        )
+
+    return items
@@ -1,11 +1,31 @@
 # app/core/security.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
-from app.core.config import JWT_SECRET, JWT_ALG
+from app.core.config import (
+    JWT_SECRET,
+    JWT_ALG,
+    PASSWORD_HASH_MAX_QUEUE,
+    PASSWORD_HASH_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+)
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# rounds fixos (min = max = padrão): hash gravado com outro valor
+# "precisa atualizar" e é refeito no próximo login
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=PASSWORD_HASH_ROUNDS,
+)
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 dia
 
@@ -18,6 +38,101 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+def verify_and_update_password(password: str, hashed: str) -> tuple[bool, str | None]:
+    """
+    (senha confere?, novo hash se os parâmetros mudaram, senão None)
+    """
+    return pwd_context.verify_and_update(password, hashed)
+
+
+# =====================================================
+# Pool do hash de senha (fora do threadpool do AnyIO)
+# =====================================================
+class PasswordHashPool:
+    """
+    pbkdf2 é CPU pura (hashlib libera o GIL): roda em threads próprias
+    (PASSWORD_HASH_WORKERS) para uma rajada de logins não ocupar as
+    threads que atendem as rotas sync (ex: /public/places).
+    Fila limitada: acima de workers + PASSWORD_HASH_MAX_QUEUE -> 503.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_in_flight = self.workers + max(0, max_queue)
+        self._executor: ThreadPoolExecutor | None = None  # criado no primeiro uso
+        self._lock = threading.Lock()
+
+        self._in_flight = 0
+        self.calls = 0
+        self.busy_rejections = 0
+        self.rehashes = 0
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # como o moderation_pool: depois de um shutdown (ex: app reiniciado
+        # no mesmo processo, testes) volta a funcionar no próximo uso
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self.busy_rejections += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Muitas requisições de login. Tente novamente em instantes.",
+                    headers={"Retry-After": "2"},
+                )
+            self._in_flight += 1
+
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+                self.calls += 1
+                self.seconds_total += seconds
+                self.seconds_max = max(self.seconds_max, seconds)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        ok, new_hash = await self._run(verify_and_update_password, password, hashed)
+        if ok and new_hash:
+            with self._lock:
+                self.rehashes += 1
+        return ok, new_hash
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "rounds": PASSWORD_HASH_ROUNDS,
+                "calls": self.calls,
+                "busy_rejections": self.busy_rejections,
+                "rehashes": self.rehashes,
+                "avg_seconds": (self.seconds_total / self.calls) if self.calls else None,
+                "max_seconds": self.seconds_max,
+            }
+
+
+password_pool = PasswordHashPool()
+
+
 def create_access_token(data) -> str:
     """
     Aceita:
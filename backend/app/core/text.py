@@ -0,0 +1,28 @@
+# app/core/text.py
+import re
+import unicodedata
+
+# palavras muito comuns que não ajudam na busca
+STOPWORDS = {
+    "a", "o", "as", "os", "e", "de", "da", "do", "das", "dos",
+    "em", "no", "na", "nos", "nas", "um", "uma", "para", "com", "por",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def norm(s: str) -> str:
+    """
+    minúsculas, sem acento, espaços colapsados ("São  Paulo" -> "sao paulo")
+    """
+    s = (s or "").strip().lower()
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("utf-8")
+    s = re.sub(r"\s+", " ", s)
+    return s
+
+
+def tokenize(s: str | None) -> list[str]:
+    """
+    Tokens para busca, usando a mesma normalização de norm().
+    """
+    return [t for t in _TOKEN_RE.findall(norm(s or "")) if t not in STOPWORDS]
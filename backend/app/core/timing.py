@@ -0,0 +1,127 @@
+# app/core/timing.py
+"""
+Tempo de cada request por fase, no header Server-Timing (REQUEST_TIMING=1):
+
+    Server-Timing: db;dur=12.4;desc="7 queries", serialize;dur=3.1, total;dur=40.2
+
+- db: vem dos eventos do SQLAlchemy (app/db/query_stats.py), que também
+  aponta N+1 e loga queries lentas
+- serialize / llm / image: quem faz o trabalho usa `with timed("serialize"):`
+  ou record("llm", segundos)
+- fase que termina depois do início da resposta (ex: chat em stream) não
+  entra no header
+
+Desligado (padrão): o middleware nem é registrado e timed()/record() só
+leem um ContextVar vazio.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# ordem fixa no header (fases extras vão no fim)
+PHASES = ("db", "serialize", "llm", "image")
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, list] = {}  # fase -> [segundos, vezes]
+        self.statements: dict[str, int] = {}  # formato do SQL -> vezes
+        # rotas sync: o handler roda numa thread do AnyIO, fora do event loop
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.phases.setdefault(phase, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def add_statement(self, shape: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.phases.setdefault("db", [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+            self.statements[shape] = self.statements.get(shape, 0) + 1
+
+    @property
+    def queries(self) -> int:
+        return self.phases.get("db", [0.0, 0])[1]
+
+    def header(self) -> str:
+        with self._lock:
+            names = [p for p in PHASES if p in self.phases] + [p for p in self.phases if p not in PHASES]
+            parts = []
+            for name in names:
+                seconds, count = self.phases[name]
+                desc = f'"{count} queries"' if name == "db" else f'"{count}x"'
+                parts.append(f"{name};dur={seconds * 1000:.1f};desc={desc}")
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+def current() -> RequestTiming | None:
+    return _current.get()
+
+
+def record(phase: str, seconds: float) -> None:
+    rt = _current.get()
+    if rt is not None:
+        rt.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str):
+    rt = _current.get()
+    if rt is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        rt.add(phase, time.perf_counter() - started)
+
+
+# =====================================================
+# Middleware: Server-Timing
+# =====================================================
+class ServerTiming:
+    """
+    on_finish(rota, RequestTiming) roda no fim de cada request (ex: a
+    checagem de N+1 do query_stats). rota = "GET /public/places/{place_id}".
+    """
+
+    def __init__(self, app: ASGIApp, on_finish: list[Callable[[str, RequestTiming], None]] | None = None):
+        self.app = app
+        self.on_finish = on_finish or []
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rt = RequestTiming()
+        token = _current.set(rt)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", rt.header().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if self.on_finish:
+                # o router grava a rota casada no scope: agrupa por template, não por id
+                route = getattr(scope.get("route"), "path", scope["path"])
+                label = f"{scope['method']} {route}"
+                for fn in self.on_finish:
+                    fn(label, rt)
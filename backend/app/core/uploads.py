@@ -0,0 +1,248 @@
+# app/core/uploads.py
+"""
+Uploads grandes sem carregar o arquivo inteiro na memória.
+
+- UploadSizeLimit (middleware ASGI): para rotas de upload, recusa com 413
+  pelo Content-Length e, se o corpo vier sem ele (chunked), conta os bytes
+  enquanto chegam e aborta assim que passa do limite, antes do FastAPI
+  terminar de montar o formulário
+- save_upload(): copia o arquivo do formulário para o disco em blocos,
+  conferindo o limite do arquivo em si, e calcula o nome pelo hash do
+  conteúdo (<sha256>.<ext>): o mesmo arquivo enviado duas vezes vira um só.
+  O arquivo só vai para o lugar (StagedUpload.place) depois do acquire()
+  em stored_files, dentro da transação
+- save_uploads(): vários arquivos em paralelo (upload em lote)
+
+Tamanho dos arquivos aceitos e recusas (413) também vão para o /metrics.
+"""
+import hashlib
+import json
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import PHOTO_BATCH_WORKERS
+from app.core.metrics import counter, histogram
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+MULTIPART_SLACK = 64 * 1024  # cabeçalhos do multipart + campos pequenos
+
+UPLOAD_BYTES = histogram(
+    "upload_bytes",
+    "Tamanho dos uploads aceitos",
+    ("kind",),
+    buckets=(16e3, 64e3, 256e3, 512e3, 1e6, 2e6, 5e6, 10e6),
+)
+UPLOAD_REJECTED = counter("upload_rejected", "Uploads recusados por tamanho (413)", ("kind",))
+
+
+def too_large(max_bytes: int) -> HTTPException:
+    mb = max_bytes / (1024 * 1024)
+    return HTTPException(status_code=413, detail=f"Imagem maior que {mb:.0f}MB")
+
+
+class UploadSizeLimit:
+    """
+    rules: [(método, regex do path, limite do corpo em bytes)]
+    """
+
+    def __init__(self, app: ASGIApp, rules: list[tuple[str, str, int]]):
+        self.app = app
+        self.rules = [(m.upper(), re.compile(p), n) for m, p, n in rules]
+
+    def _limit_for(self, scope: Scope) -> int | None:
+        for method, pattern, max_bytes in self.rules:
+            if scope["method"] == method and pattern.match(scope["path"]):
+                return max_bytes
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self._limit_for(scope)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                await _send_413(send, limit)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # HTTPException atravessa o parse do form e vira a resposta 413
+                    raise too_large(limit - MULTIPART_SLACK)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _send_413(send: Send, limit: int) -> None:
+    body = json.dumps({"detail": too_large(limit - MULTIPART_SLACK).detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+@dataclass
+class StagedUpload:
+    """
+    Arquivo já copiado (.part) com o nome final calculado, ainda fora do
+    lugar. Ordem na rota:
+
+        acquire()   -> trava a linha do arquivo em stored_files
+        place()     -> coloca no lugar (ou descarta, se já existe)
+        commit
+
+    Erro antes do commit: discard() ANTES do rollback (com a linha ainda
+    travada), para não sobrar arquivo sem referência no disco.
+    """
+
+    filename: str
+    size: int
+    tmp: Path
+    dest: Path
+    created: bool = False
+
+    def place(self) -> None:
+        # com a linha travada: um delete do mesmo arquivo já tirou o antigo
+        # do lugar (e commitou) ou ainda vai ver esta referência
+        if self.dest.exists():
+            self.tmp.unlink(missing_ok=True)
+        else:
+            self.tmp.replace(self.dest)
+            self.created = True
+
+    def discard(self) -> None:
+        self.tmp.unlink(missing_ok=True)
+        if self.created:
+            self.dest.unlink(missing_ok=True)
+            self.created = False
+
+
+class StagedRemoval:
+    """
+    Apaga arquivos guardados por hash (só quando ninguém mais usa), em duas
+    fases para não brigar com um upload do mesmo conteúdo:
+
+    - stage(): ANTES do commit, com a linha de stored_files travada pelo
+      release(): tira os arquivos do lugar (rename). Um upload do mesmo
+      arquivo espera o commit e grava o seu de novo
+    - finish(): depois do commit, apaga de vez
+    - undo(): erro antes do commit, devolve os arquivos ao lugar
+    """
+
+    def __init__(self, paths: list[Path]):
+        self.paths = paths
+        self._moved: list[tuple[Path, Path]] = []
+
+    def stage(self) -> None:
+        tag = uuid.uuid4().hex
+        for path in self.paths:
+            if path.exists():
+                trash = path.with_name(f"{path.name}.{tag}.deleting")
+                path.replace(trash)
+                self._moved.append((path, trash))
+
+    def finish(self) -> None:
+        for _, trash in self._moved:
+            try:
+                trash.unlink(missing_ok=True)
+            except Exception:
+                # não derruba a request se falhar para apagar
+                pass
+        self._moved = []
+
+    def undo(self) -> None:
+        for path, trash in self._moved:
+            trash.replace(path)
+        self._moved = []
+
+
+def save_upload(src: BinaryIO, dest_dir: Path, ext: str, max_bytes: int) -> StagedUpload:
+    """
+    Copia em blocos (para um arquivo .part) calculando o sha256. Passou do
+    limite -> apaga o parcial e levanta 413.
+    Retorna o StagedUpload com o nome "<sha256>.<ext>" e o tamanho.
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    tmp = dest_dir / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(tmp, "wb") as out:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    UPLOAD_REJECTED.labels("photo").inc()
+                    raise too_large(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    UPLOAD_BYTES.labels("photo").observe(written)
+    filename = f"{digest.hexdigest()}.{ext}"
+    return StagedUpload(filename=filename, size=written, tmp=tmp, dest=dest_dir / filename)
+
+
+# cópia + hash são I/O e hashlib (liberam o GIL): threads bastam
+_save_pool = ThreadPoolExecutor(max_workers=max(1, PHOTO_BATCH_WORKERS), thread_name_prefix="upload-save")
+
+
+def save_uploads(
+    items: list[tuple[BinaryIO, str]],
+    dest_dir: Path,
+    max_bytes: int,
+) -> list[StagedUpload | HTTPException]:
+    """
+    save_upload() de vários (arquivo, ext) em paralelo. Mantém a ordem;
+    arquivo que falha na validação (ex: 413) vira a HTTPException no
+    lugar do resultado, sem derrubar os outros. Qualquer outro erro
+    descarta o lote inteiro e sobe.
+    """
+    futures = [_save_pool.submit(save_upload, src, dest_dir, ext, max_bytes) for src, ext in items]
+    out: list[StagedUpload | HTTPException] = []
+    error: Exception | None = None
+    for future in futures:
+        try:
+            out.append(future.result())
+        except HTTPException as e:
+            out.append(e)
+        except Exception as e:
+            # erro inesperado (ex: disco cheio): espera os outros e não
+            # deixa nenhum arquivo do lote no disco
+            error = error or e
+            out.append(e)
+
+    if error is not None:
+        for item in out:
+            if isinstance(item, StagedUpload):
+                item.discard()
+        raise error
+    return out
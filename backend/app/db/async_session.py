@@ -0,0 +1,66 @@
+# app/db/async_session.py
+"""
+Engine async das leituras públicas quentes (DB_ASYNC_READS=1).
+
+Com handlers sync, cada leitura ocupa uma thread do AnyIO (40 por padrão)
+enquanto espera o banco: é isso que limita a concorrência por worker, não
+o Postgres. Com o engine async (asyncpg) a espera acontece no event loop.
+Quem usa: run_read() em reads.py. Escritas continuam no engine sync
+(session.py).
+"""
+from typing import Any
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import (
+    DATABASE_URL,
+    DB_ASYNC_READS,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_SSLMODE,
+)
+from app.db.pool import InstrumentedAsyncQueuePool
+
+# parâmetros de URL da libpq que o asyncpg não entende
+_LIBPQ_ONLY = ("sslmode", "channel_binding")
+
+
+def create_async_db_engine(url: str = DATABASE_URL, poolclass=InstrumentedAsyncQueuePool) -> AsyncEngine:
+    u = make_url(url)
+    connect_args: dict[str, Any] = {}
+
+    if u.drivername.startswith("postgres"):
+        sslmode = u.query.get("sslmode") or DB_SSLMODE
+        u = u.set(drivername="postgresql+asyncpg").difference_update_query(_LIBPQ_ONLY)
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = sslmode
+    elif u.drivername.startswith("sqlite"):
+        u = u.set(drivername="sqlite+aiosqlite")  # testes locais
+
+    return create_async_engine(
+        u,
+        poolclass=poolclass,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+
+
+# criado só se ligado (asyncpg não é importado à toa)
+async_engine: AsyncEngine | None = create_async_db_engine() if DB_ASYNC_READS else None
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
+
+async def dispose_async_engine() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
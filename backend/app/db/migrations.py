@@ -0,0 +1,182 @@
+# app/db/migrations.py
+"""
+Migrações versionadas do schema (rodam fora da API: python -m scripts.migrate).
+
+Antes o schema vinha só do create_all no startup: rodava a cada boot de
+worker e nunca criava índice novo em tabela que já existia. Agora:
+
+- tabela schema_migrations guarda as versões aplicadas
+- MIGRATIONS é a lista em ordem; cada uma roda uma única vez
+- banco vazio: create_all (models = versão mais nova) e marca tudo aplicado
+- no Postgres os índices saem com CREATE INDEX CONCURRENTLY (sem travar
+  escrita nas tabelas) e um advisory lock impede duas execuções ao mesmo tempo
+
+Nova migração = nova função + entrada no fim de MIGRATIONS (nunca editar
+uma já aplicada). Mantenha os models em sincronia (ex: Index(...) no model).
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.session import Base
+
+# todos os models precisam estar registrados no Base para o create_all
+import app.models.user  # noqa: F401
+from app.models import place, place_accessibility, place_photo, place_photo_variant, review, place_rating_summary  # noqa: F401
+from app.models import favorite, partner_profile, stored_file  # noqa: F401
+
+VERSION_TABLE = "schema_migrations"
+_PG_LOCK_ID = 7_301_023  # pg_advisory_lock: qualquer número fixo do projeto
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+# =====================================================
+# Migrações
+# =====================================================
+def _baseline(conn: Connection) -> None:
+    # bancos criados pelo create_all antigo: só completa tabelas que faltam
+    Base.metadata.create_all(bind=conn)
+
+
+# (nome, tabela, definição) — mesmos nomes dos Index(...) dos models
+HOT_PATH_INDEXES = [
+    ("ix_places_status_verified_created", "places", "(status, verified, created_at, id)"),
+    ("ix_places_lower_cidade", "places", "(lower(cidade))"),
+    ("ix_places_lower_tipo", "places", "(lower(tipo))"),
+    ("ix_place_accessibility_place_id", "place_accessibility", "(place_id)"),
+    ("ix_place_photos_place_cover_created", "place_photos", "(place_id, is_cover, created_at)"),
+    ("ix_reviews_place_created", "reviews", "(place_id, created_at)"),
+]
+
+
+def _hot_path_indexes(conn: Connection) -> None:
+    duplicates = conn.execute(
+        text(
+            "SELECT place_id, user_id, COUNT(*) FROM reviews "
+            "GROUP BY place_id, user_id HAVING COUNT(*) > 1"
+        )
+    ).all()
+    if duplicates:
+        sample = ", ".join(f"(place_id={p}, user_id={u}: {n})" for p, u, n in duplicates[:10])
+        raise RuntimeError(
+            f"{len(duplicates)} par(es) place_id/user_id repetidos em reviews; "
+            f"resolva antes de criar uq_reviews_place_user: {sample}"
+        )
+
+    for name, table, columns in HOT_PATH_INDEXES:
+        _create_index(conn, name, table, columns)
+    _create_index(conn, "uq_reviews_place_user", "reviews", "(place_id, user_id)", unique=True)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline (create_all)", _baseline),
+    Migration(2, "índices das consultas quentes", _hot_path_indexes),
+]
+
+
+# =====================================================
+# Execução
+# =====================================================
+def _create_index(conn: Connection, name: str, table: str, columns: str, unique: bool = False) -> None:
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    if conn.dialect.name != "postgresql":
+        conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} {columns}"))
+        return
+
+    # CONCURRENTLY que falhou no meio deixa o índice INVALID: IF NOT EXISTS o
+    # pularia, então descarta antes de tentar de novo
+    invalid = conn.execute(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    conn.execute(text(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {table} {columns}"))
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR(120) NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+    )
+
+
+def applied_versions(conn: Connection) -> set[int]:
+    if not inspect(conn).has_table(VERSION_TABLE):
+        return set()
+    return {v for (v,) in conn.execute(text(f"SELECT version FROM {VERSION_TABLE}"))}
+
+
+def pending(engine: Engine) -> list[Migration]:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    return [m for m in MIGRATIONS if m.version not in done]
+
+
+def require_current(engine: Engine) -> None:
+    """
+    API e scripts de manutenção não criam schema: com migração pendente,
+    RuntimeError dizendo o que rodar.
+    """
+    missing = pending(engine)
+    if missing:
+        names = ", ".join(f"{m.version:03d} {m.name}" for m in missing)
+        raise RuntimeError(
+            f"{len(missing)} migração(ões) pendente(s) ({names}): "
+            "rode `python -m scripts.migrate` antes"
+        )
+
+
+def _record(conn: Connection, m: Migration) -> None:
+    conn.execute(
+        text(f"INSERT INTO {VERSION_TABLE} (version, name) VALUES (:v, :n)"),
+        {"v": m.version, "n": m.name},
+    )
+
+
+def upgrade(engine: Engine, on_step: Callable[[Migration], None] | None = None) -> list[Migration]:
+    """
+    Aplica as migrações pendentes, em ordem. Devolve as que rodaram.
+    """
+    # autocommit: CREATE INDEX CONCURRENTLY não roda dentro de transação
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        is_pg = conn.dialect.name == "postgresql"
+        if is_pg:
+            conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _PG_LOCK_ID})
+        try:
+            fresh = not inspect(conn).has_table("places")
+            _ensure_version_table(conn)
+            done = applied_versions(conn)
+            todo = [m for m in MIGRATIONS if m.version not in done]
+
+            if fresh and todo:
+                # banco vazio: os models já estão na versão mais nova
+                Base.metadata.create_all(bind=conn)
+                for m in todo:
+                    _record(conn, m)
+                return todo
+
+            for m in todo:
+                if on_step:
+                    on_step(m)
+                m.upgrade(conn)
+                _record(conn, m)
+            return todo
+        finally:
+            if is_pg:
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _PG_LOCK_ID})
@@ -0,0 +1,119 @@
+# app/db/pool.py
+"""
+Pool de conexões instrumentado (engine sync em session.py e, se ligado,
+o async das leituras públicas em async_session.py).
+
+Por checkout: quanto tempo a request esperou por uma conexão (fila do
+pool + abrir conexão nova + pre-ping). Do pool: conexões em uso, livres,
+overflow e timeouts. Exposto em GET /admin/db/stats e no /metrics.
+"""
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import counter, gauge, histogram, register_sampler
+
+CHECKOUT_SECONDS = histogram(
+    "db_pool_checkout_seconds",
+    "Espera por uma conexão do pool",
+    ("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+CHECKOUT_TIMEOUTS = counter("db_pool_timeouts", "Checkouts que estouraram DB_POOL_TIMEOUT_SECONDS", ("pool",))
+POOL_CONNECTIONS = gauge("db_pool_connections", "Conexões do pool por estado", ("pool", "state"))
+POOL_SIZE = gauge("db_pool_size", "Tamanho fixo do pool (sem overflow)", ("pool",))
+
+
+class PoolStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: QueuePool | None = None  # último pool que fez checkout (sobrevive ao recreate)
+        self._checkout_seconds = CHECKOUT_SECONDS.labels(name)
+        self._timeouts = CHECKOUT_TIMEOUTS.labels(name)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+        self._checkout_seconds.observe(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+        self._timeouts.inc()
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self, pool: QueuePool | None = None) -> dict:
+        with self._lock:
+            out = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "wait_avg_seconds": (self.wait_total / self.checkouts) if self.checkouts else None,
+                "wait_max_seconds": self.wait_max,
+            }
+        if isinstance(pool, QueuePool):
+            out.update({
+                "pool_size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # overflow() fica negativo enquanto o pool ainda não abriu todas
+                "overflow": max(0, pool.overflow()),
+            })
+        return out
+
+
+# um engine de cada tipo por processo: as métricas ficam no módulo e
+# sobrevivem ao recreate() do pool
+pool_stats = PoolStats("sync")
+async_pool_stats = PoolStats("async")
+
+
+@register_sampler
+def _sample_pools() -> None:
+    for stats in (pool_stats, async_pool_stats):
+        if isinstance(stats.pool, QueuePool):
+            pool = stats.pool
+            POOL_CONNECTIONS.labels(stats.name, "in_use").set(pool.checkedout())
+            POOL_CONNECTIONS.labels(stats.name, "idle").set(pool.checkedin())
+            POOL_CONNECTIONS.labels(stats.name, "overflow").set(max(0, pool.overflow()))
+            POOL_SIZE.labels(stats.name).set(pool.size())
+
+
+class _Instrumented:
+    stats: PoolStats
+
+    def connect(self):
+        self.stats.pool = self
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - started)
+        return conn
+
+    def _create_connection(self):
+        self.stats.record_connect()
+        return super()._create_connection()
+
+
+class InstrumentedQueuePool(_Instrumented, QueuePool):
+    stats = pool_stats
+
+
+class InstrumentedAsyncQueuePool(_Instrumented, AsyncAdaptedQueuePool):
+    stats = async_pool_stats
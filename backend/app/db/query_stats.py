@@ -0,0 +1,156 @@
+# app/db/query_stats.py
+"""
+SQL por request (REQUEST_TIMING=1), pelos eventos do SQLAlchemy.
+
+- before/after_cursor_execute na classe Engine (primário, async e
+  réplicas): tempo e "formato" de cada statement vão para a request atual
+  (core/timing.py -> Server-Timing: db)
+- N+1: no fim da request, o mesmo formato de SQL repetido
+  SQL_N_PLUS_ONE_THRESHOLD vezes ou mais é logado e fica em
+  GET /admin/db/queries (com a rota)
+- SQL_SLOW_QUERY_MS > 0: query lenta é logada; com SQL_EXPLAIN_SLOW=1 vai
+  junto o plano (EXPLAIN roda de novo a query: só para diagnóstico)
+
+Formato = SQL já parametrizado, com espaços e listas do IN (?, ?, ?)
+normalizados: "WHERE user_id = ?" com ids diferentes conta como o mesmo.
+"""
+import logging
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import SQL_EXPLAIN_SLOW, SQL_N_PLUS_ONE_THRESHOLD, SQL_SLOW_QUERY_MS
+from app.core.timing import RequestTiming, current
+
+logger = logging.getLogger("app.sql")
+
+_SPACES = re.compile(r"\s+")
+# IN (?, ?, ?) / IN (%(p_1)s, ...) / IN ($1, $2) -> IN (...)
+_IN_LIST = re.compile(r"\bIN \((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,?)+\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("IN (...)", _SPACES.sub(" ", statement).strip())
+
+
+class QueryStats:
+    def __init__(self, threshold: int = SQL_N_PLUS_ONE_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.max_statements = 0
+        self.max_statements_route: str | None = None
+        self.n_plus_one: dict[tuple[str, str], dict] = {}  # (rota, formato) -> ocorrências
+        self.slow: deque = deque(maxlen=50)
+
+    def finish_request(self, route: str, rt: RequestTiming) -> None:
+        queries = rt.queries
+        db_seconds = rt.phases.get("db", [0.0, 0])[0]
+        repeated = [(shape, n) for shape, n in rt.statements.items() if n >= self.threshold]
+
+        with self._lock:
+            self.requests += 1
+            self.statements += queries
+            self.db_seconds += db_seconds
+            if queries > self.max_statements:
+                self.max_statements = queries
+                self.max_statements_route = route
+            for shape, n in repeated:
+                entry = self.n_plus_one.setdefault((route, shape), {"requests": 0, "max_repeats": 0})
+                entry["requests"] += 1
+                entry["max_repeats"] = max(entry["max_repeats"], n)
+
+        for shape, n in repeated:
+            logger.warning("possível N+1 em %s: %dx %s", route, n, shape[:300])
+
+    def record_slow(self, shape: str, seconds: float, plan: str | None) -> None:
+        with self._lock:
+            self.slow.append({"ms": round(seconds * 1000, 1), "sql": shape[:500], "plan": plan})
+        if plan:
+            logger.warning("query lenta (%.1fms): %s\n%s", seconds * 1000, shape[:500], plan)
+        else:
+            logger.warning("query lenta (%.1fms): %s", seconds * 1000, shape[:500])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            top = sorted(self.n_plus_one.items(), key=lambda kv: kv[1]["requests"], reverse=True)
+            return {
+                "requests": self.requests,
+                "statements": self.statements,
+                "statements_per_request": (self.statements / self.requests) if self.requests else None,
+                "db_ms_per_request": (self.db_seconds * 1000 / self.requests) if self.requests else None,
+                "max_statements": self.max_statements,
+                "max_statements_route": self.max_statements_route,
+                "n_plus_one_threshold": self.threshold,
+                "n_plus_one": [
+                    {"route": route, "sql": shape[:500], **entry} for (route, shape), entry in top[:50]
+                ],
+                "slow_queries": list(self.slow),
+            }
+
+
+query_stats = QueryStats()
+
+
+# =====================================================
+# Eventos do SQLAlchemy
+# =====================================================
+def _before(conn, cursor, statement, parameters, context, executemany):
+    # no contexto da execução (não em conn.info): query que falha não deixa lixo
+    if context is not None:
+        context._vj_started = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_vj_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    rt = current()
+    if rt is not None:
+        rt.add_statement(statement_shape(statement), elapsed)
+
+    if SQL_SLOW_QUERY_MS and elapsed * 1000 >= SQL_SLOW_QUERY_MS:
+        plan = _explain(conn, statement, parameters) if SQL_EXPLAIN_SLOW and not executemany else None
+        query_stats.record_slow(statement_shape(statement), elapsed, plan)
+
+
+def _explain(conn, statement: str, parameters) -> str | None:
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    # cursor novo direto no DBAPI: não passa pelos eventos nem mexe no
+    # resultado da query original
+    cur = conn.connection.cursor()
+    try:
+        cur.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in cur.fetchall())
+    except Exception as e:
+        return f"(EXPLAIN falhou: {e!r})"
+    finally:
+        cur.close()
+
+
+_installed = False
+
+
+def install_hooks() -> None:
+    """
+    Liga os eventos em todos os engines do processo (inclusive os já
+    criados). Chamado no import do main só com REQUEST_TIMING=1.
+    """
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before)
+    event.listen(Engine, "after_cursor_execute", _after)
+    _installed = True
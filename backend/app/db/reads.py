@@ -0,0 +1,69 @@
+# app/db/reads.py
+"""
+Para onde vai uma leitura: réplica ou primário, sync ou async.
+
+- run_read(fn, ...): executa fn(db, ...) — a MESMA função de leitura do
+  caminho sync (Session/Query de sempre):
+    DB_ASYNC_READS=1 -> AsyncSession.run_sync (sem ocupar o threadpool)
+    DB_ASYNC_READS=0 -> no threadpool, com sessão sync
+  em réplica quando houver (replicas.py); se a réplica cair no meio (ou
+  fn levantar PrimaryRequired), a leitura é refeita no primário
+- get_read_db: dependência para rotas GET só de leitura que continuam
+  sync (ex: lista de favoritos); não serve para quem precisa de
+  PrimaryRequired
+"""
+from typing import Callable
+
+from sqlalchemy import exc
+from starlette.concurrency import run_in_threadpool
+
+from app.db.async_session import AsyncSessionLocal
+from app.db.replicas import PrimaryRequired, Replica, replica_set
+from app.db.session import SessionLocal
+
+
+def _in_sync_session(session_factory, fn: Callable, *args, **kwargs):
+    db = session_factory()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def _run_on(replica: Replica | None, fn: Callable, *args, **kwargs):
+    async_factory = replica.AsyncSessionLocal if replica else AsyncSessionLocal
+    if async_factory is None:
+        sync_factory = replica.SessionLocal if replica else SessionLocal
+        return await run_in_threadpool(_in_sync_session, sync_factory, fn, *args, **kwargs)
+
+    async with async_factory() as adb:
+        return await adb.run_sync(fn, *args, **kwargs)
+
+
+async def run_read(fn: Callable, *args, **kwargs):
+    """
+    fn(db, *args, **kwargs) só de leitura; HTTPException levantada dentro
+    dela sobe normalmente.
+    """
+    replica = replica_set.pick()
+    if replica is None:
+        return await _run_on(None, fn, *args, **kwargs)
+
+    try:
+        return await _run_on(replica, fn, *args, **kwargs)
+    except (exc.OperationalError, exc.InterfaceError) as e:
+        # réplica fora (em geral o handle_error já a tirou da rotação): primário
+        if replica.healthy:
+            replica.mark_down(repr(e))
+        return await _run_on(None, fn, *args, **kwargs)
+    except PrimaryRequired:
+        return await _run_on(None, fn, *args, **kwargs)
+
+
+def get_read_db():
+    replica = replica_set.pick()
+    db = (replica.SessionLocal if replica else SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
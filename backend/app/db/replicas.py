@@ -0,0 +1,222 @@
+# app/db/replicas.py
+"""
+Réplicas de leitura (opcional: DATABASE_REPLICA_URLS, separadas por vírgula).
+
+- só leituras que pedem explicitamente usam réplica (reads.py: run_read()
+  e a dependência get_read_db); o resto, e toda escrita, vai para o
+  primário (DATABASE_URL)
+- round-robin entre as réplicas saudáveis; réplica que falha ao conectar
+  fica fora por DB_REPLICA_RETRY_SECONDS e depois volta a ser tentada.
+  Sem réplica saudável -> primário
+- estado do processo (listing_cache, índices em memória, cache de
+  principals) só é gravado/reconstruído a partir do primário: réplica
+  atrasada não pode "congelar" dado velho no cache. on_replica(db) diz de
+  onde veio a sessão; PrimaryRequired faz o run_read refazer no primário
+- read-your-writes: depois de um POST/PUT/PATCH/DELETE com sucesso, o
+  navegador recebe o cookie vj_primary_until e, por DB_REPLICA_PIN_SECONDS,
+  as leituras dele vão para o primário (vale entre workers/instâncias)
+
+Localmente dá para testar com dois arquivos SQLite (o "réplica" só
+precisa ter as mesmas tabelas).
+"""
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import (
+    DATABASE_REPLICA_URLS,
+    DB_ASYNC_READS,
+    DB_REPLICA_PIN_SECONDS,
+    DB_REPLICA_RETRY_SECONDS,
+)
+from app.db.async_session import create_async_db_engine
+from app.db.session import RequestSession, create_db_engine
+
+PIN_COOKIE = "vj_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_pinned: ContextVar[bool] = ContextVar("primary_pinned", default=False)
+
+
+class PrimaryRequired(Exception):
+    """
+    Levantada dentro de uma leitura em réplica que precisa do primário
+    (ex: índice em memória vencido). run_read refaz a leitura no primário.
+    """
+
+
+def on_replica(db: Session) -> bool:
+    return "replica" in db.info
+
+
+def primary_pinned() -> bool:
+    """
+    True se esta request deve ler do primário (escreveu há pouco).
+    """
+    return _pinned.get()
+
+
+class Replica:
+    def __init__(self, name: str, url: str, engine: Engine, async_engine: AsyncEngine | None = None):
+        self.name = name
+        self.url = url
+        self.engine = engine
+        self.async_engine = async_engine
+        info = {"replica": name}  # on_replica()
+        self.SessionLocal = sessionmaker(
+            class_=RequestSession, autocommit=False, autoflush=False, bind=engine, info=info
+        )
+        self.AsyncSessionLocal = (
+            async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False, info=info)
+            if async_engine is not None
+            else None
+        )
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+        self.last_error: str | None = None
+
+        # falha de conexão (inclui o pre-ping) tira a réplica da rotação
+        for eng in filter(None, (engine, async_engine.sync_engine if async_engine else None)):
+            event.listen(eng, "handle_error", self._on_error)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def _on_error(self, ctx) -> None:
+        if ctx.is_disconnect or ctx.connection is None or isinstance(ctx.sqlalchemy_exception, exc.OperationalError):
+            self.mark_down(repr(ctx.original_exception))
+
+    def mark_down(self, error: str) -> None:
+        self.failures += 1
+        self.last_error = error
+        self.down_until = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+
+
+class ReplicaSet:
+    def __init__(self, urls: list[str]):
+        # pool comum (sem instrumentação): as métricas de pool são do primário
+        self.replicas = [
+            Replica(
+                f"replica-{i}",
+                url,
+                create_db_engine(url, poolclass=QueuePool),
+                create_async_db_engine(url, poolclass=AsyncAdaptedQueuePool) if DB_ASYNC_READS else None,
+            )
+            for i, url in enumerate(urls)
+        ]
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._lock = threading.Lock()
+        self.primary_reads = 0
+        self.pinned_reads = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Replica | None:
+        """
+        Próxima réplica saudável (round-robin) ou None -> usar o primário.
+        """
+        if not self.replicas:
+            return None
+        if primary_pinned():
+            with self._lock:
+                self.pinned_reads += 1
+            return None
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[next(self._cycle)]
+                if replica.healthy:
+                    replica.reads += 1
+                    return replica
+            self.primary_reads += 1
+        return None
+
+    async def dispose(self) -> None:
+        for r in self.replicas:
+            r.engine.dispose()
+            if r.async_engine is not None:
+                await r.async_engine.dispose()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pin_seconds": DB_REPLICA_PIN_SECONDS,
+                "fallback_primary_reads": self.primary_reads,
+                "pinned_reads": self.pinned_reads,
+                "replicas": [
+                    {
+                        "name": r.name,
+                        "healthy": r.healthy,
+                        "reads": r.reads,
+                        "failures": r.failures,
+                        "last_error": r.last_error,
+                    }
+                    for r in self.replicas
+                ],
+            }
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS)
+
+
+# =====================================================
+# Middleware: cookie de read-your-writes
+# =====================================================
+class PrimaryPin:
+    """
+    Lê o cookie (marca a request como "pinada" no primário) e, em escrita
+    bem-sucedida, renova o cookie por DB_REPLICA_PIN_SECONDS.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _pinned.set(_pin_from_headers(scope["headers"]))
+        try:
+            if scope["method"] in SAFE_METHODS:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_pin(message: Message) -> None:
+                if message["type"] == "http.response.start" and message["status"] < 400:
+                    until = int(time.time() + DB_REPLICA_PIN_SECONDS)
+                    cookie = (
+                        f"{PIN_COOKIE}={until}; Max-Age={int(DB_REPLICA_PIN_SECONDS)}; "
+                        "Path=/; HttpOnly; SameSite=Lax"
+                    )
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"set-cookie", cookie.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            _pinned.reset(token)
+
+
+def _pin_from_headers(headers) -> bool:
+    for name, value in headers:
+        if name != b"cookie":
+            continue
+        for part in value.decode("latin-1").split(";"):
+            key, _, val = part.strip().partition("=")
+            if key == PIN_COOKIE:
+                try:
+                    return float(val) > time.time()
+                except ValueError:
+                    return False
+    return False
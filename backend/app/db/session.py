@@ -1,17 +1,75 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from app.core.config import DATABASE_URL
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from app.core.config import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_SSLMODE,
+)
+from app.db.pool import InstrumentedQueuePool
 
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL não definido. Configure no .env")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    connect_args={"sslmode": "require"},
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def create_db_engine(url: str = DATABASE_URL, poolclass=InstrumentedQueuePool) -> Engine:
+    """
+    Único lugar que cria engine: API, pipeline de fotos e scripts usam o
+    mesmo pool (1 por processo). Réplicas (replicas.py) passam poolclass
+    próprio para não misturar as métricas com as do primário.
+    """
+    connect_args = {}
+    if url.startswith("postgres") and DB_SSLMODE:
+        connect_args["sslmode"] = DB_SSLMODE
+
+    return create_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        # Neon derruba conexões ociosas: recicla antes disso (+ pre-ping)
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+
+
+engine = create_db_engine()
+
+
+class RequestSession(Session):
+    """
+    Sessão que pega UMA conexão do pool no primeiro uso e fica com ela
+    até o close(). A Session padrão devolve a conexão a cada commit e
+    pega outra (com outro pre-ping) na query seguinte: um handler com
+    commit + refresh fazia 2 checkouts. Sem query nenhuma (ex: hit de
+    cache), nenhum checkout.
+    """
+
+    _held: Connection | None = None
+
+    def get_bind(self, *args, **kwargs):
+        if self._held is None or self._held.closed:
+            self._held = self.bind.connect()
+        # Session ligada a uma Connection: commit/rollback continuam sendo
+        # da sessão (ela abre e fecha a transação na conexão)
+        return self._held
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            held, self._held = self._held, None
+            if held is not None:
+                held.close()
+
+
+# uma por request (get_db), compartilhada por todas as dependências
+SessionLocal = sessionmaker(class_=RequestSession, autocommit=False, autoflush=False, bind=engine)
 
 class Base(DeclarativeBase):
     pass
@@ -23,3 +81,17 @@ def get_db():
     finally:
         db.close()
 
+
+def run_in_session(fn, *args, **kwargs):
+    """
+    fn(db, *args, **kwargs) numa sessão só dela, fechada no fim (a conexão
+    volta ao pool). Para rotas async que esperam algo lento entre um acesso
+    ao banco e outro (hash de senha, moderação): chame pelo threadpool,
+        await run_in_threadpool(run_in_session, fn, ...)
+    em vez de segurar a sessão do get_db durante a espera.
+    """
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
@@ -2,19 +2,15 @@
 from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.session import get_db
 from app.models.user import User
+from app.services.principals import resolve_user_id
 
 
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db),
-) -> User:
+def cookie_user_id(request: Request) -> int:
     """
-    Pega o usuário logado via cookie (SEM localStorage).
-
-    Espera um cookie chamado 'user_id' (ex: user_id=23).
-    Se não existir, retorna 401.
+    Id do cookie 'user_id' (ex: user_id=23), sem consultar o banco.
+    Se não existir ou não for número, retorna 401.
     """
 
     user_id = request.cookies.get("user_id")
@@ -26,14 +22,20 @@ def get_current_user(
         )
 
     try:
-        user_id = int(user_id)
+        return int(user_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Cookie user_id inválido.",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+
+def load_cookie_user(db: Session, user_id: int) -> User:
+    """
+    User do cookie (cache de principals); 401 se não existir mais.
+    Também serve dentro de run_read (rotas async).
+    """
+    user = resolve_user_id(user_id, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,3 +43,16 @@ def get_current_user(
         )
 
     return user
+
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Pega o usuário logado via cookie (SEM localStorage).
+
+    Espera um cookie chamado 'user_id' (ex: user_id=23).
+    Se não existir, retorna 401.
+    """
+    return load_cookie_user(db, cookie_user_id(request))
@@ -1,5 +1,6 @@
 # app/main.py
 
+import asyncio
 import os
 
 from fastapi import FastAPI
@@ -7,9 +8,31 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
-from app.db.session import Base, engine
+from app.db import migrations
+from app.db.async_session import dispose_async_engine
+from app.db.replicas import PrimaryPin, replica_set
+from app.db.session import engine
+from app.core.config import (
+    AVATAR_WARMUP,
+    ENV,
+    METRICS_ENABLED,
+    METRICS_TOKEN,
+    PHOTO_BATCH_MAX_FILES,
+    PHOTO_MAX_BYTES,
+    REQUEST_TIMING,
+)
+from app.core.uploads import MULTIPART_SLACK, UploadSizeLimit
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import password_pool
+from app.core.timing import ServerTiming
+from app.core import metrics
+from app.db.query_stats import install_hooks, query_stats
+from app.ollama_client import close_ollama_client
+from app.services.avatar_moderation import moderation_pool
+from app.services.photo_variants import photo_pipeline
 
 from app.routes.health import router as health_router
+from app.routes.metrics import router as metrics_router
 from app.routes.auth import router as auth_router
 from app.routes.users import router as users_router
 from app.routes.partner_auth import router as partner_auth_router
@@ -23,14 +46,41 @@ from app.routes.chat import router as chat_router
 
 
 # ✅ rota de avatar (uma vez só)
-from app.routes.avatar import router as avatar_router
+from app.routes.avatar import router as avatar_router, public_router as avatar_files_router
 
 # garante que os models sejam importados
 import app.models.user  # noqa: F401
-from app.models import place, place_accessibility, place_photo, review  # noqa: F401
+from app.models import place, place_accessibility, place_photo, place_photo_variant, review, place_rating_summary  # noqa: F401
+from app.models import stored_file  # noqa: F401
 
 app = FastAPI(title="Venha Junto API", version="0.1.0")
 
+# ✅ uploads: corta o corpo assim que passa do limite (antes de montar o form).
+# Registrado antes do CORS: o CORS fica por fora e o 413 chega ao navegador
+app.add_middleware(
+    UploadSizeLimit,
+    rules=[
+        ("POST", r"^/partner/places/\d+/photos$", PHOTO_MAX_BYTES + MULTIPART_SLACK),
+        ("POST", r"^/partner/places/\d+/photos/batch$", PHOTO_BATCH_MAX_FILES * PHOTO_MAX_BYTES + MULTIPART_SLACK),
+    ],
+)
+
+# ✅ réplicas de leitura: quem acabou de escrever lê do primário por alguns segundos
+if replica_set:
+    app.add_middleware(PrimaryPin)
+
+# ✅ Server-Timing + contagem de SQL/N+1 por request (desligado: custo zero)
+if REQUEST_TIMING:
+    install_hooks()
+    app.add_middleware(ServerTiming, on_finish=[query_stats.finish_request])
+
+# ✅ métricas Prometheus por rota (GET /metrics)
+if METRICS_ENABLED:
+    if ENV != "dev" and not METRICS_TOKEN:
+        # o balanceador expõe a API inteira: sem token o /metrics seria público
+        raise RuntimeError("METRICS_ENABLED=1 fora de dev exige METRICS_TOKEN")
+    app.add_middleware(metrics.PrometheusMetrics)
+
 # ✅ CORS: necessário para cookies HTTPOnly funcionarem no fetch com credentials: "include"
 app.add_middleware(
     CORSMiddleware,
@@ -49,11 +99,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 @app.on_event("startup")
-def on_startup():
-    Base.metadata.create_all(bind=engine)
+def check_schema():
+    # o schema não é mais criado aqui (scripts/migrate.py): sem isso, worker
+    # com migração pendente subiria e falharia só na primeira query
+    migrations.require_current(engine)
+
+
+@app.on_event("startup")
+async def warm_up_avatar():
+    # modelo do avatar sobe em segundo plano: não atrasa o resto da API
+    if AVATAR_WARMUP:
+        app.state.avatar_warmup = asyncio.create_task(moderation_pool.warm_up())
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_ollama_client()
+    moderation_pool.shutdown()
+    photo_pipeline.shutdown()
+    password_pool.shutdown()
+    await dispose_async_engine()
+    await replica_set.dispose()
+    metrics.shutdown()
 
 # =====================================================
 # ✅ 1) SERVIR FRONTEND PELO BACKEND
@@ -85,11 +156,14 @@ app.mount("/media/uploads", StaticFiles(directory=UPLOAD_DIR), name="media_uploa
 # ✅ ROTAS DA API
 # =====================================================
 app.include_router(health_router)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
 app.include_router(auth_router)
 app.include_router(users_router)
 
 # ✅ avatar (uma vez só)
 app.include_router(avatar_router)
+app.include_router(avatar_files_router)
 
 app.include_router(partner_auth_router)
 app.include_router(partner_router)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.sql import func
 
@@ -55,3 +55,9 @@ class Place(Base):
         onupdate=func.now(),
         nullable=True
     )
+
+
+# ✅ índices das consultas quentes (bancos existentes: migração 2, ver app/db/migrations.py)
+Index("ix_places_status_verified_created", Place.status, Place.verified, Place.created_at, Place.id)
+Index("ix_places_lower_cidade", func.lower(Place.cidade))
+Index("ix_places_lower_tipo", func.lower(Place.tipo))
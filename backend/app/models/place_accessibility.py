@@ -6,5 +6,5 @@ class PlaceAccessibility(Base):
     __tablename__ = "place_accessibility"
 
     id = Column(Integer, primary_key=True, index=True)
-    place_id = Column(Integer, ForeignKey("places.id", ondelete="CASCADE"), nullable=False)
+    place_id = Column(Integer, ForeignKey("places.id", ondelete="CASCADE"), nullable=False, index=True)
     feature_key = Column(String(60), nullable=False)
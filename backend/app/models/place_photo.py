@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, Boolean, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, Text, Boolean, ForeignKey, Index, TIMESTAMP
 from sqlalchemy.sql import func
 
 from app.db.session import Base
@@ -14,3 +14,6 @@ class PlacePhoto(Base):
     is_cover = Column(Boolean, nullable=False, default=False)
 
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    # ✅ capa do local: is_cover primeiro, depois a mais recente
+    __table_args__ = (Index("ix_place_photos_place_cover_created", "place_id", "is_cover", "created_at"),)
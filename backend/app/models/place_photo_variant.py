@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class PlacePhotoVariant(Base):
+    """
+    Versões redimensionadas (WebP) de uma foto de local, geradas em
+    segundo plano depois do upload: card (listagem), detail, full.
+    """
+
+    __tablename__ = "place_photo_variants"
+    __table_args__ = (UniqueConstraint("photo_id", "kind", name="uq_place_photo_variants_photo_kind"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    photo_id = Column(
+        Integer,
+        ForeignKey("place_photos.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    kind = Column(String(20), nullable=False)
+    url = Column(Text, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
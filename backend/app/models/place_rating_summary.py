@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, ForeignKey, TIMESTAMP
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class PlaceRatingSummary(Base):
+    """
+    Resumo das avaliações de um local, mantido junto com cada review.
+    Evita recalcular AVG/COUNT sobre a tabela reviews inteira.
+    """
+
+    __tablename__ = "place_rating_summaries"
+
+    place_id = Column(
+        Integer,
+        ForeignKey("places.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    reviews_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # histograma por estrela (1..5)
+    stars_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_5 = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=True,
+    )
+
+    @property
+    def avg_rating(self) -> float | None:
+        if not self.reviews_count:
+            return None
+        return self.rating_sum / self.reviews_count
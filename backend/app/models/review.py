@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, Text, ForeignKey, Index, TIMESTAMP
 from sqlalchemy.sql import func
 
 from app.db.session import Base
@@ -16,3 +16,10 @@ class Review(Base):
     comment = Column(Text, nullable=True)
 
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # ✅ 1 avaliação por usuário e local (o upsert já garante; agora o banco também)
+        Index("uq_reviews_place_user", "place_id", "user_id", unique=True),
+        # ✅ avaliações do local, mais recentes primeiro
+        Index("ix_reviews_place_created", "place_id", "created_at"),
+    )
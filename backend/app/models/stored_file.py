@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP, PrimaryKeyConstraint
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class StoredFile(Base):
+    """
+    Arquivo enviado, guardado uma vez só pelo hash do conteúdo
+    (<sha256>.<ext>), com a contagem de quem usa (fotos / avatares).
+    """
+
+    __tablename__ = "stored_files"
+    __table_args__ = (PrimaryKeyConstraint("namespace", "filename", name="pk_stored_files"),)
+
+    namespace = Column(String(20), nullable=False)   # "photo" | "avatar"
+    filename = Column(String(100), nullable=False)   # <sha256>.<ext>
+
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1, server_default="1")
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
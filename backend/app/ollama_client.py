@@ -1,13 +1,177 @@
-import requests
+import asyncio
+import json
+import threading
+import time
+from contextlib import AsyncExitStack
+from typing import AsyncIterator
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+import httpx
 
-def perguntar_ollama(mensagem: str, model: str = "phi3:mini") -> str:
+from app.core import timing
+from app.core.metrics import counter, histogram
+from app.core.config import (
+    OLLAMA_URL,
+    OLLAMA_MODEL,
+    OLLAMA_CONNECT_TIMEOUT_SECONDS,
+    OLLAMA_DEADLINE_SECONDS,
+    OLLAMA_MAX_CONNECTIONS,
+)
+
+# Cliente assíncrono único por processo: reaproveita conexões (keep-alive)
+_client: httpx.AsyncClient | None = None
+
+
+class OllamaTimeout(Exception):
+    """Geração passou do prazo (deadline) da request."""
+
+
+OLLAMA_SECONDS = histogram(
+    "ollama_generation_seconds",
+    "Duração total das gerações do Ollama",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+OLLAMA_TTFT = histogram(
+    "ollama_ttft_seconds",
+    "Tempo até o primeiro token do Ollama",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+OLLAMA_ERRORS = counter("ollama_errors", "Gerações do Ollama com erro", ("kind",))
+
+
+class OllamaStats:
+    """
+    Tempo até o primeiro token (TTFT) e duração total das gerações.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.ttft_total = 0.0
+        self.ttft_last: float | None = None
+        self.duration_total = 0.0
+
+    def record(self, ttft: float | None, duration: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.duration_total += duration
+            if ttft is not None:
+                self.ttft_total += ttft
+                self.ttft_last = ttft
+        OLLAMA_SECONDS.observe(duration)
+        if ttft is not None:
+            OLLAMA_TTFT.observe(ttft)
+
+    def record_error(self, timeout: bool = False) -> None:
+        with self._lock:
+            self.errors += 1
+            if timeout:
+                self.timeouts += 1
+        OLLAMA_ERRORS.labels("timeout" if timeout else "error").inc()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "avg_ttft_seconds": (self.ttft_total / self.calls) if self.calls else None,
+                "last_ttft_seconds": self.ttft_last,
+                "avg_duration_seconds": (self.duration_total / self.calls) if self.calls else None,
+            }
+
+
+ollama_stats = OllamaStats()
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+            ),
+            # read=None: o prazo total é controlado por `deadline`
+            timeout=httpx.Timeout(connect=OLLAMA_CONNECT_TIMEOUT_SECONDS, read=None, write=10.0, pool=10.0),
+        )
+    return _client
+
+
+async def close_ollama_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def stream_ollama(
+    mensagem: str,
+    model: str = OLLAMA_MODEL,
+    deadline: float | None = None,
+) -> AsyncIterator[str]:
+    """
+    Repassa os tokens do Ollama conforme são gerados (stream NDJSON).
+    `deadline`: prazo total em segundos (padrão OLLAMA_DEADLINE_SECONDS).
+    """
     payload = {
         "model": model,
         "prompt": mensagem,
-        "stream": False
+        "stream": True,
     }
-    r = requests.post(OLLAMA_URL, json=payload, timeout=120)
-    r.raise_for_status()
-    return r.json()["response"]
+    deadline = deadline or OLLAMA_DEADLINE_SECONDS
+
+    started = time.perf_counter()
+    expires = asyncio.get_running_loop().time() + deadline
+    ttft = None
+
+    # o timeout envolve só as esperas pelo Ollama (resposta e cada linha),
+    # nunca o yield: aberto em volta do yield, o cancelamento do prazo
+    # cairia no código de quem consome o gerador
+    try:
+        async with AsyncExitStack() as stack:
+            async with asyncio.timeout_at(expires):
+                r = await stack.enter_async_context(
+                    _get_client().stream("POST", OLLAMA_URL, json=payload)
+                )
+            r.raise_for_status()
+            lines = r.aiter_lines()
+            while True:
+                async with asyncio.timeout_at(expires):
+                    line = await anext(lines, None)
+                if line is None:
+                    break
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response") or ""
+                if token:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    yield token
+                if chunk.get("done"):
+                    break
+    except TimeoutError:
+        ollama_stats.record_error(timeout=True)
+        raise OllamaTimeout(f"Ollama não respondeu em {deadline:.0f}s")
+    except Exception:
+        ollama_stats.record_error()
+        raise
+
+    ollama_stats.record(ttft, time.perf_counter() - started)
+    timing.record("llm", time.perf_counter() - started)
+
+
+async def perguntar_ollama(
+    mensagem: str,
+    model: str = OLLAMA_MODEL,
+    deadline: float | None = None,
+) -> str:
+    """
+    Resposta completa (junta o stream).
+    """
+    parts = []
+    async for token in stream_ollama(mensagem, model=model, deadline=deadline):
+        parts.append(token)
+    return "".join(parts)
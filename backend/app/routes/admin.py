@@ -1,14 +1,31 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, Cookie
+from fastapi import APIRouter, Depends, HTTPException, Query, Cookie, Response
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.core.security import decode_access_token
+from app.db.session import engine, get_db
+from app.db.async_session import async_engine
+from app.db.replicas import replica_set
+from app.db.pool import async_pool_stats, pool_stats
+from app.db.query_stats import query_stats
+from app.core.pagination import DEFAULT_PAGE_SIZE, paginate_desc
+from app.core.http_cache import conditional_stats
+from app.core.security import password_pool
 
 from app.models.user import User
 from app.models.place import Place
 
 from app.schemas.place import PlaceApproveRequest, PlaceRejectRequest
+from app.services.place_cache import invalidate_listing_for, listing_cache
+from app.services.feature_index import feature_index
+from app.services.search_index import search_index
+from app.services.place_indexes import refresh_place_indexes
+from app.ollama_client import ollama_stats
+from app.services.answer_cache import answer_cache
+from app.services.chat_sessions import chat_sessions
+from app.services.avatar_moderation import moderation_pool
+from app.services.photo_variants import photo_pipeline
+from app.services.stored_files import storage_stats
+from app.services.principals import principal_cache, resolve_token
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -23,32 +40,13 @@ def get_admin_context(
     if not vj_access_token:
         raise HTTPException(status_code=401, detail="Não autenticado")
 
-    payload = decode_access_token(vj_access_token)
-
     # 🔐 aceita uid (id) ou sub (email)
-    uid = payload.get("uid")
-    sub = payload.get("sub")
+    principal = resolve_token(vj_access_token, db)
 
-    if not (uid or sub):
+    if not (principal.claims.get("uid") or principal.claims.get("sub")):
         raise HTTPException(status_code=401, detail="Token inválido")
 
-    user = None
-
-    # tenta localizar por ID
-    if uid:
-        try:
-            user = db.query(User).filter(User.id == int(uid)).first()
-        except Exception:
-            user = None
-
-    # tenta localizar por email
-    if not user and sub:
-        user = (
-            db.query(User)
-            .filter(User.email == str(sub).lower().strip())
-            .first()
-        )
-
+    user = principal.user
     if not user:
         raise HTTPException(status_code=401, detail="Usuário não encontrado")
 
@@ -75,16 +73,16 @@ def ping(admin: User = Depends(get_admin_context)):
 # ============================
 @router.get("/places")
 def list_places(
+    response: Response,
     status_filter: str = Query(default="PENDING_REVIEW", alias="status"),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1),
     db: Session = Depends(get_db),
     admin: User = Depends(get_admin_context),
 ):
-    places = (
-        db.query(Place)
-        .filter(Place.status == status_filter)
-        .order_by(Place.created_at.desc())
-        .all()
-    )
+    # paginação por cursor: próxima página no header X-Next-Cursor
+    q = db.query(Place).filter(Place.status == status_filter)
+    places = paginate_desc(q, [Place.created_at, Place.id], cursor, limit, response)
 
     return [
         {
@@ -138,6 +136,10 @@ def approve_place(
     db.commit()
     db.refresh(place)
 
+    # local entrou/saiu da listagem pública
+    invalidate_listing_for(place.cidade, place.tipo)
+    refresh_place_indexes(db, place)
+
     return {
         "message": "Estabelecimento aprovado com sucesso",
         "place_id": place.id,
@@ -180,8 +182,86 @@ def reject_place(
     db.commit()
     db.refresh(place)
 
+    # local entrou/saiu da listagem pública
+    invalidate_listing_for(place.cidade, place.tipo)
+    refresh_place_indexes(db, place)
+
     return {
         "message": "Estabelecimento reprovado",
         "place_id": place.id,
         "status": place.status,
     }
+
+
+# ============================
+# CACHE DA LISTAGEM PÚBLICA
+# ============================
+@router.get("/cache/stats")
+def cache_stats(admin: User = Depends(get_admin_context)):
+    return {
+        "public_places": listing_cache.stats(),
+        "conditional_get": conditional_stats.snapshot(),
+        "feature_index": feature_index.stats(),
+        "search_index": search_index.stats(),
+    }
+
+
+# ============================
+# ASSISTENTE (OLLAMA)
+# ============================
+@router.get("/chat/stats")
+def chat_stats(admin: User = Depends(get_admin_context)):
+    return {
+        "ollama": ollama_stats.snapshot(),
+        "answer_cache": answer_cache.stats(),
+        "sessions": chat_sessions.stats(),
+    }
+
+
+# ============================
+# BANCO (pool de conexões)
+# ============================
+@router.get("/db/stats")
+def db_stats(admin: User = Depends(get_admin_context)):
+    return {
+        "sync": pool_stats.snapshot(engine.pool),
+        # leituras públicas com DB_ASYNC_READS=1
+        "async": async_pool_stats.snapshot(async_engine.pool) if async_engine is not None else None,
+        "replicas": replica_set.snapshot() if replica_set else None,
+    }
+
+
+@router.get("/db/queries")
+def db_queries(admin: User = Depends(get_admin_context)):
+    # só conta com REQUEST_TIMING=1: queries por request, N+1 e queries lentas
+    return query_stats.snapshot()
+
+
+# ============================
+# AUTENTICAÇÃO (cache de quem está logado)
+# ============================
+@router.get("/auth/stats")
+def auth_stats(admin: User = Depends(get_admin_context)):
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hash": password_pool.snapshot(),
+    }
+
+
+# ============================
+# MODERAÇÃO DE AVATAR
+# ============================
+@router.get("/avatar/stats")
+def avatar_stats(admin: User = Depends(get_admin_context)):
+    return moderation_pool.snapshot()
+
+
+# ============================
+# FOTOS DOS LOCAIS (versões redimensionadas)
+# ============================
+@router.get("/photos/stats")
+def photos_stats(admin: User = Depends(get_admin_context), db: Session = Depends(get_db)):
+    return {
+        "pipeline": photo_pipeline.snapshot(),
+        "storage": storage_stats(db),
+    }
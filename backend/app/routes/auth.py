@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header, Response, Request
 from sqlalchemy.orm import Session
-from jose import jwt, JWTError
+from starlette.concurrency import run_in_threadpool
 
-from app.db.session import get_db
+from app.db.session import get_db, run_in_session
 from app.models.user import User
 from app.schemas.auth import RegisterRequest, LoginRequest, TokenResponse
 from app.schemas.user import UserPublic
-from app.core.security import hash_password, verify_password, create_access_token
-from app.core.config import JWT_SECRET, JWT_ALG
+from app.core.security import create_access_token, password_pool
+from app.services.principals import invalidate_user, resolve_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 routes = router  # alias de segurança
@@ -19,19 +19,14 @@ COOKIE_NAME = "vj_access_token"
 # FUNÇÃO ORIGINAL — USA sub = EMAIL
 # =====================================================
 def get_current_user(token: str, db: Session) -> User:
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(status_code=401, detail="Token inválido")
-    except JWTError:
+    principal = resolve_token(token, db)
+    if not principal.claims.get("sub"):
         raise HTTPException(status_code=401, detail="Token inválido")
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+    if not principal.user:
         raise HTTPException(status_code=401, detail="Usuário não autorizado")
 
-    return user
+    return principal.user
 
 
 def set_auth_cookie(response: Response, token: str):
@@ -53,38 +48,63 @@ def clear_auth_cookie(response: Response):
 # =====================================================
 # REGISTER — USUÁRIO NORMAL
 # =====================================================
+# (async: o hash roda no password_pool e o banco no threadpool,
+#  assim uma rajada de cadastros/logins não trava as outras rotas.
+#  Cada acesso ao banco usa uma sessão curta (run_in_session): nenhuma
+#  conexão do pool fica presa enquanto a senha espera na fila do hash)
+def find_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+
+def save_rehash(db: Session, user_id: int, new_hash: str) -> None:
+    # parâmetros do hash mudaram (PASSWORD_HASH_ROUNDS): grava o novo
+    db.query(User).filter(User.id == user_id).update(
+        {User.password_hash: new_hash}, synchronize_session=False
+    )
+    db.commit()
+    invalidate_user(user_id)
+
+
+def _insert_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
-def register(data: RegisterRequest, db: Session = Depends(get_db)):
+async def register(data: RegisterRequest):
     email = data.email.lower().strip()
 
-    if db.query(User).filter(User.email == email).first():
+    if await run_in_threadpool(run_in_session, find_user_by_email, email):
         raise HTTPException(status_code=409, detail="E-mail já cadastrado")
 
     user = User(
         nome=data.nome.strip(),
         telefone=data.telefone.strip() if data.telefone else None,
         email=email,
-        password_hash=hash_password(data.senha),
+        password_hash=await password_pool.hash(data.senha),
         role="user",
     )
 
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-
-    return user
+    return await run_in_threadpool(run_in_session, _insert_user, user)
 
 
 # =====================================================
 # LOGIN — sub = EMAIL (NÃO QUEBRA O FRONT)
 # =====================================================
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, response: Response, db: Session = Depends(get_db)):
+async def login(data: LoginRequest, response: Response):
     email = data.email.lower().strip()
-    user = db.query(User).filter(User.email == email).first()
+    user = await run_in_threadpool(run_in_session, find_user_by_email, email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Credenciais inválidas")
 
-    if not user or not verify_password(data.senha, user.password_hash):
+    ok, new_hash = await password_pool.verify(data.senha, user.password_hash)
+    if not ok:
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
+    if new_hash:
+        await run_in_threadpool(run_in_session, save_rehash, user.id, new_hash)
 
     # 🔴 FORMATO ORIGINAL — sub = email
     token = create_access_token(user.email)
@@ -1,35 +1,44 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Response, Request, Header
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request, Header, Query
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.orm import Session
-from pathlib import Path
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timezone
-import uuid
-import io
-import os
-
-from PIL import Image, ImageOps
-import numpy as np
-import cv2
-
-# NudeNet (detecção de nudez)
-from nudenet import NudeDetector
+from pathlib import Path
+import hashlib
 
-from app.db.session import get_db
+from app.db.session import get_db, run_in_session
 from app.models.user import User
 
+# Sanitização + NudeNet rodam num pool de processos (fora do event loop)
+from app.services.avatar_moderation import MODERATION_REJECTED, InvalidImage, ModerationBusy, moderation_pool
+from app.services.avatar_storage import (
+    AVATAR_DIR,
+    AVATAR_SIZES,
+    MEDIA_TYPES,
+    AvatarRemoval,
+    avatar_url,
+    parse_name,
+    stage_avatar,
+    variant_name,
+)
+from app.core.http_cache import is_not_modified, make_etag
+from app.core.uploads import UPLOAD_BYTES, UPLOAD_REJECTED
+from app.services.stored_files import AVATAR, acquire, release
+from app.services.principals import invalidate_user
+
 # Reaproveita seu auth (cookie + get_current_user)
 from app.routes.auth import get_current_user, COOKIE_NAME
 
 router = APIRouter(prefix="/users/me", tags=["Avatar"])
 
-# ✅ pasta fora do "public" (mais seguro)
-AVATAR_DIR = Path("storage/avatars")
-AVATAR_DIR.mkdir(parents=True, exist_ok=True)
+# ✅ arquivos públicos por nome (URL muda a cada upload -> cache imutável)
+public_router = APIRouter(prefix="/avatars", tags=["Avatar"])
 
 MAX_SIZE = 2 * 1024 * 1024  # 2MB
-MAX_W, MAX_H = 1024, 1024
 ALLOWED_MIME = {"image/jpeg", "image/png", "image/webp"}
 
-detector = NudeDetector()  # carrega modelo uma vez
+IMMUTABLE = "public, max-age=31536000, immutable"
+PRIVATE_REVALIDATE = "private, no-cache"
 
 
 # ====== Auth helper (igual seu users.py) ======
@@ -58,96 +67,92 @@ def sniff_magic(data: bytes) -> str:
     return ""
 
 
-def sanitize_and_reencode(raw: bytes) -> bytes:
-    """
-    - valida se abre como imagem
-    - limita dimensões
-    - remove EXIF/metadados
-    - re-encode para JPEG seguro
-    """
-    try:
-        img = Image.open(io.BytesIO(raw))
-        img.verify()  # valida estrutura
-    except Exception:
-        raise HTTPException(status_code=400, detail="Arquivo não é uma imagem válida.")
-
-    # reabrir após verify
-    img = Image.open(io.BytesIO(raw))
-    img = ImageOps.exif_transpose(img)  # corrige rotação sem manter EXIF
+def content_filename(cleaned_jpg: bytes) -> str:
+    # nome = hash do conteúdo: mesma imagem (retry, outro usuário) vira um arquivo só
+    return f"{hashlib.sha256(cleaned_jpg).hexdigest()}.jpg"
 
-    w, h = img.size
-    # “anti-bomba”: evita imagens absurdas
-    if w > 6000 or h > 6000:
-        raise HTTPException(status_code=400, detail="Dimensões inválidas (muito grande).")
 
-    img.thumbnail((MAX_W, MAX_H))
+def _release_avatar(db: Session, filename: str) -> bool:
+    return release(db, AVATAR, Path(filename).name)
 
-    if img.mode not in ("RGB", "L"):
-        img = img.convert("RGB")
-    elif img.mode == "L":
-        img = img.convert("RGB")
 
-    out = io.BytesIO()
-    # ✅ JPEG “sanitiza”: remove transparência e metadados
-    img.save(out, format="JPEG", quality=88, optimize=True, progressive=True)
-    return out.getvalue()
+def _avatar_urls(filename: str) -> dict[str, str]:
+    return {str(size): avatar_url(filename, size) for size in AVATAR_SIZES}
 
 
-def is_explicit_nudenet(image_jpeg_bytes: bytes) -> bool:
+def _serve_file(request: Request, path, etag: str, cache_control: str, media_type: str) -> Response:
     """
-    NudeNet retorna lista de detecções com label + score.
-    Bloqueia se detectar labels de nudez/sexual com score >= 0.60
+    304 se o cliente já tem a versão; senão FileResponse (envia o arquivo
+    em blocos direto do disco, sem carregar tudo na memória).
     """
-    np_arr = np.frombuffer(image_jpeg_bytes, dtype=np.uint8)
-    bgr = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-    if bgr is None:
-        raise HTTPException(status_code=400, detail="Imagem inválida (decode falhou).")
-
-    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-    detections = detector.detect(rgb)
-
-    blocked_labels = {
-        "EXPOSED_BREAST_F", "EXPOSED_BREAST_M",
-        "EXPOSED_GENITALIA_F", "EXPOSED_GENITALIA_M",
-        "EXPOSED_BUTTOCKS", "EXPOSED_ANUS",
-    }
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if is_not_modified(request, etag, None):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
 
-    for d in detections or []:
-        label = (d.get("class") or "").upper()
-        score = float(d.get("score") or 0.0)
-        if label in blocked_labels and score >= 0.60:
-            return True
-
-    return False
 
+# ====== Endpoints ======
+def _current_user_id(db: Session, token: str) -> int:
+    return get_current_user(token, db).id
 
-def safe_filename() -> str:
-    return f"{uuid.uuid4().hex}.jpg"
 
+def _save_avatar(db: Session, token: str, cleaned_jpg: bytes, variants: dict[str, bytes]) -> str:
+    user: User = get_current_user(token, db)
+    new_filename = content_filename(cleaned_jpg)
+    old_filename = getattr(user, "avatar_filename", None)
 
-def _remove_file_safely(path: Path) -> None:
+    # ✅ salvar em disco com nome seguro (+ variantes de tamanho): .part
+    #    primeiro, no lugar só com a linha de stored_files travada
+    staged = stage_avatar(new_filename, cleaned_jpg, variants) if new_filename != old_filename else None
+    removal = None
     try:
-        if path.exists() and path.is_file():
-            path.unlink()
-    except Exception:
-        # não derruba a request se falhar para apagar
-        pass
+        if staged is not None:
+            acquire(db, AVATAR, new_filename, len(cleaned_jpg))
+            staged.place()
+
+            # ✅ avatar antigo: só sai do disco se ninguém mais usa
+            if old_filename and _release_avatar(db, old_filename):
+                removal = AvatarRemoval(old_filename)
+                removal.stage()
+
+        # ✅ grava no banco
+        user.avatar_filename = new_filename
+        user.avatar_updated_at = datetime.now(timezone.utc)
+
+        db.add(user)
+        db.commit()
+    except BaseException:
+        # antes do rollback: a linha ainda está travada
+        if staged is not None:
+            staged.discard()
+        if removal is not None:
+            removal.undo()
+        db.rollback()
+        raise
+
+    invalidate_user(user.id)
+    if removal is not None:
+        removal.finish()
+    return new_filename
 
 
-# ====== Endpoints ======
 @router.post("/avatar")
 async def upload_avatar(
     request: Request,
     authorization: str | None = Header(default=None),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
 ):
+    """
+    async só para esperar a moderação sem ocupar thread; banco e disco vão
+    para o threadpool, cada parte numa sessão curta (nenhuma conexão presa
+    enquanto a imagem está no pool de moderação).
+    """
     # ✅ pega usuário logado (seu auth real)
     token = _get_token(request, authorization)
     if not token:
         raise HTTPException(status_code=401, detail="Não autenticado")
 
-    user: User = get_current_user(token, db)
+    await run_in_threadpool(run_in_session, _current_user_id, token)
 
     # valida content-type declarado
     if file.content_type not in ALLOWED_MIME:
@@ -157,6 +162,7 @@ async def upload_avatar(
 
     # limite de tamanho
     if len(raw) > MAX_SIZE:
+        UPLOAD_REJECTED.labels("avatar").inc()
         raise HTTPException(status_code=400, detail="Arquivo muito grande. Máximo 2MB.")
 
     # valida assinatura real (anti “trocar extensão”)
@@ -164,39 +170,35 @@ async def upload_avatar(
     if real_mime not in ALLOWED_MIME:
         raise HTTPException(status_code=400, detail="Arquivo inválido (assinatura não confere).")
 
-    # ✅ sanitiza e re-encode (vira JPG seguro)
-    cleaned_jpg = sanitize_and_reencode(raw)
+    # ✅ sanitiza e re-encode (vira JPG seguro) + detecção de nudez, no pool
+    try:
+        cleaned_jpg, variants, explicit = await moderation_pool.run(raw)
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ModerationBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
 
     # ✅ bloqueia explícito
-    if is_explicit_nudenet(cleaned_jpg):
+    if explicit:
+        MODERATION_REJECTED.labels("explicit").inc()
         raise HTTPException(status_code=422, detail="Imagem rejeitada por conteúdo impróprio.")
+    UPLOAD_BYTES.labels("avatar").observe(len(raw))
 
-    # ✅ salvar em disco com nome seguro
-    new_filename = safe_filename()
-    new_path = AVATAR_DIR / new_filename
-    new_path.write_bytes(cleaned_jpg)
-
-    # ✅ remove avatar antigo (se existir)
-    old_filename = getattr(user, "avatar_filename", None)
-    if old_filename:
-        _remove_file_safely(AVATAR_DIR / old_filename)
-
-    # ✅ grava no banco
-    user.avatar_filename = new_filename
-    user.avatar_updated_at = datetime.now(timezone.utc)
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    new_filename = await run_in_threadpool(run_in_session, _save_avatar, token, cleaned_jpg, variants)
 
-    # ✅ URL padrão do seu GET
-    return {"ok": True, "avatar_url": "/users/me/avatar"}
+    # ✅ URLs imutáveis por tamanho (a de /users/me/avatar continua valendo)
+    return {
+        "ok": True,
+        "avatar_url": avatar_url(new_filename),
+        "avatar_urls": _avatar_urls(new_filename),
+    }
 
 
 @router.get("/avatar")
 def get_my_avatar(
     request: Request,
     authorization: str | None = Header(default=None),
+    size: int | None = Query(default=None),
     db: Session = Depends(get_db),
 ):
     token = _get_token(request, authorization)
@@ -212,14 +214,21 @@ def get_my_avatar(
     path = AVATAR_DIR / filename
     if not path.exists():
         # DB diz que tem, mas arquivo sumiu -> limpa DB
+        _release_avatar(db, filename)
         user.avatar_filename = None
         user.avatar_updated_at = datetime.now(timezone.utc)
+        user_id = user.id
         db.add(user)
         db.commit()
+        invalidate_user(user_id)
         raise HTTPException(status_code=404, detail="Avatar não encontrado.")
 
-    data = path.read_bytes()
-    return Response(content=data, media_type="image/jpeg")
+    if size in AVATAR_SIZES and (AVATAR_DIR / variant_name(filename, size)).exists():
+        path = AVATAR_DIR / variant_name(filename, size)
+
+    # URL fixa (muda o conteúdo a cada upload): revalida sempre pelo ETag
+    etag = make_etag(path.name)
+    return _serve_file(request, path, etag, PRIVATE_REVALIDATE, "image/jpeg")
 
 
 @router.delete("/avatar")
@@ -235,13 +244,51 @@ def delete_my_avatar(
     user: User = get_current_user(token, db)
 
     filename = getattr(user, "avatar_filename", None)
-    if filename:
-        _remove_file_safely(AVATAR_DIR / filename)
+    # ✅ só apaga do disco se nenhum outro usuário usa a mesma imagem
+    removal = AvatarRemoval(filename) if filename and _release_avatar(db, filename) else None
+
+    try:
+        # fora do lugar antes do commit, com a linha de stored_files travada
+        if removal is not None:
+            removal.stage()
+
+        user.avatar_filename = None
+        user.avatar_updated_at = datetime.now(timezone.utc)
 
-    user.avatar_filename = None
-    user.avatar_updated_at = datetime.now(timezone.utc)
+        user_id = user.id
+        db.add(user)
+        db.commit()
+    except BaseException:
+        if removal is not None:
+            removal.undo()
+        db.rollback()
+        raise
 
-    db.add(user)
-    db.commit()
+    invalidate_user(user_id)
+    if removal is not None:
+        removal.finish()
 
     return {"ok": True}
+
+
+@public_router.get("/{name}")
+def get_avatar_file(name: str, request: Request):
+    """
+    Avatar por nome de arquivo (ex: /avatars/<stem>_128.webp).
+    Sem auth e sem banco: o nome é o hash do conteúdo (não dá para adivinhar).
+    """
+    parsed = parse_name(name)
+    if not parsed:
+        raise HTTPException(status_code=404, detail="Avatar não encontrado.")
+    stem, size, fmt = parsed
+
+    path = AVATAR_DIR / name
+    if not path.exists() and size is not None:
+        # avatar antigo (antes das variantes): cai para a imagem base
+        path = AVATAR_DIR / f"{stem}.jpg"
+        fmt = "jpg"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Avatar não encontrado.")
+
+    etag = make_etag(name)
+    return _serve_file(request, path, etag, IMMUTABLE, MEDIA_TYPES[fmt])
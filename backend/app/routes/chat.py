@@ -1,24 +1,38 @@
-import re
-import unicodedata
-from fastapi import APIRouter, Depends
+import json
+import time
+import uuid
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
+from app.core.metrics import counter
+from app.core.text import norm
 from app.models.place import Place
 from app.models.place_accessibility import PlaceAccessibility
 from app.models.place_photo import PlacePhoto
+from app.services.search_index import search_index
+from app.services.published import published
+from app.services.answer_cache import answer_cache, answer_key
+from app.services.chat_sessions import chat_sessions
+from app.services.photo_variants import variant_urls
 
-from app.ollama_client import perguntar_ollama  # seu client do ollama (requests)
+from app.ollama_client import OllamaTimeout, perguntar_ollama, stream_ollama  # client assíncrono (httpx)
 
 router = APIRouter()
 
+# stream/json x resposta do cache/do Ollama
+CHAT_REQUESTS = counter("chat_requests", "Mensagens do chat", ("mode", "source"))
+
 class ChatIn(BaseModel):
     message: str
     session_id: str | None = None  # opcional (frontend pode mandar)
+    stream: bool = False  # True -> resposta em Server-Sent Events (token a token)
 
-# Memória simples em RAM (para desenvolvimento)
-STATE: dict[str, dict] = {}
 
 TIPO_MAP = {
     "restaurante": ["restaurante", "restaurantes", "comida", "almoço", "jantar", "lanchonete", "café", "cafeteria"],
@@ -28,12 +42,6 @@ TIPO_MAP = {
     "cultura": ["teatro", "cinema", "show", "cultural", "cultura"],
 }
 
-def norm(s: str) -> str:
-    s = (s or "").strip().lower()
-    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("utf-8")
-    s = re.sub(r"\s+", " ", s)
-    return s
-
 def detectar_tipo(texto: str) -> str | None:
     t = norm(texto)
     for tipo, palavras in TIPO_MAP.items():
@@ -42,13 +50,21 @@ def detectar_tipo(texto: str) -> str | None:
     return None
 
 def escolher_sessao(session_id: str | None) -> str:
-    return session_id or "default"
+    # sem id -> sessão nova (o id volta na resposta para o front reenviar)
+    return session_id or uuid.uuid4().hex
 
 def buscar_places(db: Session, tipo: str | None, bairro: str | None, cidade: str | None):
-    q = db.query(Place)
-
-    # Só lugares publicados (seu fluxo admin aprova -> published)
-    q = q.filter(Place.status == "PUBLISHED")
+    """
+    Usa o mesmo motor da busca pública (/public/search):
+    tipo e bairro casam sem acento e por prefixo ("vila olimpia" acha "Vila Olímpia").
+    """
+    search_index.ensure_fresh(db)
+    ranked = search_index.search(None, limit=0, required={"tipo": tipo, "bairro": bairro})
+    if not ranked:
+        return []
+
+    # Só lugares publicados (seu fluxo admin aprova -> APPROVED)
+    q = published(db.query(Place)).filter(Place.id.in_([pid for pid, _ in ranked]))
 
     # Se quiser não travar cidade, deixe sem este filtro.
     # Como sua plataforma é SP, esse filtro ajuda:
@@ -61,12 +77,6 @@ def buscar_places(db: Session, tipo: str | None, bairro: str | None, cidade: str
             (Place.cidade.ilike("%São Paulo%")) | (Place.cidade.ilike("%Sao Paulo%"))
         )
 
-    if tipo:
-        q = q.filter(Place.tipo.ilike(f"%{tipo}%"))
-
-    if bairro:
-        q = q.filter(Place.bairro.ilike(f"%{bairro}%"))
-
     return q.order_by(Place.verified.desc(), Place.updated_at.desc()).limit(6).all()
 
 def montar_payload(db: Session, places: list[Place]):
@@ -82,15 +92,22 @@ def montar_payload(db: Session, places: list[Place]):
         acc_map.setdefault(pid, []).append(key)
 
     photo_rows = (
-        db.query(PlacePhoto.place_id, PlacePhoto.url, PlacePhoto.is_cover)
+        db.query(PlacePhoto.place_id, PlacePhoto.id, PlacePhoto.url, PlacePhoto.is_cover)
         .filter(PlacePhoto.place_id.in_(ids))
         .all()
     )
-    photo_map: dict[int, str] = {}
+    chosen: dict[int, tuple[int, str]] = {}
     # prioriza is_cover; se não tiver, pega a primeira
-    for pid, url, is_cover in sorted(photo_rows, key=lambda x: (x[0], not x[2])):
-        if pid not in photo_map or is_cover:
-            photo_map[pid] = url
+    for pid, photo_id, url, is_cover in sorted(photo_rows, key=lambda x: (x[0], not x[3])):
+        if pid not in chosen or is_cover:
+            chosen[pid] = (photo_id, url)
+
+    # versão "card" (leve) quando já foi gerada
+    variants = variant_urls(db, [photo_id for photo_id, _ in chosen.values()])
+    photo_map = {
+        pid: variants.get(photo_id, {}).get("card", url)
+        for pid, (photo_id, url) in chosen.items()
+    }
 
     out = []
     for p in places:
@@ -108,7 +125,7 @@ def montar_payload(db: Session, places: list[Place]):
     return out
 
 def sugerir_bairros_reais(db: Session, cidade: str | None, limite: int = 6) -> list[str]:
-    q = db.query(Place.bairro).filter(Place.status == "PUBLISHED")
+    q = published(db.query(Place.bairro))
     if cidade:
         q = q.filter(Place.cidade.ilike(f"%{cidade}%"))
     else:
@@ -140,13 +157,38 @@ def sugerir_bairros_reais(db: Session, cidade: str | None, limite: int = 6) -> l
     return bairros
 
 
-@router.post("/chat")
-def chat(payload: ChatIn, db: Session = Depends(get_db)):
+def recursos_pedidos(msg: str, places_payload: list[dict]) -> list[str]:
+    """
+    Recursos de acessibilidade dos locais encontrados que a mensagem cita
+    (ex: "com banheiro adaptado" -> banheiro_adaptado). Entram na chave do
+    cache: a mesma busca pedindo outro recurso pede outra resposta.
+    """
+    m_norm = norm(msg)
+    recursos = {f for p in places_payload for f in p["acessibilidade"]}
+    return sorted(f for f in recursos if norm(f.replace("_", " ")) in m_norm)
+
+
+def preparar_resposta(payload: ChatIn, db: Session) -> dict:
+    """
+    Parte síncrona do chat (estado + banco).
+    Retorna {"answer", "places"} quando já dá para responder sem IA,
+    ou {"prompt", "places"} quando o Ollama precisa redigir.
+    Sempre inclui "session_id".
+    """
     msg = (payload.message or "").strip()[:500]
     sid = escolher_sessao(payload.session_id)
 
-    st = STATE.setdefault(sid, {"tipo": None, "bairro": None, "cidade": None})
+    st = chat_sessions.load(sid) or {"tipo": None, "bairro": None, "cidade": None}
+    try:
+        prep = _conversar(st, msg, db)
+    finally:
+        chat_sessions.save(sid, st)
+
+    prep["session_id"] = sid
+    return prep
 
+
+def _conversar(st: dict, msg: str, db: Session) -> dict:
     # 1) Atualiza estado com tipo
     tipo_now = detectar_tipo(msg)
     if tipo_now:
@@ -192,7 +234,7 @@ def chat(payload: ChatIn, db: Session = Depends(get_db)):
 
     places_payload = montar_payload(db, places)
 
-    # 5) Ollama só para redigir, SEM inventar
+    # 5) prompt para o Ollama só redigir, SEM inventar
     lista = "\n".join([
         f"- {p['nome']} | {p.get('bairro') or ''} | {p.get('endereco') or 'endereço não informado'} | acessibilidade: {', '.join(p['acessibilidade']) or 'não informado'}"
         for p in places_payload
@@ -211,6 +253,84 @@ RESULTADOS:
 Responda em português, curto (2-5 linhas), acolhedor. Sugira os lugares e pergunte se a pessoa quer ver detalhes.
 """.strip()
 
-    answer = perguntar_ollama(prompt)
+    # 6) mesma intenção + mesmos locais (sem alteração) -> reaproveita a resposta
+    cache_key = answer_key(
+        st["tipo"], st["bairro"], st["cidade"], places, features=recursos_pedidos(msg, places_payload)
+    )
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        return {"answer": cached, "places": places_payload}
 
-    return {"answer": answer.strip(), "places": places_payload}
+    return {"prompt": prompt, "places": places_payload, "cache_key": cache_key}
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_resposta(prep: dict):
+    """
+    Server-Sent Events:
+      event: session -> session_id da conversa
+      event: places -> lista de locais (chega antes do texto)
+      event: token  -> pedaço da resposta, conforme o Ollama gera
+      event: error  -> falha/timeout da IA
+      event: done   -> fim
+    """
+    yield _sse("session", {"session_id": prep["session_id"]})
+    yield _sse("places", prep["places"])
+
+    if "answer" in prep:
+        yield _sse("token", {"t": prep["answer"]})
+    else:
+        started = time.perf_counter()
+        parts = []
+        try:
+            async for token in stream_ollama(prep["prompt"]):
+                parts.append(token)
+                yield _sse("token", {"t": token})
+
+            await run_in_threadpool(
+                answer_cache.set,
+                prep["cache_key"],
+                "".join(parts).strip(),
+                time.perf_counter() - started,
+            )
+        except OllamaTimeout:
+            yield _sse("error", {"detail": "A assistente demorou demais para responder."})
+        except (httpx.HTTPError, json.JSONDecodeError):
+            # JSONDecodeError: linha do stream do Ollama cortada/inválida
+            yield _sse("error", {"detail": "Assistente indisponível no momento."})
+
+    yield _sse("done", {})
+
+
+@router.post("/chat")
+async def chat(payload: ChatIn, db: Session = Depends(get_db)):
+    # estado + banco são síncronos: roda no threadpool, sem travar o event loop
+    prep = await run_in_threadpool(preparar_resposta, payload, db)
+    CHAT_REQUESTS.labels("stream" if payload.stream else "json", "cache" if "answer" in prep else "ollama").inc()
+
+    if payload.stream:
+        return StreamingResponse(
+            _stream_resposta(prep),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    if "answer" in prep:
+        return {"answer": prep["answer"], "places": prep["places"], "session_id": prep["session_id"]}
+
+    # 5) Ollama só para redigir, SEM inventar
+    started = time.perf_counter()
+    try:
+        answer = await perguntar_ollama(prep["prompt"])
+    except OllamaTimeout:
+        raise HTTPException(status_code=504, detail="A assistente demorou demais para responder.")
+    except (httpx.HTTPError, json.JSONDecodeError):
+        raise HTTPException(status_code=502, detail="Assistente indisponível no momento.")
+
+    answer = answer.strip()
+    await run_in_threadpool(answer_cache.set, prep["cache_key"], answer, time.perf_counter() - started)
+
+    return {"answer": answer, "places": prep["places"], "session_id": prep["session_id"]}
@@ -2,16 +2,17 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db  # ✅ usar o get_db do session.py
+from app.db.reads import get_read_db, run_read
 from app.models.favorite import Favorite
 from app.models.place import Place
-from app.dependencies import get_current_user
+from app.dependencies import cookie_user_id, get_current_user, load_cookie_user
 
 router = APIRouter(prefix="/favorites", tags=["Favorites"])
 
 
 @router.get("/")
 def list_favorites(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
 ):
     q = (
@@ -23,19 +24,27 @@ def list_favorites(
     return q.all()
 
 
-@router.get("/ids")
-def list_favorite_ids(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
+def _favorite_ids(db: Session, user_id: int) -> list[int]:
     rows = (
         db.query(Favorite.place_id)
-        .filter(Favorite.user_id == current_user.id)
+        .filter(Favorite.user_id == user_id)
         .all()
     )
     return [r[0] for r in rows]
 
 
+def _cookie_user_favorite_ids(db: Session, user_id: int) -> list[int]:
+    user = load_cookie_user(db, user_id)
+    return _favorite_ids(db, user.id)
+
+
+@router.get("/ids")
+async def list_favorite_ids(user_id: int = Depends(cookie_user_id)):
+    # (chamada em toda página com coração: usuário e favoritos na mesma
+    # sessão do run_read, sem o get_db sync no threadpool)
+    return await run_read(_cookie_user_favorite_ids, user_id)
+
+
 @router.post("/{place_id}", status_code=201)
 def add_favorite(
     place_id: int,
@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+
+from app.services.avatar_moderation import moderation_pool
 
 router = APIRouter(tags=["Health"])
 
@@ -6,3 +8,14 @@ router = APIRouter(tags=["Health"])
 def health():
     return {"status": "ok"}
 
+
+
+@router.get("/health/avatar")
+def health_avatar(response: Response):
+    """
+    Prontidão só do upload de avatar (pool + modelo NudeNet carregados).
+    503 enquanto o warm-up não terminou.
+    """
+    if not moderation_pool.ready:
+        response.status_code = 503
+    return {"status": moderation_pool.state}
@@ -0,0 +1,19 @@
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, Response
+
+from app.core.config import METRICS_TOKEN
+from app.core.metrics import CONTENT_TYPE_LATEST, render
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(authorization: str | None = Header(default=None)):
+    """
+    Formato texto do Prometheus. Com METRICS_TOKEN, exige
+    Authorization: Bearer <token> (o balanceador expõe a API inteira).
+    """
+    if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    return Response(render(), media_type=CONTENT_TYPE_LATEST)
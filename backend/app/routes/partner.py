@@ -9,21 +9,28 @@ from fastapi import (
     UploadFile,
     File,
     Form,
+    Request,
+    Response,
 )
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from pathlib import Path
-import uuid
 
 from app.db.session import get_db
-from app.core.security import decode_access_token
 
-from app.models.user import User
-from app.models.partner_profile import PartnerProfile
 from app.models.place import Place
 from app.models.place_accessibility import PlaceAccessibility
 from app.models.place_photo import PlacePhoto
 
 from app.schemas.place import PlaceCreateRequest
+from app.services.place_cache import invalidate_place
+from app.services.place_indexes import refresh_place_indexes
+from app.services.photo_variants import UPLOAD_DIR, PhotoRemoval, local_filename, media_url, photo_pipeline
+from app.services.stored_files import PHOTO, acquire, release
+from app.services.principals import resolve_token
+from app.models.place_photo_variant import PlacePhotoVariant
+from app.core.config import PHOTO_BATCH_MAX_FILES, PHOTO_MAX_BYTES
+from app.core.uploads import StagedUpload, save_upload, save_uploads
 
 router = APIRouter(prefix="/partner", tags=["Partner"])
 
@@ -38,34 +45,19 @@ def get_partner_context(
     if not vj_partner_token:
         raise HTTPException(status_code=401, detail="Não autenticado")
 
-    payload = decode_access_token(vj_partner_token)
+    principal = resolve_token(vj_partner_token, db)
 
-    user_ref = payload.get("uid") or payload.get("sub")
-    role = payload.get("role")
-
-    if not user_ref:
+    if not (principal.claims.get("uid") or principal.claims.get("sub")):
         raise HTTPException(status_code=401, detail="Token inválido")
 
-    if role != "partner":
+    if principal.claims.get("role") != "partner":
         raise HTTPException(status_code=403, detail="Acesso permitido apenas para parceiro")
 
-    if isinstance(user_ref, str) and "@" in user_ref:
-        user = db.query(User).filter(User.email == user_ref).first()
-    else:
-        try:
-            user_id = int(user_ref)
-        except Exception:
-            raise HTTPException(status_code=401, detail="Token inválido")
-        user = db.query(User).filter(User.id == user_id).first()
-
+    user = principal.user
     if not user:
         raise HTTPException(status_code=401, detail="Usuário não encontrado")
 
-    profile = (
-        db.query(PartnerProfile)
-        .filter(PartnerProfile.user_id == user.id)
-        .first()
-    )
+    profile = principal.partner_profile()
     if not profile:
         raise HTTPException(status_code=404, detail="Perfil de parceiro não encontrado")
 
@@ -142,6 +134,8 @@ def create_place(
     db.commit()
     db.refresh(place)
 
+    refresh_place_indexes(db, place)
+
     return {
         "place_id": place.id,
         "status": place.status,
@@ -151,6 +145,14 @@ def create_place(
 # =====================================================
 # UPLOAD REAL DE FOTO
 # =====================================================
+ALLOWED_PHOTO_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+INVALID_PHOTO_TYPE = "Formato inválido. Use JPG, PNG ou WEBP."
+
+
 @router.post("/places/{place_id}/photos", status_code=status.HTTP_201_CREATED)
 def upload_place_photo(
     place_id: int,
@@ -169,57 +171,50 @@ def upload_place_photo(
     if not place:
         raise HTTPException(status_code=404, detail="Local não encontrado")
 
-    allowed_types = {
-        "image/jpeg": "jpg",
-        "image/png": "png",
-        "image/webp": "webp",
-    }
-
-    if file.content_type not in allowed_types:
+    if file.content_type not in ALLOWED_PHOTO_TYPES:
         raise HTTPException(
             status_code=400,
-            detail="Formato inválido. Use JPG, PNG ou WEBP.",
+            detail=INVALID_PHOTO_TYPE,
         )
 
-    content = file.file.read()
-
-    if len(content) > 5 * 1024 * 1024:
-        raise HTTPException(
-            status_code=413,
-            detail="Imagem maior que 5MB",
-        )
+    ext = ALLOWED_PHOTO_TYPES[file.content_type]
 
-    ext = allowed_types[file.content_type]
+    # ✅ grava em blocos (sem ler tudo na memória); passou do limite -> 413
+    # nome = hash do conteúdo: mesmo arquivo reenviado não duplica no disco
+    staged = save_upload(file.file, UPLOAD_DIR, ext, PHOTO_MAX_BYTES)
+    url = media_url(staged.filename)
 
-    base_dir = Path(__file__).resolve().parents[1]  # app/
-    upload_dir = base_dir / "static" / "uploads"
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        acquire(db, PHOTO, staged.filename, staged.size)
+        staged.place()
 
-    filename = f"{uuid.uuid4().hex}.{ext}"
-    filepath = upload_dir / filename
+        if is_cover:
+            db.query(PlacePhoto).filter(
+                PlacePhoto.place_id == place_id,
+                PlacePhoto.is_cover == True,
+            ).update({"is_cover": False})
 
-    with open(filepath, "wb") as f:
-        f.write(content)
+            place.cover_image = url
 
-    url = f"http://127.0.0.1:8000/media/uploads/{filename}"
+        photo = PlacePhoto(
+            place_id=place_id,
+            url=url,
+            is_cover=is_cover,
+        )
 
-    if is_cover:
-        db.query(PlacePhoto).filter(
-            PlacePhoto.place_id == place_id,
-            PlacePhoto.is_cover == True,
-        ).update({"is_cover": False})
+        db.add(photo)
+        db.commit()
+    except BaseException:
+        staged.discard()
+        db.rollback()
+        raise
+    db.refresh(photo)
 
-        place.cover_image = url
+    # capa/fotos mudaram -> páginas em cache com este local ficam velhas
+    invalidate_place(place_id)
 
-    photo = PlacePhoto(
-        place_id=place_id,
-        url=url,
-        is_cover=is_cover,
-    )
-
-    db.add(photo)
-    db.commit()
-    db.refresh(photo)
+    # versões card/detail/full saem em segundo plano
+    photo_pipeline.enqueue(photo.id)
 
     return {
         "photo_id": photo.id,
@@ -228,6 +223,190 @@ def upload_place_photo(
     }
 
 
+async def _batch_photos_form(request: Request):
+    """
+    Form do upload em lote lido aqui (e não por File(...)) para passar
+    max_files ao parser: o arquivo além do limite é recusado (400) assim
+    que o cabeçalho dele chega, sem ir para o disco.
+    """
+    async with request.form(max_files=PHOTO_BATCH_MAX_FILES, max_fields=10) as form:
+        yield form
+
+
+@router.post(
+    "/places/{place_id}/photos/batch",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["files"],
+                        "properties": {
+                            "files": {"type": "array", "items": {"type": "string", "format": "binary"}},
+                            "cover_index": {"type": "integer"},
+                        },
+                    }
+                }
+            },
+            "required": True,
+        }
+    },
+)
+def upload_place_photos_batch(
+    place_id: int,
+    response: Response,
+    ctx=Depends(get_partner_context),
+    form=Depends(_batch_photos_form),
+    db: Session = Depends(get_db),
+):
+    """
+    Várias fotos num request só: auth e commit uma vez, arquivos gravados
+    em paralelo. Devolve o resultado de cada arquivo (um inválido não
+    derruba os outros). `cover_index`: posição do arquivo que vira capa.
+    """
+    user, profile = ctx
+
+    files = [f for f in form.getlist("files") if isinstance(f, StarletteUploadFile)]
+    if not files:
+        raise HTTPException(status_code=400, detail="Envie ao menos uma foto.")
+
+    cover_index = form.get("cover_index")
+    try:
+        cover_index = int(cover_index) if cover_index not in (None, "") else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="cover_index inválido.")
+
+    place = (
+        db.query(Place)
+        .filter(Place.id == place_id, Place.partner_id == user.id)
+        .first()
+    )
+    if not place:
+        raise HTTPException(status_code=404, detail="Local não encontrado")
+
+    results = [{"index": i, "filename": f.filename, "ok": False} for i, f in enumerate(files)]
+
+    # 1) valida o tipo e grava os válidos em paralelo (hash = nome)
+    to_save = []
+    for i, f in enumerate(files):
+        ext = ALLOWED_PHOTO_TYPES.get(f.content_type)
+        if ext is None:
+            results[i]["error"] = INVALID_PHOTO_TYPE
+        else:
+            to_save.append((i, f.file, ext))
+
+    saved = save_uploads([(src, ext) for _, src, ext in to_save], UPLOAD_DIR, PHOTO_MAX_BYTES)
+
+    stored: list[tuple[int, StagedUpload]] = []
+    for (i, _, _), out in zip(to_save, saved):
+        if isinstance(out, HTTPException):
+            results[i]["error"] = out.detail
+        else:
+            stored.append((i, out))
+
+    # 2) uma transação para todas as fotos
+    try:
+        is_cover_ok = any(i == cover_index for i, _ in stored)
+        if is_cover_ok:
+            db.query(PlacePhoto).filter(
+                PlacePhoto.place_id == place_id,
+                PlacePhoto.is_cover == True,
+            ).update({"is_cover": False})
+
+        photos: list[tuple[int, PlacePhoto]] = []
+        for i, staged in stored:
+            acquire(db, PHOTO, staged.filename, staged.size)
+            staged.place()
+            photo = PlacePhoto(place_id=place_id, url=media_url(staged.filename), is_cover=(i == cover_index))
+            db.add(photo)
+            photos.append((i, photo))
+            if photo.is_cover:
+                place.cover_image = photo.url
+
+        db.flush()  # ids sem precisar de refresh por foto depois do commit
+        for i, photo in photos:
+            results[i].update(ok=True, photo_id=photo.id, url=photo.url, is_cover=bool(photo.is_cover))
+        photo_ids = [photo.id for _, photo in photos]
+
+        db.commit()
+    except BaseException:
+        for _, staged in stored:
+            staged.discard()
+        db.rollback()
+        raise
+
+    if photo_ids:
+        invalidate_place(place_id)
+        for photo_id in photo_ids:
+            photo_pipeline.enqueue(photo_id)
+
+    created = len(photo_ids)
+    response.status_code = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+    return {
+        "created": created,
+        "failed": len(files) - created,
+        "results": results,
+    }
+
+
+@router.delete("/places/{place_id}/photos/{photo_id}")
+def delete_place_photo(
+    place_id: int,
+    photo_id: int,
+    ctx=Depends(get_partner_context),
+    db: Session = Depends(get_db),
+):
+    user, profile = ctx
+
+    place = (
+        db.query(Place)
+        .filter(Place.id == place_id, Place.partner_id == user.id)
+        .first()
+    )
+    if not place:
+        raise HTTPException(status_code=404, detail="Local não encontrado")
+
+    photo = (
+        db.query(PlacePhoto)
+        .filter(PlacePhoto.id == photo_id, PlacePhoto.place_id == place_id)
+        .first()
+    )
+    if not photo:
+        raise HTTPException(status_code=404, detail="Foto não encontrada")
+
+    if place.cover_image == photo.url:
+        place.cover_image = None
+
+    # nova versão do local no ETag (apagar uma foto antiga não muda a
+    # última foto nem a capa)
+    place.updated_at = func.now()
+
+    filename = local_filename(photo.url)
+    db.query(PlacePhotoVariant).filter(PlacePhotoVariant.photo_id == photo.id).delete(synchronize_session=False)
+    db.delete(photo)
+
+    # ✅ só apaga do disco se nenhuma outra foto usa o mesmo arquivo
+    unused = release(db, PHOTO, filename) if filename else False
+    removal = PhotoRemoval(filename) if unused else None
+    try:
+        if removal:
+            removal.stage()
+        db.commit()
+    except BaseException:
+        if removal:
+            removal.undo()
+        db.rollback()
+        raise
+
+    if removal:
+        removal.finish()
+
+    invalidate_place(place_id)
+
+    return {"ok": True}
+
+
 # =====================================================
 # ENVIAR PARA ANÁLISE
 # =====================================================
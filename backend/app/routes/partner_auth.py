@@ -2,8 +2,9 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request, Header
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.db.session import get_db
+from app.db.session import get_db, run_in_session
 from app.models.user import User
 from app.models.partner_profile import PartnerProfile
 
@@ -14,12 +15,9 @@ from app.schemas.partner import (
     PartnerUpdateRequest,
 )
 
-from app.core.security import (
-    hash_password,
-    verify_password,
-    create_access_token,
-    decode_access_token,
-)
+from app.core.security import create_access_token, password_pool
+from app.routes.auth import find_user_by_email, save_rehash
+from app.services.principals import invalidate_user, resolve_token
 
 router = APIRouter(prefix="/partner-auth", tags=["Partner Auth"])
 
@@ -60,16 +58,15 @@ def get_current_partner_user(
     if not token:
         raise HTTPException(status_code=401, detail="Não autenticado")
 
-    payload = decode_access_token(token)
-    user_id = payload.get("uid") or payload.get("sub")  # aceita uid/sub
-    role = payload.get("role")
+    principal = resolve_token(token, db)
+    claims = principal.claims  # aceita uid/sub
 
-    if not user_id:
+    if not (claims.get("uid") or claims.get("sub")):
         raise HTTPException(status_code=401, detail="Token inválido")
-    if role != "partner":
+    if claims.get("role") != "partner":
         raise HTTPException(status_code=403, detail="Acesso permitido apenas para parceiro")
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = principal.user
     if not user:
         raise HTTPException(status_code=401, detail="Usuário não encontrado")
 
@@ -77,8 +74,8 @@ def get_current_partner_user(
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register_partner(payload: PartnerRegisterRequest, db: Session = Depends(get_db)):
-    exists = db.query(User).filter(User.email == payload.email).first()
+async def register_partner(payload: PartnerRegisterRequest):
+    exists = await run_in_threadpool(run_in_session, find_user_by_email, payload.email)
     if exists:
         raise HTTPException(status_code=409, detail="E-mail já cadastrado")
 
@@ -86,34 +83,40 @@ def register_partner(payload: PartnerRegisterRequest, db: Session = Depends(get_
         nome=payload.nome,
         email=payload.email.lower().strip(),
         telefone=payload.telefone,
-        password_hash=hash_password(payload.senha),
+        password_hash=await password_pool.hash(payload.senha),
         role="partner",
     )
-    db.add(user)
-    db.flush()
-
-    profile = PartnerProfile(
-        user_id=user.id,
-        empresa_nome=payload.empresa_nome,
-        cnpj=payload.cnpj,
-        plano="free",
-        status="pendente",
-    )
-    db.add(profile)
-    db.commit()
-    db.refresh(profile)
 
-    return {"ok": True, "user_id": user.id, "partner_profile_id": profile.id}
+    def _save(db: Session) -> dict:
+        db.add(user)
+        db.flush()
+
+        profile = PartnerProfile(
+            user_id=user.id,
+            empresa_nome=payload.empresa_nome,
+            cnpj=payload.cnpj,
+            plano="free",
+            status="pendente",
+        )
+        db.add(profile)
+        db.commit()
+        db.refresh(profile)
+        return {"ok": True, "user_id": user.id, "partner_profile_id": profile.id}
+
+    return await run_in_threadpool(run_in_session, _save)
 
 
 @router.post("/login")
-def login_partner(payload: PartnerLoginRequest, response: Response, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email.lower().strip()).first()
+async def login_partner(payload: PartnerLoginRequest, response: Response):
+    user = await run_in_threadpool(run_in_session, find_user_by_email, payload.email.lower().strip())
     if not user or user.role != "partner":
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
 
-    if not verify_password(payload.senha, user.password_hash):
+    ok, new_hash = await password_pool.verify(payload.senha, user.password_hash)
+    if not ok:
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
+    if new_hash:
+        await run_in_threadpool(run_in_session, save_rehash, user.id, new_hash)
 
     # ✅ token separado do usuário normal: cookie próprio
     token = create_access_token({"uid": str(user.id), "role": "partner"})
@@ -166,6 +169,7 @@ def update_me(
     db.commit()
     db.refresh(current)
     db.refresh(profile)
+    invalidate_user(current.id)
 
     return {
         "id": current.id,
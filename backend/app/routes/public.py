@@ -1,18 +1,37 @@
 # app/routes/public.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Integer, any_, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from app.db.session import get_db
+from app.db.reads import run_read
+from app.db.replicas import on_replica, primary_pinned
+from app.core.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, clamp_limit, paginate_desc
+from app.core.http_cache import check_conditional, latest, make_etag
+from app.core import timing
 from app.models.place import Place
 from app.models.place_accessibility import PlaceAccessibility
 from app.models.place_photo import PlacePhoto
+from app.models.place_photo_variant import PlacePhotoVariant
 from app.models.review import Review
+from app.models.place_rating_summary import PlaceRatingSummary
 from app.models.user import User  # ✅ ADICIONADO
+from app.services.ratings import apply_review_change, get_rating_summaries
+from app.services.place_cache import PlacesPage, invalidate_place, listing_cache, listing_key
+from app.services.feature_index import feature_index, parse_features
+from app.services.search_index import search_index
+from app.services.published import published
+from app.services.avatar_storage import avatar_url
+from app.services.photo_variants import variant_urls
 
 router = APIRouter(prefix="/public", tags=["Public"])
 
+MAX_SEARCH_RESULTS = 50
+
 
 @router.get("/ping")
 def ping():
@@ -59,15 +78,233 @@ def _user_display_name(u: User, fallback_user_id: int | None = None) -> str:
     return "Usuário"
 
 
+# ============================
+# CONSULTAS EM LOTE (LISTAGEM)
+# ============================
+def _features_by_place(db: Session, ids: list[int]) -> dict[int, list[str]]:
+    """
+    Recursos acessíveis de vários locais em uma única query.
+    """
+    if not ids:
+        return {}
+
+    rows = (
+        db.query(PlaceAccessibility.place_id, PlaceAccessibility.feature_key)
+        .filter(PlaceAccessibility.place_id.in_(ids))
+        .order_by(PlaceAccessibility.place_id, PlaceAccessibility.id)
+        .all()
+    )
+
+    out: dict[int, list[str]] = {}
+    for pid, key in rows:
+        out.setdefault(pid, []).append(key)
+    return out
+
+
+def _cover_by_place(db: Session, ids: list[int]) -> dict[int, str]:
+    """
+    Foto capa de vários locais em uma única query.
+    Mesma regra da listagem antiga: is_cover primeiro, depois a mais recente.
+    Usa a versão "card" da foto quando já foi gerada.
+    """
+    if not ids:
+        return {}
+
+    rn = (
+        func.row_number()
+        .over(
+            partition_by=PlacePhoto.place_id,
+            order_by=(PlacePhoto.is_cover.desc(), PlacePhoto.created_at.desc()),
+        )
+        .label("rn")
+    )
+
+    ranked = (
+        db.query(PlacePhoto.place_id.label("place_id"), PlacePhoto.url.label("url"), rn)
+        .add_columns(PlacePhoto.id.label("photo_id"))
+        .filter(PlacePhoto.place_id.in_(ids))
+        .subquery()
+    )
+
+    rows = (
+        db.query(ranked.c.place_id, func.coalesce(PlacePhotoVariant.url, ranked.c.url))
+        .outerjoin(
+            PlacePhotoVariant,
+            (PlacePhotoVariant.photo_id == ranked.c.photo_id) & (PlacePhotoVariant.kind == "card"),
+        )
+        .filter(ranked.c.rn == 1)
+        .all()
+    )
+    return {pid: url for pid, url in rows}
+
+
+def _id_in(db: Session, column, ids: list[int]):
+    """
+    Filtro por uma lista de ids que pode ter milhares de itens (ex: saída
+    do índice de recursos). No Postgres vira `= ANY(:ids)`: um único
+    parâmetro (array), mesmo SQL qualquer que seja o tamanho da lista.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(bindparam("ids", ids, type_=ARRAY(Integer), unique=True))
+    return column.in_(ids)
+
+
+def _serialize_places(db: Session, places: list[Place]) -> list[dict]:
+    """
+    Card de local (Home / Explorar / Busca).
+    Dados agregados em lote: nº fixo de queries, sem N+1.
+    """
+    ids = [p.id for p in places]
+    features_map = _features_by_place(db, ids)
+    cover_map = _cover_by_place(db, ids)
+    rating_map = get_rating_summaries(db, ids)
+
+    serialize_started = time.perf_counter()
+    result = []
+    for p in places:
+        avg_rating, reviews_count = rating_map.get(p.id, (None, 0))
+
+        result.append(
+            {
+                "id": p.id,
+                "nome": p.nome,
+                "tipo": p.tipo,
+                "cidade": p.cidade,
+                "bairro": p.bairro,
+                "descricao": p.descricao,
+
+                # se não existir coluna verified, assume True (porque já é APPROVED)
+                "verified": bool(getattr(p, "verified", True)),
+
+                "cover_image": cover_map.get(p.id) or p.cover_image,
+
+                "features": features_map.get(p.id, []),
+                "avg_rating": float(avg_rating) if avg_rating else None,
+                "reviews_count": int(reviews_count) if reviews_count else 0,
+
+                "created_at": p.created_at.isoformat() if getattr(p, "created_at", None) else None,
+                "verified_at": getattr(p, "verified_at").isoformat() if getattr(p, "verified_at", None) else None,
+            }
+        )
+
+    timing.record("serialize", time.perf_counter() - serialize_started)
+    return result
+
+
+# ============================
+# VALIDADORES (ETag / Last-Modified)
+# ============================
+def _listing_validators(db: Session, ids: list[int], next_cursor: str | None, cache_key: tuple):
+    """
+    Versão da página a partir dos ids que ela contém (no máximo `limit`,
+    tudo por índice em place_id), numa única query: último update dos
+    locais, última foto + total de fotos (apagar uma antiga não muda a
+    última), versão gerada, última review (resumo) e os recursos de
+    acessibilidade (sem timestamp: total + maior id).
+    Filtros/cursor/limite, ids e próximo cursor entram no ETag.
+    """
+    if not ids:
+        return make_etag("places", *cache_key), None
+
+    updated, photo_at, photos_count, variant_at, rating_at, features_count, features_max_id = (
+        db.query(
+            db.query(func.max(Place.updated_at))
+            .filter(Place.id.in_(ids))
+            .scalar_subquery(),
+            db.query(func.max(PlacePhoto.created_at))
+            .filter(PlacePhoto.place_id.in_(ids))
+            .scalar_subquery(),
+            db.query(func.count(PlacePhoto.id))
+            .filter(PlacePhoto.place_id.in_(ids))
+            .scalar_subquery(),
+            db.query(func.max(PlacePhotoVariant.created_at))
+            .join(PlacePhoto, PlacePhoto.id == PlacePhotoVariant.photo_id)
+            .filter(PlacePhoto.place_id.in_(ids))
+            .scalar_subquery(),
+            db.query(func.max(PlaceRatingSummary.updated_at))
+            .filter(PlaceRatingSummary.place_id.in_(ids))
+            .scalar_subquery(),
+            db.query(func.count(PlaceAccessibility.id))
+            .filter(PlaceAccessibility.place_id.in_(ids))
+            .scalar_subquery(),
+            db.query(func.max(PlaceAccessibility.id))
+            .filter(PlaceAccessibility.place_id.in_(ids))
+            .scalar_subquery(),
+        )
+        .one()
+    )
+
+    last_modified = latest(updated, photo_at, variant_at, rating_at)
+    etag = make_etag(
+        "places", *cache_key, ",".join(map(str, ids)), next_cursor,
+        updated, photo_at, photos_count, variant_at, rating_at, features_count, features_max_id,
+    )
+    return etag, last_modified
+
+
+def _details_validators(db: Session, place: Place):
+    """
+    Versão do detalhe: update do local + última foto e total de fotos +
+    última review (resumo) + último avatar trocado entre quem avaliou (a URL
+    do avatar vai no corpo) + recursos de acessibilidade.
+    """
+    photo_at, photos_count, variant_at, rating_at, reviews_count, avatar_at, features_count, features_max_id = (
+        db.query(
+            db.query(func.max(PlacePhoto.created_at))
+            .filter(PlacePhoto.place_id == place.id)
+            .scalar_subquery(),
+            db.query(func.count(PlacePhoto.id))
+            .filter(PlacePhoto.place_id == place.id)
+            .scalar_subquery(),
+            db.query(func.max(PlacePhotoVariant.created_at))
+            .join(PlacePhoto, PlacePhoto.id == PlacePhotoVariant.photo_id)
+            .filter(PlacePhoto.place_id == place.id)
+            .scalar_subquery(),
+            db.query(PlaceRatingSummary.updated_at)
+            .filter(PlaceRatingSummary.place_id == place.id)
+            .scalar_subquery(),
+            db.query(func.count(Review.id))
+            .filter(Review.place_id == place.id)
+            .scalar_subquery(),
+            db.query(func.max(User.avatar_updated_at))
+            .join(Review, Review.user_id == User.id)
+            .filter(Review.place_id == place.id)
+            .scalar_subquery(),
+            db.query(func.count(PlaceAccessibility.id))
+            .filter(PlaceAccessibility.place_id == place.id)
+            .scalar_subquery(),
+            db.query(func.max(PlaceAccessibility.id))
+            .filter(PlaceAccessibility.place_id == place.id)
+            .scalar_subquery(),
+        )
+        .one()
+    )
+
+    last_modified = latest(place.updated_at, photo_at, variant_at, rating_at, avatar_at)
+    return (
+        make_etag(
+            "place", place.id, place.updated_at, photo_at, photos_count, variant_at, rating_at, reviews_count,
+            avatar_at, features_count, features_max_id,
+        ),
+        last_modified,
+    )
+
+
+
 # ============================
 # HOME / EXPLORAR LOCAIS
 # ============================
 @router.get("/places")
-def list_published_places(
+async def list_published_places(
+    request: Request,
+    response: Response,
     cidade: str | None = Query(default=None),
     tipo: str | None = Query(default=None),
     verified_first: bool = Query(default=True),
-    db: Session = Depends(get_db),
+    features: str | None = Query(default=None, description="recursos separados por vírgula"),
+    features_mode: str = Query(default="all", pattern="^(all|any)$"),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1),
 ):
     """
     Retorna apenas estabelecimentos PUBLICADOS.
@@ -75,11 +312,60 @@ def list_published_places(
 
     Publicado = status APPROVED
     + (se existir coluna verified) verified=True
+
+    Filtro de acessibilidade: ?features=rampa,banheiro_adaptado
+    - features_mode=all -> tem TODOS os recursos (padrão)
+    - features_mode=any -> tem ALGUM dos recursos
+
+    Paginado por cursor: a próxima página vem no header X-Next-Cursor.
+    Suporta GET condicional (ETag / If-None-Match -> 304).
+    Hit de cache não toca no banco; o resto roda em run_read (async se
+    DB_ASYNC_READS=1).
     """
 
     cidade = _norm(cidade)
     tipo = _norm(tipo)
+    wanted_features = parse_features(features)
+
+    # ✅ cache em memória (invalidado pelas rotas de escrita)
+    cache_key = listing_key(
+        cidade, tipo, verified_first, cursor, clamp_limit(limit), wanted_features, features_mode
+    )
+    # quem acabou de escrever lê do primário, sem passar pelo cache
+    cached = None if primary_pinned() else listing_cache.get(cache_key)
+    if cached is not None:
+        not_modified = check_conditional(
+            request, response, "public_places", cached.etag, cached.last_modified
+        )
+        if not_modified:
+            return not_modified
+
+        if cached.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cached.next_cursor
+        return cached.items
+
+    generation = listing_cache.generation
+    return await run_read(
+        _query_published_places,
+        request, response, cidade, tipo, verified_first, wanted_features, features_mode,
+        cursor, limit, cache_key, generation,
+    )
+
 
+def _query_published_places(
+    db: Session,
+    request: Request,
+    response: Response,
+    cidade: str | None,
+    tipo: str | None,
+    verified_first: bool,
+    wanted_features: list[str],
+    features_mode: str,
+    cursor: str | None,
+    limit: int,
+    cache_key: tuple,
+    generation: int,
+):
     # ✅ Base: somente aprovados
     q = db.query(Place).filter(Place.status == "APPROVED")
 
@@ -94,69 +380,77 @@ def list_published_places(
     if tipo and tipo.lower() != "todos":
         q = q.filter(func.lower(Place.tipo) == func.lower(tipo))
 
-    # ✅ ordenação
+    # ✅ recursos de acessibilidade via índice em memória (sem JOIN por linha)
+    if wanted_features:
+        feature_index.ensure_fresh(db)
+        q = q.filter(_id_in(db, Place.id, feature_index.match(wanted_features, features_mode)))
+
+    # ✅ ordenação + paginação por cursor (sem OFFSET)
     if verified_first and _has_col(Place, "verified"):
-        q = q.order_by(getattr(Place, "verified").desc(), Place.created_at.desc())
+        order_cols = [getattr(Place, "verified"), Place.created_at, Place.id]
     else:
-        q = q.order_by(Place.created_at.desc())
-
-    places = q.all()
-
-    result = []
-    for p in places:
-        # Recursos acessíveis
-        features = [
-            f.feature_key
-            for f in (
-                db.query(PlaceAccessibility)
-                .filter(PlaceAccessibility.place_id == p.id)
-                .all()
-            )
-        ]
-
-        # Foto capa
-        cover = (
-            db.query(PlacePhoto)
-            .filter(PlacePhoto.place_id == p.id)
-            .order_by(PlacePhoto.is_cover.desc(), PlacePhoto.created_at.desc())
-            .first()
-        )
-
-        # Média e quantidade de avaliações
-        avg_rating = (
-            db.query(func.avg(Review.rating))
-            .filter(Review.place_id == p.id)
-            .scalar()
-        )
+        order_cols = [Place.created_at, Place.id]
+
+    places = paginate_desc(q, order_cols, cursor, limit, response)
+    ids = [p.id for p in places]
+
+    # ✅ validadores só da página (1 query) -> 304 sem montar a lista
+    etag, last_modified = _listing_validators(db, ids, response.headers.get(NEXT_CURSOR_HEADER), cache_key)
+    not_modified = check_conditional(request, response, "public_places", etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    result = _serialize_places(db, places)
+
+    # réplica pode estar atrasada: só o primário alimenta o cache do processo
+    if on_replica(db):
+        return result
+
+    listing_cache.set(
+        cache_key,
+        PlacesPage(
+            items=result,
+            next_cursor=response.headers.get(NEXT_CURSOR_HEADER),
+            place_ids=frozenset(ids),
+            etag=etag,
+            last_modified=last_modified,
+        ),
+        generation=generation,
+    )
 
-        reviews_count = (
-            db.query(func.count(Review.id))
-            .filter(Review.place_id == p.id)
-            .scalar()
-        )
+    return result
 
-        result.append(
-            {
-                "id": p.id,
-                "nome": p.nome,
-                "tipo": p.tipo,
-                "cidade": p.cidade,
-                "bairro": p.bairro,
-                "descricao": p.descricao,
+# ============================
+# BUSCA TEXTUAL
+# ============================
+@router.get("/search")
+async def search_places(
+    q: str = Query(min_length=1, max_length=120),
+    limit: int = Query(default=20, ge=1),
+):
+    """
+    Busca por nome, descrição, bairro e tipo (sem acento, com prefixo).
+    Retorna os cards dos locais publicados, do mais relevante para o menos,
+    com o campo extra "score".
+    """
+    # run_read: índice vencido numa réplica refaz a busca no primário
+    return await run_read(_search_places, q, limit)
 
-                # se não existir coluna verified, assume True (porque já é APPROVED)
-                "verified": bool(getattr(p, "verified", True)),
 
-                "cover_image": cover.url if cover else p.cover_image,
+def _search_places(db: Session, q: str, limit: int):
+    search_index.ensure_fresh(db)
+    ranked = search_index.search(q, limit=min(limit, MAX_SEARCH_RESULTS))
+    if not ranked:
+        return []
 
-                "features": features,
-                "avg_rating": float(avg_rating) if avg_rating else None,
-                "reviews_count": int(reviews_count) if reviews_count else 0,
+    scores = dict(ranked)
+    places = published(db.query(Place)).filter(Place.id.in_(list(scores))).all()
 
-                "created_at": p.created_at.isoformat() if getattr(p, "created_at", None) else None,
-                "verified_at": getattr(p, "verified_at").isoformat() if getattr(p, "verified_at", None) else None,
-            }
-        )
+    # mantém a ordem do ranking
+    places.sort(key=lambda p: (-scores[p.id], -p.id))
+    result = _serialize_places(db, places)
+    for item in result:
+        item["score"] = round(scores[item["id"]], 4)
 
     return result
 
@@ -165,10 +459,15 @@ def list_published_places(
 # DETALHES DO LOCAL
 # ============================
 @router.get("/places/{place_id}")
-def get_place_details(place_id: int, db: Session = Depends(get_db)):
+async def get_place_details(place_id: int, request: Request, response: Response):
     """
     Detalhes de um local publicado + fotos + recursos + avaliações
+    Suporta GET condicional (ETag / If-None-Match -> 304).
     """
+    return await run_read(_place_details, place_id, request, response)
+
+
+def _place_details(db: Session, place_id: int, request: Request, response: Response):
     place = db.query(Place).filter(Place.id == place_id).first()
 
     if not place:
@@ -182,6 +481,12 @@ def get_place_details(place_id: int, db: Session = Depends(get_db)):
     if _has_col(place, "verified") and not bool(getattr(place, "verified", False)):
         raise HTTPException(status_code=403, detail="Local não aprovado/publicado")
 
+    # ✅ validadores baratos (1 query) -> 304 sem montar o detalhe
+    etag, last_modified = _details_validators(db, place)
+    not_modified = check_conditional(request, response, "public_place_details", etag, last_modified)
+    if not_modified:
+        return not_modified
+
     features = [
         f.feature_key
         for f in (
@@ -197,6 +502,10 @@ def get_place_details(place_id: int, db: Session = Depends(get_db)):
         .order_by(PlacePhoto.is_cover.desc(), PlacePhoto.created_at.desc())
         .all()
     )
+    variants = variant_urls(db, [ph.id for ph in photos])
+
+    def photo_url(ph: PlacePhoto, kind: str) -> str:
+        return variants.get(ph.id, {}).get(kind, ph.url)
 
     # ✅ Reviews + nome do usuário (JOIN)
     review_rows = (
@@ -207,19 +516,10 @@ def get_place_details(place_id: int, db: Session = Depends(get_db)):
         .all()
     )
 
-    avg_rating = (
-        db.query(func.avg(Review.rating))
-        .filter(Review.place_id == place.id)
-        .scalar()
-    )
+    avg_rating, reviews_count = get_rating_summaries(db, [place.id]).get(place.id, (None, 0))
 
-    reviews_count = (
-        db.query(func.count(Review.id))
-        .filter(Review.place_id == place.id)
-        .scalar()
-    )
-
-    return {
+    serialize_started = time.perf_counter()
+    details = {
         "id": place.id,
         "nome": place.nome,
         "tipo": place.tipo,
@@ -232,10 +532,18 @@ def get_place_details(place_id: int, db: Session = Depends(get_db)):
         "verified": bool(getattr(place, "verified", True)),
         "verified_at": getattr(place, "verified_at").isoformat() if getattr(place, "verified_at", None) else None,
 
-        "cover_image": (photos[0].url if photos else place.cover_image),
+        "cover_image": (photo_url(photos[0], "detail") if photos else place.cover_image),
 
         "features": features,
-        "photos": [{"url": ph.url, "is_cover": bool(ph.is_cover)} for ph in photos],
+        # url = versão "detail" (original enquanto não gerada); full_url = ampliação
+        "photos": [
+            {
+                "url": photo_url(ph, "detail"),
+                "full_url": photo_url(ph, "full"),
+                "is_cover": bool(ph.is_cover),
+            }
+            for ph in photos
+        ],
 
         "avg_rating": float(avg_rating) if avg_rating else None,
         "reviews_count": int(reviews_count) if reviews_count else 0,
@@ -246,6 +554,7 @@ def get_place_details(place_id: int, db: Session = Depends(get_db)):
                 "id": r.id,
                 "user_id": r.user_id,
                 "user_name": _user_display_name(u, fallback_user_id=r.user_id),
+                "user_avatar": avatar_url(u.avatar_filename, size=64),
                 "rating": r.rating,
                 "comment": r.comment,
                 "created_at": r.created_at.isoformat() if r.created_at else None,
@@ -253,6 +562,8 @@ def get_place_details(place_id: int, db: Session = Depends(get_db)):
             for (r, u) in review_rows
         ],
     }
+    timing.record("serialize", time.perf_counter() - serialize_started)
+    return details
 
 
 # ============================
@@ -304,6 +615,8 @@ def upsert_review(place_id: int, payload: dict, db: Session = Depends(get_db)):
         .first()
     )
 
+    old_rating = review.rating if review else None
+
     if review:
         review.rating = rating
         review.comment = comment
@@ -316,6 +629,12 @@ def upsert_review(place_id: int, payload: dict, db: Session = Depends(get_db)):
         )
         db.add(review)
 
+    # ✅ resumo de notas atualizado na mesma transação
+    apply_review_change(db, place_id, old_rating, rating)
+
     db.commit()
 
+    # nota média mudou -> páginas em cache com este local ficam velhas
+    invalidate_place(place_id)
+
     return {"message": "Avaliação salva com sucesso", "place_id": place_id, "user_id": user_id}
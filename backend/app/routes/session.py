@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Response, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.session import get_db
 from app.models.user import User
 
 router = APIRouter(prefix="/session", tags=["Session"])
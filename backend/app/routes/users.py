@@ -8,6 +8,7 @@ from app.schemas.user_update import UserUpdateRequest
 
 # Reaproveita seu auth (cookie + get_current_user)
 from app.routes.auth import get_current_user, COOKIE_NAME
+from app.services.principals import invalidate_user
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -63,4 +64,5 @@ def update_me(
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
     return user
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, computed_field
+
+from app.services.avatar_storage import avatar_url
+
 
 class UserPublic(BaseModel):
     id: int
@@ -7,5 +10,13 @@ class UserPublic(BaseModel):
     email: EmailStr
     role: str
 
+    avatar_filename: str | None = Field(default=None, exclude=True)
+
+    # ✅ URL imutável do avatar (128px); None se não tem
+    @computed_field
+    @property
+    def avatar_url(self) -> str | None:
+        return avatar_url(self.avatar_filename)
+
     class Config:
         from_attributes = True
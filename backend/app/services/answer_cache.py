@@ -0,0 +1,159 @@
+# app/services/answer_cache.py
+"""
+Cache das respostas geradas pelo Ollama no /chat.
+
+Chave: modelo do Ollama + intenção normalizada (tipo, bairro, cidade,
+recursos de acessibilidade pedidos) + ids dos locais em ordem + updated_at
+de cada um. Se algum local mudar (ou o modelo), a chave muda. Resposta
+vazia não entra no cache.
+
+- memória: LRU + TTL (app/core/cache.py)
+- persistência opcional (ANSWER_CACHE_PATH): arquivo SQLite local, para
+  sobreviver a restart e ser compartilhado entre workers da mesma máquina
+- contadores: hits, misses e tempo de geração economizado
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app.core.cache import TTLCache
+from app.core.config import ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_PATH, ANSWER_CACHE_TTL_SECONDS, OLLAMA_MODEL
+from app.core.text import norm
+
+
+def answer_key(
+    tipo: str | None,
+    bairro: str | None,
+    cidade: str | None,
+    places,
+    features=(),
+    model: str = OLLAMA_MODEL,
+) -> str:
+    """
+    `places`: objetos Place na ordem em que vão para o prompt.
+    `features`: recursos de acessibilidade pedidos na mensagem.
+    """
+    raw = json.dumps(
+        [
+            model,
+            norm(tipo or ""),
+            norm(bairro or ""),
+            norm(cidade or ""),
+            sorted({norm(f) for f in features}),
+            [[p.id, p.updated_at.isoformat() if p.updated_at else None] for p in places],
+        ],
+        separators=(",", ":"),
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        path: str = ANSWER_CACHE_PATH,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.path = path or None
+
+        self._memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds, name="chat_answers")
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS answers ("
+                    " key TEXT PRIMARY KEY,"
+                    " answer TEXT NOT NULL,"
+                    " gen_seconds REAL NOT NULL,"
+                    " created_at REAL NOT NULL)"
+                )
+
+    @contextmanager
+    def _connect(self):
+        # uma conexão por operação: seguro entre threads e processos
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:  # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self, key: str) -> tuple[str, float] | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT answer, gen_seconds, created_at FROM answers WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if not row:
+            return None
+        answer, gen_seconds, created_at = row
+        if time.time() - created_at > self.ttl_seconds:
+            return None
+        return answer, gen_seconds
+
+    def get(self, key: str) -> str | None:
+        item = self._memory.get(key)
+
+        if item is None and self.path:
+            try:
+                item = self._load(key)
+            except sqlite3.Error:
+                item = None
+            if item is not None:
+                self._memory.set(key, item)
+
+        with self._lock:
+            if item is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += item[1]
+
+        return item[0]
+
+    def set(self, key: str, answer: str, gen_seconds: float) -> None:
+        if not answer:
+            # geração vazia (ex: Ollama fechou o stream sem texto): tenta de novo na próxima
+            return
+
+        self._memory.set(key, (answer, gen_seconds))
+
+        if self.path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO answers (key, answer, gen_seconds, created_at)"
+                        " VALUES (?, ?, ?, ?)",
+                        (key, answer, gen_seconds, time.time()),
+                    )
+                    conn.execute(
+                        "DELETE FROM answers WHERE created_at < ?",
+                        (time.time() - self.ttl_seconds,),
+                    )
+            except sqlite3.Error:
+                # persistência é opcional: falha não derruba o chat
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "generation_seconds_saved": round(self.saved_seconds, 3),
+                "persistent": bool(self.path),
+                "memory": self._memory.stats(),
+            }
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,343 @@
+# app/services/avatar_moderation.py
+"""
+Sanitização + moderação (NudeNet) dos avatares fora do event loop.
+
+- o trabalho pesado (Pillow + inferência ONNX) roda num pool de PROCESSOS
+  (AVATAR_WORKERS); cada processo carrega o seu próprio NudeDetector
+  uma única vez (initializer do pool)
+- fila limitada: no máximo AVATAR_WORKERS + AVATAR_MAX_QUEUE uploads em
+  andamento; acima disso o upload recebe 503 (ModerationBusy)
+- variantes de tamanho (64/128/512, JPEG + WebP) geradas no mesmo worker
+- métricas por etapa: espera na fila, sanitização, detecção e total
+
+Pillow / OpenCV / NudeNet são importados só dentro dos workers: o
+processo da API não carrega nada disso. Com AVATAR_WARMUP=1 o startup
+dispara warm_up() em segundo plano (sobe os workers e o modelo); até lá
+só o avatar fica "não pronto" (GET /health/avatar), o resto da API já
+responde.
+"""
+import asyncio
+import io
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core import timing
+from app.core.metrics import counter, histogram
+from app.core.config import AVATAR_MAX_QUEUE, AVATAR_WORKERS
+from app.services.avatar_storage import AVATAR_SIZES
+
+MAX_W, MAX_H = 1024, 1024
+MAX_SOURCE_SIDE = 6000
+
+BLOCKED_LABELS = {
+    "EXPOSED_BREAST_F", "EXPOSED_BREAST_M",
+    "EXPOSED_GENITALIA_F", "EXPOSED_GENITALIA_M",
+    "EXPOSED_BUTTOCKS", "EXPOSED_ANUS",
+}
+BLOCK_SCORE = 0.60
+
+
+class InvalidImage(ValueError):
+    """Arquivo não pôde ser tratado como imagem (vira 400 na rota)."""
+
+
+class ModerationBusy(Exception):
+    """Fila de moderação cheia (vira 503 na rota)."""
+
+
+# =====================================================
+# Lado do WORKER (roda dentro dos processos do pool)
+# =====================================================
+_detector = None
+
+
+def _init_worker() -> None:
+    # dependências pesadas só são importadas/carregadas dentro do pool
+    global _detector
+    import cv2  # noqa: F401
+    import numpy  # noqa: F401
+    from PIL import Image  # noqa: F401
+    from nudenet import NudeDetector
+
+    _detector = NudeDetector()
+
+
+def _ping() -> bool:
+    # tarefa vazia: força o processo a subir (e rodar _init_worker)
+    return _detector is not None
+
+
+def sanitize_and_reencode(raw: bytes) -> tuple[bytes, dict[str, bytes]]:
+    """
+    - valida se abre como imagem
+    - limita dimensões
+    - remove EXIF/metadados
+    - re-encode para JPEG seguro
+    - gera as variantes de tamanho: {"64.jpg": ..., "64.webp": ..., ...}
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        img = Image.open(io.BytesIO(raw))
+        img.verify()  # valida estrutura
+    except Exception:
+        raise InvalidImage("Arquivo não é uma imagem válida.")
+
+    # reabrir após verify
+    img = Image.open(io.BytesIO(raw))
+    img = ImageOps.exif_transpose(img)  # corrige rotação sem manter EXIF
+
+    w, h = img.size
+    # “anti-bomba”: evita imagens absurdas
+    if w > MAX_SOURCE_SIDE or h > MAX_SOURCE_SIDE:
+        raise InvalidImage("Dimensões inválidas (muito grande).")
+
+    img.thumbnail((MAX_W, MAX_H))
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    out = io.BytesIO()
+    # ✅ JPEG “sanitiza”: remove transparência e metadados
+    img.save(out, format="JPEG", quality=88, optimize=True, progressive=True)
+
+    variants: dict[str, bytes] = {}
+    for size in AVATAR_SIZES:
+        small = img.copy()
+        small.thumbnail((size, size), Image.LANCZOS)
+        for fmt, opts in (
+            ("jpg", {"format": "JPEG", "quality": 85, "optimize": True, "progressive": True}),
+            ("webp", {"format": "WEBP", "quality": 80, "method": 4}),
+        ):
+            buf = io.BytesIO()
+            small.save(buf, **opts)
+            variants[f"{size}.{fmt}"] = buf.getvalue()
+
+    return out.getvalue(), variants
+
+
+def is_explicit_nudenet(image_jpeg_bytes: bytes) -> bool:
+    """
+    NudeNet retorna lista de detecções com label + score.
+    Bloqueia se detectar labels de nudez/sexual com score >= 0.60
+    """
+    import cv2
+    import numpy as np
+
+    np_arr = np.frombuffer(image_jpeg_bytes, dtype=np.uint8)
+    bgr = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise InvalidImage("Imagem inválida (decode falhou).")
+
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    detections = _detector.detect(rgb)
+
+    for d in detections or []:
+        label = (d.get("class") or "").upper()
+        score = float(d.get("score") or 0.0)
+        if label in BLOCKED_LABELS and score >= BLOCK_SCORE:
+            return True
+
+    return False
+
+
+def process_avatar(raw: bytes) -> tuple[bytes, dict[str, bytes], bool, dict[str, float]]:
+    """
+    Executado no worker: (jpeg limpo, variantes, é explícito?, tempos por etapa).
+    """
+    t0 = time.perf_counter()
+    cleaned, variants = sanitize_and_reencode(raw)
+    t1 = time.perf_counter()
+    explicit = is_explicit_nudenet(cleaned)
+    t2 = time.perf_counter()
+    if explicit:
+        variants = {}  # não precisa trafegar o que não vai ser salvo
+    return cleaned, variants, explicit, {"sanitize": t1 - t0, "detect": t2 - t1}
+
+
+# =====================================================
+# Lado da API (processo do uvicorn)
+# =====================================================
+MODERATION_SECONDS = histogram(
+    "avatar_moderation_seconds",
+    "Moderação do avatar por etapa (detect = inferência do NudeNet)",
+    ("stage",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+MODERATION_REJECTED = counter("avatar_moderation_rejected", "Uploads de avatar recusados pela moderação", ("reason",))
+
+
+class ModerationStats:
+    """
+    Latência por etapa (qtd, média, máx) + rejeições por fila cheia.
+    """
+
+    STAGES = ("queue_wait", "sanitize", "detect", "total")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.busy_rejections = 0
+        self.errors = 0
+        self._total = {s: 0.0 for s in self.STAGES}
+        self._max = {s: 0.0 for s in self.STAGES}
+
+    def record(self, timings: dict[str, float]) -> None:
+        with self._lock:
+            self.calls += 1
+            for stage, seconds in timings.items():
+                self._total[stage] += seconds
+                self._max[stage] = max(self._max[stage], seconds)
+        for stage, seconds in timings.items():
+            MODERATION_SECONDS.labels(stage).observe(seconds)
+
+    def record_busy(self) -> None:
+        with self._lock:
+            self.busy_rejections += 1
+        MODERATION_REJECTED.labels("busy").inc()
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+        MODERATION_REJECTED.labels("error").inc()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "busy_rejections": self.busy_rejections,
+                "errors": self.errors,
+                "stages": {
+                    s: {
+                        "avg_seconds": (self._total[s] / self.calls) if self.calls else None,
+                        "max_seconds": self._max[s],
+                    }
+                    for s in self.STAGES
+                },
+            }
+
+
+class ModerationPool:
+    def __init__(self, workers: int = AVATAR_WORKERS, max_queue: int = AVATAR_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_in_flight = self.workers + max(0, max_queue)
+
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+        self.stats = ModerationStats()
+
+        # "cold" -> "warming" -> "ready" (ou "failed")
+        self.state = "cold"
+        self.warmup_seconds: float | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # spawn: processo limpo (sem threads/conexões herdadas do uvicorn)
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self.stats.record_busy()
+                raise ModerationBusy("Muitos uploads em processamento. Tente novamente em instantes.")
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, raw: bytes) -> tuple[bytes, dict[str, bytes], bool]:
+        """
+        Sanitiza + modera no pool. Levanta InvalidImage ou ModerationBusy.
+        """
+        self._acquire()
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                cleaned, variants, explicit, timings = await loop.run_in_executor(
+                    self._get_executor(), process_avatar, raw
+                )
+            except BrokenProcessPool:
+                # worker morreu (ex: falta de memória no ONNX): recria no próximo uso
+                self.stats.record_error()
+                self.shutdown(wait=False)
+                raise ModerationBusy("Moderação indisponível. Tente novamente em instantes.")
+            except InvalidImage:
+                raise
+            except Exception:
+                self.stats.record_error()
+                raise
+        finally:
+            self._release()
+
+        total = time.perf_counter() - started
+        timings["queue_wait"] = max(0.0, total - timings["sanitize"] - timings["detect"])
+        timings["total"] = total
+        self.stats.record(timings)
+        timing.record("image", total)
+        if self.state in ("cold", "failed"):
+            # sem warm-up: o primeiro upload já subiu o pool
+            self.state = "ready"
+        return cleaned, variants, explicit
+
+    async def warm_up(self) -> None:
+        """
+        Sobe todos os workers (e o NudeDetector de cada um) sem esperar o
+        primeiro upload. Chamado em segundo plano no startup.
+        """
+        if self.state in ("warming", "ready"):
+            return
+        self.state = "warming"
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            # uma tarefa por worker: cada processo sobe e carrega o modelo
+            await asyncio.gather(
+                *[loop.run_in_executor(executor, _ping) for _ in range(self.workers)]
+            )
+        except Exception:
+            self.state = "failed"
+            self.stats.record_error()
+            return
+        self.warmup_seconds = time.perf_counter() - started
+        self.state = "ready"
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self.state = "cold"
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            started = self._executor is not None
+        return {
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": in_flight,
+            "pool_started": started,
+            "state": self.state,
+            "warmup_seconds": self.warmup_seconds,
+            **self.stats.snapshot(),
+        }
+
+
+moderation_pool = ModerationPool()
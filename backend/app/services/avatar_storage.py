@@ -0,0 +1,119 @@
+# app/services/avatar_storage.py
+"""
+Arquivos de avatar em disco e as URLs públicas de cada tamanho.
+
+O nome é o sha256 da imagem sanitizada (<stem>.jpg, gravado em
+User.avatar_filename; avatares antigos têm nome uuid) e, a partir dele,
+as variantes:
+
+    <stem>.jpg          imagem sanitizada (até 1024px)
+    <stem>_64.jpg   <stem>_64.webp
+    <stem>_128.jpg  <stem>_128.webp
+    <stem>_512.jpg  <stem>_512.webp
+
+O nome depende só do conteúdo, então o conteúdo de uma URL nunca muda:
+GET /avatars/<arquivo> responde com Cache-Control immutable. A mesma
+imagem usada por vários usuários fica uma vez só no disco (stored_files).
+
+Gravar e apagar seguem o mesmo esquema em duas fases das fotos
+(core/uploads.py): stage_avatar() grava .part antes da transação e
+place() põe no lugar depois do acquire(); AvatarRemoval tira do lugar
+antes do commit e apaga depois.
+"""
+import re
+import uuid
+from pathlib import Path
+
+from app.core.uploads import StagedRemoval, StagedUpload
+
+# ✅ pasta fora do StaticFiles: os arquivos saem só por GET /avatars/{name},
+#    que aceita apenas nomes no formato gerado aqui (hash do conteúdo)
+AVATAR_DIR = Path("storage/avatars")
+AVATAR_DIR.mkdir(parents=True, exist_ok=True)
+
+AVATAR_SIZES = (64, 128, 512)
+AVATAR_FORMATS = ("jpg", "webp")
+DEFAULT_SIZE = 128
+
+MEDIA_TYPES = {"jpg": "image/jpeg", "webp": "image/webp"}
+
+# nome aceito na rota pública (evita path traversal e nomes arbitrários)
+_NAME_RE = re.compile(r"^(?P<stem>[0-9a-f]{64}|[0-9a-f]{32})(?:_(?P<size>\d+))?\.(?P<fmt>jpg|webp)$")
+
+
+def variant_name(filename: str, size: int | None = None, fmt: str = "jpg") -> str:
+    stem = Path(filename).stem
+    return f"{stem}_{size}.{fmt}" if size else f"{stem}.{fmt}"
+
+
+def avatar_url(filename: str | None, size: int = DEFAULT_SIZE, fmt: str = "jpg") -> str | None:
+    if not filename:
+        return None
+    return f"/avatars/{variant_name(filename, size, fmt)}"
+
+
+def parse_name(name: str) -> tuple[str, int | None, str] | None:
+    """
+    "<stem>_128.webp" -> (stem, 128, "webp"). None se o nome não é válido.
+    """
+    m = _NAME_RE.match(name)
+    if not m:
+        return None
+    size = int(m["size"]) if m["size"] else None
+    if size is not None and size not in AVATAR_SIZES:
+        return None
+    return m["stem"], size, m["fmt"]
+
+
+class StagedAvatar:
+    """
+    Imagem + variantes já gravadas como .part (StagedUpload por arquivo).
+    """
+
+    def __init__(self, files: list[StagedUpload]):
+        self.files = files
+
+    def place(self) -> None:
+        for f in self.files:
+            f.place()
+
+    def discard(self) -> None:
+        for f in self.files:
+            f.discard()
+
+
+def stage_avatar(filename: str, original: bytes, variants: dict[str, bytes]) -> StagedAvatar:
+    """
+    `variants`: {"128.webp": bytes, ...} (gerado no pool de moderação).
+    Grava tudo em .part, fora do lugar; o chamador faz place() depois do
+    acquire() e discard() se algo falhar antes do commit.
+    """
+    stem = Path(filename).stem
+    contents = [(filename, original)] + [(f"{stem}_{key}", data) for key, data in variants.items()]
+    staged = StagedAvatar([])
+    try:
+        for name, data in contents:
+            tmp = AVATAR_DIR / f"{uuid.uuid4().hex}.part"
+            staged.files.append(StagedUpload(filename=name, size=len(data), tmp=tmp, dest=AVATAR_DIR / name))
+            tmp.write_bytes(data)
+    except BaseException:
+        staged.discard()
+        raise
+    return staged
+
+
+def avatar_files(filename: str) -> list[Path]:
+    paths = [AVATAR_DIR / filename]
+    for size in AVATAR_SIZES:
+        for fmt in AVATAR_FORMATS:
+            paths.append(AVATAR_DIR / variant_name(filename, size, fmt))
+    return paths
+
+
+class AvatarRemoval(StagedRemoval):
+    """
+    Imagem + variantes de um avatar (stage antes do commit, finish depois).
+    """
+
+    def __init__(self, filename: str):
+        super().__init__(avatar_files(filename))
@@ -0,0 +1,167 @@
+# app/services/chat_sessions.py
+"""
+Estado das conversas do /chat (tipo, bairro, cidade por session_id).
+
+Backends (CHAT_SESSION_BACKEND):
+- "memory": LRU + TTL no próprio processo (padrão, dev)
+- "sqlite": arquivo SQLite local, compartilhado entre os workers do uvicorn
+
+Em ambos, sessão parada por mais de CHAT_SESSION_TTL_SECONDS expira e o
+total é limitado a CHAT_SESSION_MAX_ENTRIES (remove as mais antigas).
+"""
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from app.core.cache import TTLCache
+from app.core.config import (
+    CHAT_SESSION_BACKEND,
+    CHAT_SESSION_MAX_ENTRIES,
+    CHAT_SESSION_PATH,
+    CHAT_SESSION_TTL_SECONDS,
+)
+
+
+class SessionStore(ABC):
+    """
+    Interface: load() devolve uma cópia do estado (ou None), save() grava.
+    """
+
+    @abstractmethod
+    def load(self, session_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def save(self, session_id: str, state: dict) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        # guarda JSON: load() sempre devolve cópia e o tamanho é fácil de medir
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds, name="chat_sessions")
+
+    def load(self, session_id: str) -> dict | None:
+        raw = self._cache.get(session_id)
+        return json.loads(raw) if raw is not None else None
+
+    def save(self, session_id: str, state: dict) -> None:
+        # cada save renova o TTL (expira por inatividade)
+        self._cache.set(session_id, json.dumps(state, ensure_ascii=False))
+
+    def stats(self) -> dict:
+        self._cache.purge_expired()
+        cache = self._cache.stats()
+        return {
+            "backend": "memory",
+            "sessions": cache["entries"],
+            "approx_bytes": sum(len(v) for v in self._cache.values()),
+            "expired": cache["expirations"],
+            "evicted": cache["evictions"],
+        }
+
+
+class SQLiteSessionStore(SessionStore):
+    _PURGE_EVERY = 200  # saves
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._saves = 0
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_sessions ("
+                " session_id TEXT PRIMARY KEY,"
+                " state TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_chat_sessions_updated_at"
+                " ON chat_sessions (updated_at)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # uma conexão por operação: seguro entre threads e processos
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:  # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, session_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM chat_sessions WHERE session_id = ? AND updated_at > ?",
+                (session_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id: str, state: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chat_sessions (session_id, state, updated_at)"
+                " VALUES (?, ?, ?)",
+                (session_id, json.dumps(state, ensure_ascii=False), time.time()),
+            )
+
+        with self._lock:
+            self._saves += 1
+            purge = self._saves % self._PURGE_EVERY == 0
+        if purge:
+            self.purge()
+
+    def purge(self) -> None:
+        """
+        Remove sessões expiradas e as mais antigas acima do limite.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM chat_sessions WHERE updated_at <= ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            conn.execute(
+                "DELETE FROM chat_sessions WHERE session_id IN ("
+                " SELECT session_id FROM chat_sessions"
+                " ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            count, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(state)), 0) FROM chat_sessions"
+                " WHERE updated_at > ?",
+                (time.time() - self.ttl_seconds,),
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            "sessions": count,
+            "approx_bytes": size,
+        }
+
+
+def create_session_store() -> SessionStore:
+    if CHAT_SESSION_BACKEND == "sqlite":
+        return SQLiteSessionStore(
+            CHAT_SESSION_PATH,
+            max_entries=CHAT_SESSION_MAX_ENTRIES,
+            ttl_seconds=CHAT_SESSION_TTL_SECONDS,
+        )
+    return MemorySessionStore(
+        max_entries=CHAT_SESSION_MAX_ENTRIES,
+        ttl_seconds=CHAT_SESSION_TTL_SECONDS,
+    )
+
+
+chat_sessions = create_session_store()
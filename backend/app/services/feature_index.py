@@ -0,0 +1,250 @@
+# app/services/feature_index.py
+"""
+Índice em memória dos recursos de acessibilidade dos locais publicados.
+
+- cada feature_key ganha um bit (até 64 recursos)
+- cada local publicado tem um inteiro (bitmask uint64) com os bits dos
+  seus recursos, guardado num array numpy junto com o id do local
+- AND/OR viram uma operação vetorizada sobre o array:
+  (mask & want) == want  /  (mask & want) != 0
+  bem abaixo de 1 ms mesmo com 100k locais
+
+Atualização incremental: create_place e aprovar/reprovar chamam
+refresh_place(). Como cada worker tem o seu índice, ele também é
+reconstruído do banco de tempos em tempos (FEATURE_INDEX_MAX_AGE_SECONDS):
+
+- um rebuild por vez (quem chega com o índice vencido usa o atual)
+- refresh_place incrementa uma geração; rebuild que leu o banco antes de
+  um refresh descarta a leitura e lê de novo (senão a troca do índice
+  apagaria o local recém-aprovado/reprovado)
+"""
+import threading
+import time
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import FEATURE_INDEX_MAX_AGE_SECONDS
+from app.db.replicas import PrimaryRequired, on_replica
+from app.models.place import Place
+from app.models.place_accessibility import PlaceAccessibility
+from app.services.published import published, is_published
+
+_INITIAL_CAPACITY = 1024
+_MAX_FEATURES = 64
+_REBUILD_ATTEMPTS = 3
+
+
+def normalize_feature(key: str | None) -> str:
+    return (key or "").strip().lower()
+
+
+class FeatureIndex:
+    def __init__(self, max_age_seconds: float = FEATURE_INDEX_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()  # um rebuild por vez
+        self._generation = 0  # +1 a cada refresh_place
+        self._reset()
+
+    def _reset(self) -> None:
+        self._bits: dict[str, int] = {}      # feature_key -> bit
+        self._slots: dict[int, int] = {}     # place_id -> posição nos arrays
+        self._free: list[int] = []           # posições liberadas (reuso)
+        self._ids = np.full(_INITIAL_CAPACITY, -1, dtype=np.int64)
+        self._masks = np.zeros(_INITIAL_CAPACITY, dtype=np.uint64)
+        self._size = 0
+        self._built_at: float | None = None
+
+    # ---------- construção ----------
+    def _bit_for(self, key: str) -> int | None:
+        bit = self._bits.get(key)
+        if bit is None:
+            if len(self._bits) >= _MAX_FEATURES:
+                # vocabulário de recursos é pequeno; acima disso ignora a chave
+                return None
+            bit = len(self._bits)
+            self._bits[key] = bit
+        return bit
+
+    def _slot_for(self, place_id: int) -> int:
+        slot = self._slots.get(place_id)
+        if slot is not None:
+            return slot
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._size == len(self._ids):
+                grow = len(self._ids)
+                self._ids = np.concatenate([self._ids, np.full(grow, -1, dtype=np.int64)])
+                self._masks = np.concatenate([self._masks, np.zeros(grow, dtype=np.uint64)])
+            slot = self._size
+            self._size += 1
+
+        self._slots[place_id] = slot
+        self._ids[slot] = place_id
+        return slot
+
+    def _set_place(self, place_id: int, keys) -> None:
+        mask = 0
+        for key in keys:
+            bit = self._bit_for(normalize_feature(key)) if normalize_feature(key) else None
+            if bit is not None:
+                mask |= 1 << bit
+
+        slot = self._slot_for(place_id)
+        self._masks[slot] = mask
+
+    def _remove_place(self, place_id: int) -> None:
+        slot = self._slots.pop(place_id, None)
+        if slot is None:
+            return
+        self._ids[slot] = -1
+        self._masks[slot] = 0
+        self._free.append(slot)
+
+    def _load(self, db: Session) -> dict[int, list[str]]:
+        published_ids = [pid for (pid,) in published(db.query(Place.id)).all()]
+
+        rows = published(
+            db.query(PlaceAccessibility.place_id, PlaceAccessibility.feature_key)
+            .join(Place, Place.id == PlaceAccessibility.place_id)
+        ).all()
+
+        features: dict[int, list[str]] = {pid: [] for pid in published_ids}
+        for pid, key in rows:
+            features.setdefault(pid, []).append(key)
+        return features
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Recarrega o índice inteiro do banco (2 queries por tentativa).
+        """
+        for attempt in range(_REBUILD_ATTEMPTS):
+            generation = self._generation
+            features = self._load(db)
+
+            with self._lock:
+                if generation != self._generation and attempt < _REBUILD_ATTEMPTS - 1:
+                    continue  # refresh_place no meio da leitura: lê de novo
+                if generation != self._generation and self._built_at is not None:
+                    # refresh a cada tentativa: o índice atual já está em dia
+                    self._built_at = time.monotonic()
+                    return
+                self._reset()
+                for pid, keys in features.items():
+                    self._set_place(pid, keys)
+                self._built_at = time.monotonic()
+                return
+
+    def _stale(self) -> bool:
+        built_at = self._built_at
+        return built_at is None or time.monotonic() - built_at > self.max_age_seconds
+
+    def ensure_fresh(self, db: Session) -> None:
+        """
+        Reconstrói se vencido, só a partir do primário: numa réplica levanta
+        PrimaryRequired (run_read refaz a leitura no primário).
+        """
+        if not self._stale():
+            return
+        if on_replica(db):
+            raise PrimaryRequired()
+
+        if not self._rebuild_lock.acquire(blocking=False):
+            if self._built_at is not None:
+                return  # outra request já está reconstruindo: usa o atual
+            # primeira carga: não espera o lock (leituras async rodam em
+            # greenlets na thread do event loop; esperar travaria o loop)
+            self.rebuild(db)
+            return
+        try:
+            if self._stale():
+                self.rebuild(db)
+        finally:
+            self._rebuild_lock.release()
+
+    def refresh_place(self, db: Session, place: Place) -> None:
+        """
+        Atualiza um local no índice (publicado -> entra, senão -> sai).
+        """
+        if self._built_at is None:
+            # índice ainda não carregado: será montado no primeiro uso
+            # (um rebuild em andamento precisa saber que leu dado velho)
+            with self._lock:
+                self._generation += 1
+            return
+
+        live = is_published(place)
+        keys = []
+        if live:
+            keys = [
+                key
+                for (key,) in db.query(PlaceAccessibility.feature_key)
+                .filter(PlaceAccessibility.place_id == place.id)
+                .all()
+            ]
+        with self._lock:
+            self._generation += 1
+            if live:
+                self._set_place(place.id, keys)
+            else:
+                self._remove_place(place.id)
+
+    # ---------- consulta ----------
+    def match(self, features: list[str], mode: str = "all") -> list[int]:
+        """
+        Ids dos locais publicados com os recursos pedidos.
+        mode="all": tem TODOS (AND) | mode="any": tem ALGUM (OR)
+        """
+        keys = {normalize_feature(f) for f in features if normalize_feature(f)}
+
+        with self._lock:
+            bits = [self._bits.get(k) for k in keys]
+
+            if mode == "all" and (not bits or any(b is None for b in bits)):
+                return []
+
+            want = 0
+            for b in bits:
+                if b is not None:
+                    want |= 1 << b
+            if not want:
+                return []
+
+            masks = self._masks[: self._size]
+            want = np.uint64(want)
+
+            if mode == "any":
+                hit = (masks & want) != 0
+            else:
+                hit = (masks & want) == want
+
+            return self._ids[: self._size][hit].tolist()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "places": len(self._slots),
+                "features": len(self._bits),
+                "age_seconds": (time.monotonic() - self._built_at) if self._built_at else None,
+            }
+
+
+feature_index = FeatureIndex()
+
+
+def parse_features(raw: str | None) -> list[str]:
+    """
+    "rampa, banheiro_adaptado" -> ["rampa", "banheiro_adaptado"]
+    """
+    if not raw:
+        return []
+    out = []
+    for part in raw.split(","):
+        key = normalize_feature(part)
+        if key and key not in out:
+            out.append(key)
+    return out
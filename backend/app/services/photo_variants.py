@@ -0,0 +1,233 @@
+# app/services/photo_variants.py
+"""
+Versões otimizadas para a web das fotos dos locais.
+
+O upload só grava o original (em blocos) e enfileira o processamento;
+um pool de threads (PHOTO_WORKERS) gera, a partir do original:
+
+    card    480px   listagem (Home / Explorar / Busca / chat)
+    detail  1280px  página do local
+    full    2048px  ampliação
+
+Tudo em WebP, sem EXIF, registrado em place_photo_variants. Enquanto as
+versões não ficam prontas, as rotas usam a URL do original.
+Fila limitada (PHOTO_WORKERS + PHOTO_MAX_QUEUE): cheia, a foto fica só
+com o original até o backfill (python -m scripts.photos variants).
+Originais são guardados pelo hash do conteúdo (ver stored_files): fotos
+com o mesmo arquivo reaproveitam as versões já geradas.
+(Pillow libera o GIL no decode/resize/encode: threads bastam aqui.)
+"""
+import io
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.core.config import PHOTO_MAX_QUEUE, PHOTO_WORKERS
+from app.core.uploads import StagedRemoval
+from app.db.session import SessionLocal
+from app.models.place_photo import PlacePhoto
+from app.models.place_photo_variant import PlacePhotoVariant
+from app.services.place_cache import invalidate_place
+
+UPLOAD_DIR = Path(__file__).resolve().parents[1] / "static" / "uploads"
+VARIANT_DIR = UPLOAD_DIR / "variants"
+MEDIA_BASE_URL = "http://127.0.0.1:8000/media/uploads"
+
+# maior lado (px), do maior para o menor: cada um sai do anterior
+VARIANT_SIZES = {"full": 2048, "detail": 1280, "card": 480}
+WEBP_QUALITY = {"full": 82, "detail": 80, "card": 75}
+
+
+def media_url(filename: str) -> str:
+    return f"{MEDIA_BASE_URL}/{filename}"
+
+
+def local_filename(url: str | None) -> str | None:
+    """
+    Nome do original em UPLOAD_DIR. None para URL externa (ex: cover_image
+    informado pelo parceiro).
+    """
+    if not url or not url.startswith(MEDIA_BASE_URL + "/"):
+        return None
+    name = url[len(MEDIA_BASE_URL) + 1:]
+    return name if "/" not in name else None
+
+
+def _variant_filename(original: str, kind: str) -> str:
+    return f"{Path(original).stem}_{kind}.webp"
+
+
+class PhotoRemoval(StagedRemoval):
+    """
+    Original + versões de uma foto (stage antes do commit, finish depois).
+    """
+
+    def __init__(self, filename: str):
+        super().__init__([UPLOAD_DIR / filename] + [VARIANT_DIR / _variant_filename(filename, k) for k in VARIANT_SIZES])
+
+
+def render_variants(original: Path) -> dict[str, tuple[bytes, int, int]]:
+    """
+    {kind: (webp, largura, altura)}
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(original) as src:
+        # JPEG: decodifica já reduzido (bem mais rápido para fotos de celular)
+        biggest = max(VARIANT_SIZES.values())
+        src.draft("RGB", (biggest, biggest))
+
+        img = ImageOps.exif_transpose(src)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        out = {}
+        for kind, side in VARIANT_SIZES.items():
+            img = img.copy()
+            img.thumbnail((side, side), Image.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, format="WEBP", quality=WEBP_QUALITY[kind], method=4)
+            out[kind] = (buf.getvalue(), img.width, img.height)
+        return out
+
+
+def generate_variants(db: Session, photo: PlacePhoto) -> bool:
+    """
+    Gera e registra as versões de uma foto. False se o original não é
+    um arquivo local.
+    """
+    name = local_filename(photo.url)
+    if name is None or not (UPLOAD_DIR / name).exists():
+        return False
+
+    existing = {
+        v.kind: v
+        for v in db.query(PlacePhotoVariant).filter(PlacePhotoVariant.photo_id == photo.id).all()
+    }
+
+    # mesmo arquivo já processado para outra foto: só copia os registros
+    shared = (
+        db.query(PlacePhotoVariant)
+        .join(PlacePhoto, PlacePhoto.id == PlacePhotoVariant.photo_id)
+        .filter(PlacePhoto.url == photo.url, PlacePhoto.id != photo.id)
+        .all()
+    )
+    shared_by_kind = {v.kind: v for v in shared}
+    if set(shared_by_kind) == set(VARIANT_SIZES) and all(
+        (VARIANT_DIR / _variant_filename(name, k)).exists() for k in VARIANT_SIZES
+    ):
+        for kind, src in shared_by_kind.items():
+            row = existing.get(kind) or PlacePhotoVariant(photo_id=photo.id, kind=kind)
+            row.url, row.width, row.height, row.size_bytes = src.url, src.width, src.height, src.size_bytes
+            db.add(row)
+        return True
+
+    rendered = render_variants(UPLOAD_DIR / name)
+
+    VARIANT_DIR.mkdir(parents=True, exist_ok=True)
+    for kind, (data, width, height) in rendered.items():
+        filename = _variant_filename(name, kind)
+        (VARIANT_DIR / filename).write_bytes(data)
+
+        row = existing.get(kind) or PlacePhotoVariant(photo_id=photo.id, kind=kind)
+        row.url = media_url(f"variants/{filename}")
+        row.width = width
+        row.height = height
+        row.size_bytes = len(data)
+        db.add(row)
+
+    return True
+
+
+def variant_urls(db: Session, photo_ids: list[int]) -> dict[int, dict[str, str]]:
+    """
+    {photo_id: {kind: url}} para as fotos que já têm versões (1 query).
+    """
+    if not photo_ids:
+        return {}
+    rows = (
+        db.query(PlacePhotoVariant.photo_id, PlacePhotoVariant.kind, PlacePhotoVariant.url)
+        .filter(PlacePhotoVariant.photo_id.in_(photo_ids))
+        .all()
+    )
+    out: dict[int, dict[str, str]] = {}
+    for pid, kind, url in rows:
+        out.setdefault(pid, {})[kind] = url
+    return out
+
+
+# =====================================================
+# Pool (fora da request)
+# =====================================================
+class PhotoPipeline:
+    def __init__(self, workers: int = PHOTO_WORKERS, max_queue: int = PHOTO_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_pending = self.workers + max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="photo-variants")
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.done = 0
+        self.failed = 0
+        self.dropped = 0
+        self.seconds_total = 0.0
+        self.last_error: str | None = None
+
+    def _run(self, photo_id: int) -> None:
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            photo = db.get(PlacePhoto, photo_id)
+            if photo is None:
+                return  # foto apagada antes do processamento
+            generated = generate_variants(db, photo)
+            db.commit()
+            if generated:
+                invalidate_place(photo.place_id)
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self.failed += 1
+                self.last_error = f"photo {photo_id}: {e!r}"
+            return
+        finally:
+            db.close()
+            with self._lock:
+                self.queued -= 1
+
+        with self._lock:
+            self.done += 1
+            self.seconds_total += time.perf_counter() - started
+
+    def enqueue(self, photo_id: int) -> Future | None:
+        """
+        None = fila cheia: a foto segue com o original (sem versões).
+        """
+        with self._lock:
+            if self.queued >= self.max_pending:
+                self.dropped += 1
+                return None
+            self.queued += 1
+        return self._executor.submit(self._run, photo_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self.queued,
+                "max_pending": self.max_pending,
+                "done": self.done,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "avg_seconds": (self.seconds_total / self.done) if self.done else None,
+                "last_error": self.last_error,
+            }
+
+
+photo_pipeline = PhotoPipeline()
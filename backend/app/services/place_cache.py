@@ -0,0 +1,80 @@
+# app/services/place_cache.py
+"""
+Cache da listagem pública (GET /public/places).
+
+Chave: filtros normalizados (cidade, tipo, recursos) + cursor + limite.
+Valor: PlacesPage (itens + próximo cursor + ids para invalidar + ETag).
+
+Invalidação precisa:
+- aprovar/reprovar um local  -> páginas cujos filtros (cidade/tipo) batem com o local
+- foto nova / review nova    -> só páginas que contêm aquele local
+"""
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.cache import TTLCache
+from app.core.config import PLACES_CACHE_MAX_ENTRIES, PLACES_CACHE_TTL_SECONDS
+
+listing_cache = TTLCache(
+    max_entries=PLACES_CACHE_MAX_ENTRIES,
+    ttl_seconds=PLACES_CACHE_TTL_SECONDS,
+    name="places",
+)
+
+
+@dataclass(frozen=True)
+class PlacesPage:
+    items: list
+    next_cursor: str | None
+    place_ids: frozenset
+    etag: str
+    last_modified: datetime | None
+
+
+def _key_part(s: str | None, wildcard: str | None = None) -> str | None:
+    """
+    Mesma normalização do filtro na rota: vazio = sem filtro; `wildcard`
+    (só o tipo aceita "todos") também. Qualquer outro valor filtra.
+    """
+    if not s:
+        return None
+    s = s.strip().lower()
+    if not s or s == wildcard:
+        return None
+    return s
+
+
+def listing_key(cidade, tipo, verified_first, cursor, limit, features=(), features_mode="all") -> tuple:
+    return (
+        _key_part(cidade),
+        _key_part(tipo, wildcard="todos"),
+        bool(verified_first),
+        cursor or None,
+        int(limit),
+        tuple(sorted(features)),
+        features_mode if features else None,
+    )
+
+
+def invalidate_place(place_id: int) -> int:
+    """
+    Dados de um local mudaram (foto, review) -> remove páginas que o contêm.
+    """
+    return listing_cache.invalidate_where(lambda key, page: place_id in page.place_ids)
+
+
+def invalidate_listing_for(cidade: str | None, tipo: str | None) -> int:
+    """
+    Um local entrou/saiu da listagem -> remove páginas cujos filtros o incluiriam.
+    Filtro None na chave = "todos".
+    """
+    cidade = _key_part(cidade)
+    tipo = _key_part(tipo, wildcard="todos")
+
+    def matches(key, page):
+        key_cidade, key_tipo = key[0], key[1]
+        return (key_cidade is None or key_cidade == cidade) and (
+            key_tipo is None or key_tipo == tipo
+        )
+
+    return listing_cache.invalidate_where(matches)
@@ -0,0 +1,15 @@
+# app/services/place_indexes.py
+from sqlalchemy.orm import Session
+
+from app.models.place import Place
+from app.services.feature_index import feature_index
+from app.services.search_index import search_index
+
+
+def refresh_place_indexes(db: Session, place: Place) -> None:
+    """
+    Chamar depois do commit de qualquer rota que muda status/dados/recursos
+    de um local (criar, aprovar, reprovar).
+    """
+    feature_index.refresh_place(db, place)
+    search_index.refresh_place(place)
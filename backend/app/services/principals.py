@@ -0,0 +1,197 @@
+# app/services/principals.py
+"""
+Quem está logado: resolução única para todas as dependências de auth.
+
+Sem cache, cada request autenticada decodifica o JWT e faz SELECT em
+users (+ partner_profiles para o parceiro). Aqui o resultado fica num
+cache curto (por processo), com chave = sha256 da credencial:
+
+- valor: claims do token + colunas do User (+ do PartnerProfile, se
+  alguém já pediu); nada de objeto ORM preso a uma sessão antiga
+- no hit, o User/PartnerProfile é montado a partir das colunas e
+  anexado à sessão da request SEM SQL (merge load=False): a rota pode
+  alterar e dar commit normalmente
+- TTL de poucos segundos (PRINCIPAL_CACHE_TTL_SECONDS); token que vence
+  antes disso não entra no cache
+- quem altera usuário / perfil / role chama invalidate_user(user_id)
+- leitura feita numa réplica (run_read) não entra no cache: réplica
+  atrasada regravaria o usuário de antes da invalidação
+"""
+import hashlib
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS
+from app.core.security import decode_access_token
+from app.db.replicas import on_replica
+from app.models.partner_profile import PartnerProfile
+from app.models.user import User
+
+principal_cache = TTLCache(
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principals",
+)
+
+_NO_PROFILE = "none"  # parceiro sem perfil (também fica no cache)
+
+
+def _key(kind: str, credential: str) -> tuple[str, str]:
+    return kind, hashlib.sha256(credential.encode("utf-8")).hexdigest()
+
+
+def _columns(obj) -> dict:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _attach(db: Session, model, values: dict):
+    """
+    Objeto persistente na sessão a partir das colunas em cache (sem SELECT).
+    Se a sessão já tem esse registro, usa o dela.
+    """
+    identity = inspect(model).identity_key_from_primary_key([values["id"]])
+    existing = db.identity_map.get(identity)
+    if existing is not None:
+        return existing
+
+    obj = model(**values)
+    make_transient_to_detached(obj)  # "como se tivesse vindo de uma query"
+    return db.merge(obj, load=False)
+
+
+def _user_refs(claims: dict) -> list[tuple[str, str | int]]:
+    """
+    Em ordem de tentativa: uid -> id; sub -> e-mail (usuário comum) ou id
+    (tokens antigos de parceiro). uid que não existe mais (ex: usuário
+    recriado) cai no sub, como o contexto de admin sempre fez.
+    """
+    refs: list[tuple[str, str | int]] = []
+    uid = claims.get("uid")
+    if uid:
+        try:
+            refs.append(("id", int(uid)))
+        except (TypeError, ValueError):
+            pass
+
+    sub = claims.get("sub")
+    if sub:
+        sub = str(sub).strip()
+        if "@" in sub:
+            refs.append(("email", sub.lower()))
+        else:
+            try:
+                refs.append(("id", int(sub)))
+            except ValueError:
+                pass
+    return list(dict.fromkeys(refs))
+
+
+def _load_user(db: Session, refs: list[tuple[str, str | int]]) -> User | None:
+    for field, value in refs:
+        column = User.id if field == "id" else User.email
+        user = db.query(User).filter(column == value).first()
+        if user is not None:
+            return user
+    return None
+
+
+def _cacheable(claims: dict) -> bool:
+    exp = claims.get("exp")
+    return not exp or exp - time.time() > principal_cache.ttl_seconds
+
+
+class Principal:
+    """
+    claims: payload do JWT ({} = token inválido)
+    user:   User anexado à sessão da request (None = não encontrado)
+    """
+
+    __slots__ = ("claims", "user", "_entry", "_db", "_key", "_generation")
+
+    def __init__(
+        self,
+        claims: dict,
+        user: User | None,
+        entry: dict | None,
+        db: Session,
+        key: tuple[str, str] | None = None,
+        generation: int | None = None,
+    ):
+        self.claims = claims
+        self.user = user
+        self._entry = entry
+        self._db = db
+        self._key = key  # None = entry não está no cache
+        self._generation = generation
+
+    def partner_profile(self) -> PartnerProfile | None:
+        if self.user is None:
+            return None
+
+        cached = self._entry.get("profile") if self._entry is not None else None
+        if cached == _NO_PROFILE:
+            return None
+        if cached is not None:
+            return _attach(self._db, PartnerProfile, cached)
+
+        profile = (
+            self._db.query(PartnerProfile)
+            .filter(PartnerProfile.user_id == self.user.id)
+            .first()
+        )
+        if self._entry is not None:
+            # dict novo: o do cache é compartilhado entre threads e nunca é
+            # alterado; invalidação desde o resolve_token descarta o set
+            self._entry = {**self._entry, "profile": _columns(profile) if profile else _NO_PROFILE}
+            if self._key is not None:
+                principal_cache.set(self._key, self._entry, generation=self._generation)
+        return profile
+
+
+def resolve_token(token: str, db: Session) -> Principal:
+    """
+    JWT (cookie ou Bearer) -> Principal. Cada dependência aplica as
+    próprias regras (role no token, role no banco, perfil...).
+    """
+    key = _key("jwt", token)
+    generation = principal_cache.generation
+    entry = principal_cache.get(key)
+    if entry is not None:
+        return Principal(entry["claims"], _attach(db, User, entry["user"]), entry, db, key, generation)
+
+    claims = decode_access_token(token)
+    user = _load_user(db, _user_refs(claims)) if claims else None
+    if user is None:
+        return Principal(claims, None, None, db)
+
+    entry = {"claims": claims, "user": _columns(user)}
+    if not _cacheable(claims) or on_replica(db):
+        return Principal(claims, user, entry, db)
+    principal_cache.set(key, entry, generation=generation)
+    return Principal(claims, user, entry, db, key, generation)
+
+
+def resolve_user_id(user_id: int, db: Session) -> User | None:
+    """
+    Cookie legado user_id (app/dependencies.py).
+    """
+    key = _key("uid", str(user_id))
+    entry = principal_cache.get(key)
+    if entry is not None:
+        return _attach(db, User, entry["user"])
+
+    generation = principal_cache.generation
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None and not on_replica(db):
+        principal_cache.set(key, {"claims": {}, "user": _columns(user)}, generation=generation)
+    return user
+
+
+def invalidate_user(user_id: int) -> int:
+    """
+    Chamar depois de alterar o usuário, o perfil de parceiro ou a role.
+    """
+    return principal_cache.invalidate_where(lambda _k, entry: entry["user"]["id"] == user_id)
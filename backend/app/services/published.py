@@ -0,0 +1,17 @@
+# app/services/published.py
+"""
+Regra única de "local publicado" usada pelos índices em memória.
+Publicado = status APPROVED + (se existir coluna verified) verified=True
+"""
+from app.models.place import Place
+
+
+def published(q):
+    q = q.filter(Place.status == "APPROVED")
+    if hasattr(Place, "verified"):
+        q = q.filter(Place.verified.is_(True))
+    return q
+
+
+def is_published(place) -> bool:
+    return place.status == "APPROVED" and bool(getattr(place, "verified", True))
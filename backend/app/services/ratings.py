@@ -0,0 +1,202 @@
+# app/services/ratings.py
+
+from sqlalchemy import func, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.review import Review
+from app.models.place_rating_summary import PlaceRatingSummary
+
+STAR_COLUMNS = {
+    1: "stars_1",
+    2: "stars_2",
+    3: "stars_3",
+    4: "stars_4",
+    5: "stars_5",
+}
+
+
+def _seed_summary_row(db: Session, place_id: int) -> bool:
+    """
+    Cria a linha de resumo do local a partir da tabela reviews
+    (ex: local antigo, antes do backfill).
+
+    Retorna False se a linha já existia ou se outra request criou antes;
+    usa savepoint para não derrubar a transação nesse caso.
+    """
+    exists = (
+        db.query(PlaceRatingSummary.place_id)
+        .filter(PlaceRatingSummary.place_id == place_id)
+        .first()
+    )
+    if exists:
+        return False
+
+    # inclui a review pendente desta transação no cálculo
+    db.flush()
+    data = _raw_summaries(db, [place_id]).get(place_id, {})
+
+    try:
+        with db.begin_nested():
+            db.add(PlaceRatingSummary(place_id=place_id, **data))
+    except IntegrityError:
+        # outra request criou a linha no meio do caminho (sem ver esta review)
+        return False
+
+    return True
+
+
+def apply_review_change(
+    db: Session,
+    place_id: int,
+    old_rating: int | None,
+    new_rating: int | None,
+) -> None:
+    """
+    Atualiza o resumo na MESMA transação da review (não faz commit).
+
+    - review nova:      old_rating=None, new_rating=N
+    - review alterada:  old_rating=A,    new_rating=B
+    - review removida:  old_rating=A,    new_rating=None
+
+    O UPDATE é feito com expressões (col = col + 1), então duas requests
+    simultâneas não perdem incrementos.
+
+    Mesmo sem mudar a nota (só o comentário), updated_at é atualizado:
+    ele é a "versão" das reviews do local usada no ETag.
+    """
+    if _seed_summary_row(db, place_id):
+        # linha nova já reflete esta review
+        return
+
+    values = {"updated_at": func.now()}
+
+    count_delta = (1 if new_rating is not None else 0) - (1 if old_rating is not None else 0)
+    sum_delta = (new_rating or 0) - (old_rating or 0)
+
+    if count_delta:
+        values["reviews_count"] = PlaceRatingSummary.reviews_count + count_delta
+    if sum_delta:
+        values["rating_sum"] = PlaceRatingSummary.rating_sum + sum_delta
+
+    if old_rating != new_rating:
+        # nota fora de 1–5 (review antiga, sem validação) entra no total e na
+        # soma mas em nenhuma coluna de estrelas, igual ao _raw_summaries
+        old_col = STAR_COLUMNS.get(old_rating)
+        new_col = STAR_COLUMNS.get(new_rating)
+        if old_col:
+            values[old_col] = getattr(PlaceRatingSummary, old_col) - 1
+        if new_col:
+            values[new_col] = getattr(PlaceRatingSummary, new_col) + 1
+
+    (
+        db.query(PlaceRatingSummary)
+        .filter(PlaceRatingSummary.place_id == place_id)
+        .update(values, synchronize_session=False)
+    )
+
+
+def get_rating_summaries(db: Session, ids: list[int]) -> dict[int, tuple]:
+    """
+    Média e quantidade de avaliações lidas do resumo (uma query).
+    Retorna {place_id: (avg_rating, reviews_count)}.
+
+    Locais sem linha de resumo (ex: antes do backfill) caem no cálculo
+    direto sobre reviews, só para esses ids.
+    """
+    if not ids:
+        return {}
+
+    rows = (
+        db.query(
+            PlaceRatingSummary.place_id,
+            PlaceRatingSummary.rating_sum,
+            PlaceRatingSummary.reviews_count,
+        )
+        .filter(PlaceRatingSummary.place_id.in_(ids))
+        .all()
+    )
+
+    out: dict[int, tuple] = {}
+    for pid, rating_sum, count in rows:
+        avg = (rating_sum / count) if count else None
+        out[pid] = (avg, count)
+
+    missing = [pid for pid in ids if pid not in out]
+    if missing:
+        raw = (
+            db.query(Review.place_id, func.avg(Review.rating), func.count(Review.id))
+            .filter(Review.place_id.in_(missing))
+            .group_by(Review.place_id)
+            .all()
+        )
+        for pid, avg, count in raw:
+            out[pid] = (avg, count)
+
+    return out
+
+
+def _raw_summaries(db: Session, ids: list[int] | None = None) -> dict[int, dict]:
+    """
+    Recalcula o resumo direto da tabela reviews (todos os locais ou só `ids`).
+    """
+    star_cols = [
+        func.sum(case((Review.rating == star, 1), else_=0)).label(col)
+        for star, col in STAR_COLUMNS.items()
+    ]
+
+    q = db.query(
+        Review.place_id,
+        func.count(Review.id).label("reviews_count"),
+        func.sum(Review.rating).label("rating_sum"),
+        *star_cols,
+    )
+    if ids is not None:
+        q = q.filter(Review.place_id.in_(ids))
+
+    rows = q.group_by(Review.place_id).all()
+
+    out = {}
+    for row in rows:
+        data = row._asdict()
+        pid = data.pop("place_id")
+        out[pid] = {k: int(v or 0) for k, v in data.items()}
+    return out
+
+
+def rebuild_summaries(db: Session) -> int:
+    """
+    Backfill / rebuild: reescreve a tabela de resumo a partir de reviews.
+    Retorna quantos locais ficaram com resumo. Faz commit.
+    """
+    raw = _raw_summaries(db)
+
+    db.query(PlaceRatingSummary).delete(synchronize_session=False)
+    for pid, data in raw.items():
+        db.add(PlaceRatingSummary(place_id=pid, **data))
+
+    db.commit()
+    return len(raw)
+
+
+def check_summaries(db: Session) -> list[dict]:
+    """
+    Compara o resumo com a tabela reviews.
+    Retorna a lista de divergências (vazia = consistente).
+    """
+    raw = _raw_summaries(db)
+    fields = ["reviews_count", "rating_sum", *STAR_COLUMNS.values()]
+    empty = {f: 0 for f in fields}
+
+    stored = {}
+    for s in db.query(PlaceRatingSummary).all():
+        stored[s.place_id] = {f: int(getattr(s, f) or 0) for f in fields}
+
+    problems = []
+    for pid in sorted(set(raw) | set(stored)):
+        expected = raw.get(pid, empty)
+        actual = stored.get(pid, empty)
+        if expected != actual:
+            problems.append({"place_id": pid, "expected": expected, "actual": actual})
+
+    return problems
@@ -0,0 +1,284 @@
+# app/services/search_index.py
+"""
+Busca textual dos locais publicados (índice invertido em memória).
+
+- tokenização com norm() -> sem acento / minúsculas ("Café" acha "cafe")
+- campos indexados: nome, descricao, bairro, tipo (com pesos diferentes)
+- prefixo: "restaur" acha "restaurante"
+- todos os termos da busca precisam aparecer (AND); ranking por
+  peso do campo x raridade do termo (idf)
+
+Atualização incremental: aprovar/reprovar chama refresh_place().
+Como cada worker tem o seu índice, ele também é reconstruído do banco
+de tempos em tempos (SEARCH_INDEX_MAX_AGE_SECONDS), com as mesmas regras
+do feature_index: um rebuild por vez e geração contra refresh perdido.
+"""
+import bisect
+import math
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy.orm import Session
+
+from app.core.config import SEARCH_INDEX_MAX_AGE_SECONDS
+from app.core.text import tokenize
+from app.db.replicas import PrimaryRequired, on_replica
+from app.models.place import Place
+from app.services.published import published, is_published
+
+FIELD_WEIGHTS = {
+    "nome": 3.0,
+    "tipo": 2.0,
+    "bairro": 2.0,
+    "descricao": 1.0,
+}
+
+PREFIX_FACTOR = 0.7   # termo achado só por prefixo vale menos
+MIN_PREFIX_LEN = 3
+_REBUILD_ATTEMPTS = 3
+
+
+class SearchIndex:
+    def __init__(self, max_age_seconds: float = SEARCH_INDEX_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()  # um rebuild por vez
+        self._generation = 0  # +1 a cada refresh_place
+        self._reset()
+
+    def _reset(self) -> None:
+        # token -> {place_id: peso somado dos campos onde aparece}
+        self._postings: dict[str, dict[int, float]] = {}
+        # campo -> token -> {place_id}  (para filtros por campo, ex: chat)
+        self._field_postings: dict[str, dict[str, set[int]]] = {f: {} for f in FIELD_WEIGHTS}
+        # place_id -> tokens do local (para remover)
+        self._docs: dict[int, dict[str, list[str]]] = {}
+        # vocabulário ordenado (busca por prefixo)
+        self._vocab: list[str] = []
+        self._built_at: float | None = None
+
+    # ---------- construção ----------
+    def _add_doc(self, place_id: int, fields: dict[str, str | None]) -> None:
+        self._remove_doc(place_id)
+
+        doc: dict[str, list[str]] = {}
+        weights: Counter = Counter()
+
+        for field, weight in FIELD_WEIGHTS.items():
+            tokens = tokenize(fields.get(field))
+            doc[field] = tokens
+            for tok in set(tokens):
+                weights[tok] += weight
+                self._field_postings[field].setdefault(tok, set()).add(place_id)
+
+        for tok, weight in weights.items():
+            posting = self._postings.get(tok)
+            if posting is None:
+                posting = self._postings[tok] = {}
+                bisect.insort(self._vocab, tok)
+            posting[place_id] = weight
+
+        self._docs[place_id] = doc
+
+    def _remove_doc(self, place_id: int) -> None:
+        doc = self._docs.pop(place_id, None)
+        if not doc:
+            return
+
+        for field, tokens in doc.items():
+            for tok in set(tokens):
+                ids = self._field_postings[field].get(tok)
+                if ids is not None:
+                    ids.discard(place_id)
+                    if not ids:
+                        del self._field_postings[field][tok]
+
+                posting = self._postings.get(tok)
+                if posting is not None:
+                    posting.pop(place_id, None)
+                    if not posting:
+                        del self._postings[tok]
+                        i = bisect.bisect_left(self._vocab, tok)
+                        if i < len(self._vocab) and self._vocab[i] == tok:
+                            self._vocab.pop(i)
+
+    @staticmethod
+    def _fields_of(place) -> dict[str, str | None]:
+        return {f: getattr(place, f, None) for f in FIELD_WEIGHTS}
+
+    def _load(self, db: Session) -> list:
+        return published(
+            db.query(Place.id, Place.nome, Place.tipo, Place.bairro, Place.descricao)
+        ).all()
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Recarrega o índice inteiro do banco (1 query por tentativa).
+        """
+        for attempt in range(_REBUILD_ATTEMPTS):
+            generation = self._generation
+            rows = self._load(db)
+
+            with self._lock:
+                if generation != self._generation and attempt < _REBUILD_ATTEMPTS - 1:
+                    continue  # refresh_place no meio da leitura: lê de novo
+                if generation != self._generation and self._built_at is not None:
+                    # refresh a cada tentativa: o índice atual já está em dia
+                    self._built_at = time.monotonic()
+                    return
+                self._reset()
+                for row in rows:
+                    self._add_doc(row.id, self._fields_of(row))
+                self._built_at = time.monotonic()
+                return
+
+    def _stale(self) -> bool:
+        built_at = self._built_at
+        return built_at is None or time.monotonic() - built_at > self.max_age_seconds
+
+    def ensure_fresh(self, db: Session) -> None:
+        """
+        Reconstrói se vencido, só a partir do primário: numa réplica levanta
+        PrimaryRequired (run_read refaz a leitura no primário).
+        """
+        if not self._stale():
+            return
+        if on_replica(db):
+            raise PrimaryRequired()
+
+        if not self._rebuild_lock.acquire(blocking=False):
+            if self._built_at is not None:
+                return  # outra request já está reconstruindo: usa o atual
+            # primeira carga: não espera o lock (leituras async rodam em
+            # greenlets na thread do event loop; esperar travaria o loop)
+            self.rebuild(db)
+            return
+        try:
+            if self._stale():
+                self.rebuild(db)
+        finally:
+            self._rebuild_lock.release()
+
+    def refresh_place(self, place: Place) -> None:
+        """
+        Atualiza um local no índice (publicado -> entra, senão -> sai).
+        """
+        with self._lock:
+            # rebuild em andamento (inclusive a primeira carga) lê de novo
+            self._generation += 1
+            if self._built_at is None:
+                # índice ainda não carregado: será montado no primeiro uso
+                return
+            if is_published(place):
+                self._add_doc(place.id, self._fields_of(place))
+            else:
+                self._remove_doc(place.id)
+
+    # ---------- consulta ----------
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        """
+        Termo exato (fator 1) + termos que começam com ele (fator menor).
+        """
+        out = []
+        if token in self._postings:
+            out.append((token, 1.0))
+
+        if len(token) >= MIN_PREFIX_LEN:
+            i = bisect.bisect_right(self._vocab, token)
+            while i < len(self._vocab) and self._vocab[i].startswith(token):
+                out.append((self._vocab[i], PREFIX_FACTOR))
+                i += 1
+        return out
+
+    def _field_match(self, field: str, text: str) -> set[int] | None:
+        """
+        Locais em que TODOS os termos de `text` aparecem no campo (com prefixo).
+        None = texto sem termos (não filtra).
+        """
+        postings = self._field_postings[field]
+        result: set[int] | None = None
+
+        for tok in tokenize(text):
+            ids: set[int] = set(postings.get(tok, ()))
+            if len(tok) >= MIN_PREFIX_LEN:
+                i = bisect.bisect_right(self._vocab, tok)
+                while i < len(self._vocab) and self._vocab[i].startswith(tok):
+                    ids |= postings.get(self._vocab[i], set())
+                    i += 1
+
+            result = ids if result is None else (result & ids)
+            if not result:
+                return set()
+
+        return result
+
+    def search(
+        self,
+        query: str | None,
+        limit: int = 20,
+        required: dict[str, str | None] | None = None,
+    ) -> list[tuple[int, float]]:
+        """
+        Retorna [(place_id, score)] do mais relevante para o menos.
+
+        `required`: filtros por campo, ex {"tipo": "restaurante", "bairro": "vila olimpia"}
+        (todos os termos de cada filtro precisam aparecer naquele campo).
+        """
+        with self._lock:
+            allowed: set[int] | None = None
+            for field, text in (required or {}).items():
+                if not text:
+                    continue
+                ids = self._field_match(field, text)
+                if ids is None:
+                    continue
+                allowed = ids if allowed is None else (allowed & ids)
+                if not allowed:
+                    return []
+
+            tokens = list(dict.fromkeys(tokenize(query)))
+            total_docs = max(len(self._docs), 1)
+
+            scores: dict[int, float] | None = None
+            for tok in tokens:
+                tok_scores: dict[int, float] = {}
+                for term, factor in self._expand(tok):
+                    posting = self._postings[term]
+                    idf = math.log(1 + total_docs / len(posting))
+                    for pid, weight in posting.items():
+                        s = weight * idf * factor
+                        if s > tok_scores.get(pid, 0.0):
+                            tok_scores[pid] = s
+
+                if scores is None:
+                    scores = tok_scores
+                else:
+                    # AND: só mantém quem tem todos os termos
+                    scores = {pid: scores[pid] + s for pid, s in tok_scores.items() if pid in scores}
+
+                if not scores:
+                    return []
+
+            if scores is None:
+                # sem texto livre: só os filtros por campo
+                if allowed is None:
+                    return []
+                scores = {pid: 0.0 for pid in allowed}
+            elif allowed is not None:
+                scores = {pid: s for pid, s in scores.items() if pid in allowed}
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], -x[0]))
+        return ranked[:limit] if limit else ranked
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "places": len(self._docs),
+                "terms": len(self._postings),
+                "age_seconds": (time.monotonic() - self._built_at) if self._built_at else None,
+            }
+
+
+search_index = SearchIndex()
@@ -0,0 +1,86 @@
+# app/services/stored_files.py
+"""
+Contagem de referências dos arquivos guardados por hash (stored_files).
+
+- acquire(): mais um uso do arquivo (cria a linha no primeiro)
+- release(): um uso a menos; True quando ninguém mais usa -> o chamador
+  apaga o arquivo do disco DEPOIS do commit
+
+Arquivos antigos (nome uuid, de antes da contagem) não têm linha:
+release() devolve True, porque só quem apontava para ele o usava.
+"""
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.stored_file import StoredFile
+
+PHOTO = "photo"
+AVATAR = "avatar"
+
+
+def _increment(db: Session, namespace: str, filename: str) -> bool:
+    updated = (
+        db.query(StoredFile)
+        .filter(StoredFile.namespace == namespace, StoredFile.filename == filename)
+        .update({StoredFile.ref_count: StoredFile.ref_count + 1}, synchronize_session=False)
+    )
+    return bool(updated)
+
+
+def acquire(db: Session, namespace: str, filename: str, size_bytes: int) -> bool:
+    """
+    Registra mais uma referência. True se é a primeira (arquivo novo).
+    """
+    if _increment(db, namespace, filename):
+        return False
+
+    try:
+        # savepoint: se outro request criou a linha ao mesmo tempo, só incrementa
+        with db.begin_nested():
+            db.add(StoredFile(namespace=namespace, filename=filename, size_bytes=size_bytes, ref_count=1))
+        return True
+    except IntegrityError:
+        _increment(db, namespace, filename)
+        return False
+
+
+def release(db: Session, namespace: str, filename: str) -> bool:
+    """
+    Remove uma referência. True se o arquivo pode ser apagado do disco.
+    """
+    row = (
+        db.query(StoredFile)
+        .filter(StoredFile.namespace == namespace, StoredFile.filename == filename)
+        .with_for_update()
+        .first()
+    )
+    if row is None:
+        return True
+
+    row.ref_count -= 1
+    if row.ref_count <= 0:
+        db.delete(row)
+        return True
+    return False
+
+
+def storage_stats(db: Session) -> dict:
+    """
+    Por namespace: arquivos em disco, referências e bytes economizados.
+    """
+    rows = (
+        db.query(
+            StoredFile.namespace,
+            func.count(),
+            func.coalesce(func.sum(StoredFile.ref_count), 0),
+            func.coalesce(func.sum(StoredFile.size_bytes), 0),
+            func.coalesce(func.sum((StoredFile.ref_count - 1) * StoredFile.size_bytes), 0),
+        )
+        .group_by(StoredFile.namespace)
+        .all()
+    )
+    return {
+        ns: {"files": files, "references": refs, "bytes": size, "bytes_saved": saved}
+        for ns, files, refs, size, saved in rows
+    }
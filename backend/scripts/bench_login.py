@@ -0,0 +1,170 @@
+# backend/scripts/bench_login.py
+"""
+Benchmark de login sob concorrência.
+
+Dispara N logins simultâneos (POST /auth/login) e, ao mesmo tempo, faz
+GET /public/places/{id} em loop para ver se a rajada de hash de senha
+atrasa as rotas baratas. Mostra vazão e p50/p95/p99 das duas.
+
+A sonda é o detalhe de um local (sem cache em memória: toda chamada pega
+conexão do pool e passa pelo run_read). A listagem não serve: depois da
+primeira chamada é hit do listing_cache e nunca toca no banco.
+
+Rodar a partir de backend/ (precisa do .env / DATABASE_URL válido):
+    python -m scripts.bench_login
+    python -m scripts.bench_login --requests 500 --concurrency 64
+    python -m scripts.bench_login --baseline <commit>        # antes x depois
+    python -m scripts.bench_login --url http://127.0.0.1:8000  # API já no ar
+
+Cria (uma vez) o usuário bench-login@example.com com senha fixa.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+from scripts.bench_startup import BACKEND_DIR, _free_port, _status
+
+BENCH_USER = {"nome": "Bench", "email": "bench-login@example.com", "senha": "bench-login-123"}
+
+
+def _pct(values: list[float], p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def _summary(name: str, values: list[float]) -> str:
+    if not values:
+        return f"  {name:<20} sem amostras"
+    ms = [v * 1000 for v in values]
+    return (
+        f"  {name:<20} p50 {_pct(ms, 50):7.1f}ms  p95 {_pct(ms, 95):7.1f}ms  "
+        f"p99 {_pct(ms, 99):7.1f}ms  (n={len(ms)})"
+    )
+
+
+async def _run(base: str, total: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 4)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        r = await client.post("/auth/register", json=BENCH_USER)
+        if r.status_code not in (201, 409):
+            raise RuntimeError(f"cadastro do usuário de benchmark falhou: {r.status_code} {r.text[:200]}")
+
+        # local para a sonda (sem nenhum: o 404 também consulta o banco)
+        r = await client.get("/public/places", params={"limit": 1})
+        items = r.json() if r.status_code == 200 else []
+        probe_path = f"/public/places/{items[0]['id'] if items else 0}"
+
+        login_times: list[float] = []
+        probe_times: list[float] = []
+        codes: dict[int, int] = {}
+        done = asyncio.Event()
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one_login():
+            async with sem:
+                t = time.perf_counter()
+                r = await client.post("/auth/login", json={"email": BENCH_USER["email"], "senha": BENCH_USER["senha"]})
+                codes[r.status_code] = codes.get(r.status_code, 0) + 1
+                if r.status_code == 200:
+                    login_times.append(time.perf_counter() - t)
+
+        async def probe():
+            # rota barata em paralelo: mede o efeito da rajada nas outras rotas
+            while not done.is_set():
+                t = time.perf_counter()
+                await client.get(probe_path)
+                probe_times.append(time.perf_counter() - t)
+                await asyncio.sleep(0.02)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*[one_login() for _ in range(total)])
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {"elapsed": elapsed, "logins": login_times, "probe": probe_times, "codes": codes}
+
+
+def _boot(cwd: Path, timeout: float, extra_env: dict | None = None) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "AVATAR_WARMUP": "0", **(extra_env or {})}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn saiu com código {proc.returncode}: {proc.stderr.read().decode()[-500:]}")
+        if _status(base + "/health") == 200:
+            return proc, base
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"API não respondeu em {timeout:.0f}s")
+
+
+def run_suite(label: str, cwd: Path | None, url: str | None, total: int, concurrency: int, timeout: float) -> None:
+    proc = None
+    if url is None:
+        proc, url = _boot(cwd, timeout)
+    try:
+        res = asyncio.run(_run(url, total, concurrency))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    ok = len(res["logins"])
+    print(f"\n[{label}] {url}  ({total} logins, {concurrency} simultâneos)")
+    print(f"  vazão                {ok / res['elapsed']:.1f} logins/s em {res['elapsed']:.2f}s")
+    print(f"  status               {', '.join(f'{k}: {v}' for k, v in sorted(res['codes'].items()))}")
+    print(_summary("login", res["logins"]))
+    print(_summary("/public/places/{id}", res["probe"]))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Login sob concorrência (p50/p99)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--url", help="API já no ar (não sobe o uvicorn)")
+    parser.add_argument("--baseline", help="commit/branch para comparar (git worktree temporário)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    load_dotenv(BACKEND_DIR / ".env")
+
+    if args.baseline and not args.url:
+        tmp = Path(tempfile.mkdtemp(prefix="bench-login-"))
+        worktree = tmp / "tree"
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", str(worktree), args.baseline],
+            cwd=BACKEND_DIR, check=True, capture_output=True,
+        )
+        try:
+            run_suite(f"baseline {args.baseline}", worktree / "backend", None, args.requests, args.concurrency, args.timeout)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", str(worktree)], cwd=BACKEND_DIR)
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    run_suite("atual", BACKEND_DIR, args.url, args.requests, args.concurrency, args.timeout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
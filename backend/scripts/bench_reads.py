@@ -0,0 +1,131 @@
+# backend/scripts/bench_reads.py
+"""
+Benchmark das leituras públicas: sync (threadpool) x async (DB_ASYNC_READS=1).
+
+Para cada nível de concorrência (padrão 50/200/1000 clientes), cada
+cliente repete por --duration segundos:
+    GET /public/places?limit=20
+    GET /public/places/<id>
+    GET /favorites/ids            (cookie user_id)
+e o script mostra requests/s, p50/p99 e erros. O cache da listagem fica
+desligado (PLACES_CACHE_MAX_ENTRIES=0) para medir o banco, não a memória.
+
+Rodar a partir de backend/ (precisa do .env / DATABASE_URL válido, com
+ao menos um local publicado):
+    python -m scripts.bench_reads
+    python -m scripts.bench_reads --levels 50,200 --duration 5 --modes async
+    python -m scripts.bench_reads --url http://127.0.0.1:8000   # API já no ar
+
+Cria (uma vez) o usuário bench-login@example.com (o mesmo do bench_login).
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+from scripts.bench_login import BENCH_USER, _boot, _pct
+from scripts.bench_startup import BACKEND_DIR
+
+MODES = {"sync": {"DB_ASYNC_READS": "0"}, "async": {"DB_ASYNC_READS": "1"}}
+
+
+async def _prepare(base: str) -> tuple[int, dict]:
+    async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+        r = await client.post("/auth/register", json=BENCH_USER)
+        if r.status_code not in (201, 409):
+            raise RuntimeError(f"cadastro do usuário de benchmark falhou: {r.status_code} {r.text[:200]}")
+        r = await client.post("/session/login", params={"email": BENCH_USER["email"]})
+        r.raise_for_status()
+        cookies = {"user_id": str(r.json()["user_id"])}
+
+        places = (await client.get("/public/places", params={"limit": 1})).json()
+        if not places:
+            raise RuntimeError("nenhum local publicado no banco: o benchmark precisa de ao menos um")
+        return places[0]["id"], cookies
+
+
+async def _level(base: str, clients: int, duration: float, place_id: int, cookies: dict) -> dict:
+    paths = [
+        ("/public/places", {"limit": 20}),
+        (f"/public/places/{place_id}", None),
+        ("/favorites/ids", None),
+    ]
+    times: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits, cookies=cookies) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(i: int):
+            nonlocal errors
+            n = i
+            while time.perf_counter() < deadline:
+                path, params = paths[n % len(paths)]
+                n += 1
+                t = time.perf_counter()
+                try:
+                    r = await client.get(path, params=params)
+                    ok = r.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    times.append(time.perf_counter() - t)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(i) for i in range(clients)])
+        elapsed = time.perf_counter() - started
+
+    return {"rps": len(times) / elapsed, "times": times, "errors": errors}
+
+
+def run_mode(label: str, base: str, levels: list[int], duration: float) -> None:
+    place_id, cookies = asyncio.run(_prepare(base))
+    print(f"\n[{label}] {base}")
+    print(f"  {'clientes':>8}  {'req/s':>8}  {'p50':>9}  {'p99':>9}  erros")
+    for clients in levels:
+        res = asyncio.run(_level(base, clients, duration, place_id, cookies))
+        ms = [t * 1000 for t in res["times"]]
+        print(
+            f"  {clients:>8}  {res['rps']:>8.1f}  {_pct(ms, 50):>7.1f}ms  {_pct(ms, 99):>7.1f}ms  {res['errors']}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Leituras públicas: sync x async (req/s, p50/p99)")
+    parser.add_argument("--levels", default="50,200,1000", help="clientes simultâneos, separados por vírgula")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por nível")
+    parser.add_argument("--modes", default="sync,async")
+    parser.add_argument("--url", help="API já no ar (mede só ela, sem subir o uvicorn)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    load_dotenv(BACKEND_DIR / ".env")
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    if args.url:
+        run_mode("url", args.url, levels, args.duration)
+        return 0
+
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        env = {**MODES[mode], "PLACES_CACHE_MAX_ENTRIES": "0"}
+        proc, base = _boot(BACKEND_DIR, args.timeout, env)
+        try:
+            run_mode(mode, base, levels, args.duration)
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+# backend/scripts/bench_startup.py
+"""
+Benchmark de inicialização da API.
+
+Mede, em processos novos (sem cache de import):
+- import:  tempo de `import app.main` e quais módulos pesados foram carregados
+- boot:    subir o uvicorn até o primeiro 200 em GET /health
+           (time-to-first-request) e até GET /health/avatar ficar pronto
+
+Rodar a partir de backend/ (precisa do .env / DATABASE_URL válido para o boot):
+    python -m scripts.bench_startup
+    python -m scripts.bench_startup --runs 5 --baseline <commit>   # antes x depois
+
+--baseline monta o commit indicado num git worktree temporário e roda as
+mesmas medições nele, para comparar com a árvore atual.
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("cv2", "PIL", "nudenet", "onnxruntime")
+
+_IMPORT_PROBE = f"""
+import json, sys, time
+t = time.perf_counter()
+import app.main  # noqa: F401
+print(json.dumps({{
+    "seconds": time.perf_counter() - t,
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as r:
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def measure_import(cwd: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_boot(cwd: Path, timeout: float) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    first_request = avatar_ready = None
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn saiu com código {proc.returncode}: {proc.stderr.read().decode()[-500:]}")
+
+            if first_request is None and _status(base + "/health") == 200:
+                first_request = time.perf_counter() - started
+            if first_request is not None:
+                code = _status(base + "/health/avatar")
+                # 404: árvore sem /health/avatar -> modelo já sobe no import
+                if code in (200, 404):
+                    avatar_ready = first_request if code == 404 else time.perf_counter() - started
+                    break
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    return {"first_request": first_request, "avatar_ready": avatar_ready}
+
+
+def run_suite(label: str, cwd: Path, runs: int, boot: bool, timeout: float) -> None:
+    imports = [measure_import(cwd) for _ in range(runs)]
+    secs = [r["seconds"] for r in imports]
+    print(f"\n[{label}] {cwd}")
+    print(f"  import app.main     mediana {statistics.median(secs):.3f}s  (min {min(secs):.3f}s, max {max(secs):.3f}s)")
+    print(f"  módulos pesados     {', '.join(imports[-1]['heavy']) or 'nenhum'}")
+
+    if not boot:
+        return
+
+    boots = [measure_boot(cwd, timeout) for _ in range(runs)]
+    for key, name in (("first_request", "1º request /health"), ("avatar_ready", "avatar pronto")):
+        values = [b[key] for b in boots if b[key] is not None]
+        if values:
+            print(f"  {name:<19} mediana {statistics.median(values):.3f}s  (min {min(values):.3f}s, max {max(values):.3f}s)")
+        else:
+            print(f"  {name:<19} não ficou pronto em {timeout:.0f}s")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Tempo de inicialização da API")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--baseline", help="commit/branch para comparar (git worktree temporário)")
+    parser.add_argument("--no-boot", action="store_true", help="mede só o import (sem subir o uvicorn)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    # o worktree do baseline não tem .env: repassa as variáveis pelo ambiente
+    load_dotenv(BACKEND_DIR / ".env")
+    os.environ.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+
+    boot = not args.no_boot
+
+    if args.baseline:
+        tmp = Path(tempfile.mkdtemp(prefix="bench-startup-"))
+        worktree = tmp / "tree"
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", str(worktree), args.baseline],
+            cwd=BACKEND_DIR, check=True, capture_output=True,
+        )
+        try:
+            run_suite(f"baseline {args.baseline}", worktree / "backend", args.runs, boot, args.timeout)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", str(worktree)], cwd=BACKEND_DIR)
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    run_suite("atual", BACKEND_DIR, args.runs, boot, args.timeout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
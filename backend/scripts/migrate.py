@@ -0,0 +1,127 @@
+# backend/scripts/migrate.py
+"""
+Migrações do schema (app/db/migrations.py). A API não cria mais tabelas no
+startup: rode isto uma vez por deploy, antes de subir os workers.
+
+Rodar a partir de backend/:
+    python -m scripts.migrate            # = upgrade: aplica as pendentes
+    python -m scripts.migrate status     # versões aplicadas / pendentes
+    python -m scripts.migrate explain    # EXPLAIN das consultas quentes: cada
+                                         # uma precisa usar o seu índice
+                                         # (sai com 1 se alguma não usar)
+
+No Postgres o explain roda com enable_seqscan=off (tabela pequena sempre
+"prefere" seq scan; aqui a pergunta é se o índice serve para a consulta).
+"""
+import argparse
+import sys
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations import MIGRATIONS, applied_versions, pending, upgrade
+from app.db.session import engine
+from app.models.place import Place
+from app.models.place_accessibility import PlaceAccessibility
+from app.models.place_photo import PlacePhoto
+from app.models.review import Review
+
+# (descrição, consulta no formato das rotas, índice que ela tem que usar)
+HOT_QUERIES = [
+    (
+        "listagem pública (aprovados + verificados, mais novos primeiro)",
+        select(Place.id)
+        .where(Place.status == "APPROVED", Place.verified.is_(True))
+        .order_by(*[c.desc().nulls_first() for c in (Place.verified, Place.created_at, Place.id)])
+        .limit(20),
+        "ix_places_status_verified_created",
+    ),
+    (
+        "filtro por cidade (case-insensitive)",
+        select(Place.id).where(func.lower(Place.cidade) == func.lower("São Paulo")),
+        "ix_places_lower_cidade",
+    ),
+    (
+        "filtro por tipo (case-insensitive)",
+        select(Place.id).where(func.lower(Place.tipo) == func.lower("restaurante")),
+        "ix_places_lower_tipo",
+    ),
+    (
+        "recursos de acessibilidade da página",
+        select(PlaceAccessibility.place_id, PlaceAccessibility.feature_key)
+        .where(PlaceAccessibility.place_id.in_([1, 2, 3]))
+        .order_by(PlaceAccessibility.place_id, PlaceAccessibility.id),
+        "ix_place_accessibility_place_id",
+    ),
+    (
+        "fotos do local (capa primeiro)",
+        select(PlacePhoto.url)
+        .where(PlacePhoto.place_id == 1)
+        .order_by(PlacePhoto.is_cover.desc(), PlacePhoto.created_at.desc()),
+        "ix_place_photos_place_cover_created",
+    ),
+    (
+        "avaliações do local (mais recentes)",
+        select(Review.id).where(Review.place_id == 1).order_by(Review.created_at.desc()).limit(20),
+        "ix_reviews_place_created",
+    ),
+    (
+        "avaliação do usuário no local (upsert)",
+        select(Review.id).where(Review.place_id == 1, Review.user_id == 1),
+        "uq_reviews_place_user",
+    ),
+]
+
+
+def _plan(conn: Connection, stmt) -> str:
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        return "\n".join(row[0] for row in conn.execute(text("EXPLAIN " + sql)))
+    # SQLite (testes locais): "SEARCH places USING INDEX ix_..."
+    return "\n".join(str(row[-1]) for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql)))
+
+
+def explain() -> int:
+    failures = 0
+    with engine.connect() as conn:
+        for label, stmt, index in HOT_QUERIES:
+            with conn.begin():
+                plan = _plan(conn, stmt)
+            ok = index in plan
+            failures += not ok
+            print(f"{'OK ' if ok else 'ERRO'} {label}: {index}")
+            if not ok:
+                print("     " + plan.replace("\n", "\n     "))
+    return 1 if failures else 0
+
+
+def status() -> int:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    for m in MIGRATIONS:
+        print(f"{'[x]' if m.version in done else '[ ]'} {m.version:03d} {m.name}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Migrações do schema")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status", "explain"])
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        return status()
+    if args.command == "explain":
+        missing = pending(engine)
+        if missing:
+            print(f"{len(missing)} migração(ões) pendente(s): rode `python -m scripts.migrate` antes.")
+            return 1
+        return explain()
+
+    ran = upgrade(engine, on_step=lambda m: print(f"-> {m.version:03d} {m.name}"))
+    print(f"{len(ran)} migração(ões) aplicada(s)." if ran else "Schema já está na versão mais nova.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
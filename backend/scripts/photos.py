@@ -0,0 +1,59 @@
+# backend/scripts/photos.py
+"""
+Versões redimensionadas das fotos dos locais (place_photo_variants).
+
+Rodar a partir de backend/:
+    python -m scripts.photos variants         # gera só para fotos sem versões
+    python -m scripts.photos variants --all   # refaz todas
+"""
+import argparse
+import sys
+
+from app.db.migrations import require_current
+from app.db.session import SessionLocal, engine
+from app.models import place, place_photo, place_photo_variant  # noqa: F401
+from app.models.place_photo import PlacePhoto
+from app.models.place_photo_variant import PlacePhotoVariant
+from app.services.photo_variants import generate_variants
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Versões das fotos dos locais")
+    parser.add_argument("command", choices=["variants"])
+    parser.add_argument("--all", action="store_true", help="refaz também as que já têm versões")
+    args = parser.parse_args(argv)
+
+    # tabelas vêm das migrações (python -m scripts.migrate), não daqui
+    try:
+        require_current(engine)
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    db = SessionLocal()
+    try:
+        q = db.query(PlacePhoto).order_by(PlacePhoto.id)
+        if not args.all:
+            q = q.filter(~PlacePhoto.id.in_(db.query(PlacePhotoVariant.photo_id)))
+
+        done = skipped = failed = 0
+        for photo in q.all():
+            try:
+                if generate_variants(db, photo):
+                    db.commit()
+                    done += 1
+                else:
+                    skipped += 1
+            except Exception as e:
+                db.rollback()
+                failed += 1
+                print(f"- photo_id={photo.id}: {e!r}")
+
+        print(f"Versões geradas: {done} | sem arquivo local: {skipped} | falhas: {failed}")
+        return 1 if failed else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+# backend/scripts/ratings.py
+"""
+Manutenção do resumo de avaliações (place_rating_summaries).
+
+Rodar a partir de backend/:
+    python -m scripts.ratings rebuild   # backfill / reconstrução completa
+    python -m scripts.ratings check     # compara resumo x tabela reviews
+"""
+import argparse
+import sys
+
+from app.db.migrations import require_current
+from app.db.session import SessionLocal, engine
+from app.models import place, review, place_rating_summary  # noqa: F401
+from app.services.ratings import rebuild_summaries, check_summaries
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Resumo de avaliações dos locais")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    args = parser.parse_args(argv)
+
+    # tabelas vêm das migrações (python -m scripts.migrate), não daqui
+    try:
+        require_current(engine)
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            total = rebuild_summaries(db)
+            print(f"Resumo reconstruído para {total} local(is).")
+            return 0
+
+        problems = check_summaries(db)
+        if not problems:
+            print("OK: resumo consistente com a tabela reviews.")
+            return 0
+
+        print(f"{len(problems)} divergência(s):")
+        for p in problems:
+            print(f"- place_id={p['place_id']} esperado={p['expected']} atual={p['actual']}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
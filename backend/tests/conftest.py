@@ -0,0 +1,173 @@
+# backend/tests/conftest.py
+"""
+Testes rodam num SQLite temporário (sem Postgres, sem Ollama).
+
+As variáveis de ambiente precisam estar definidas ANTES do primeiro import
+do app: config.py lê tudo no import e o engine é criado uma vez só.
+
+Rodar a partir de backend/:
+    pip install -r requirements-dev.txt
+    python -m pytest -q
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+_TMP_DIR = tempfile.mkdtemp(prefix="venhajunto-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/api.sqlite"
+os.environ["DB_SSLMODE"] = ""
+os.environ["DB_ASYNC_READS"] = "0"
+os.environ["AVATAR_WARMUP"] = "0"
+os.environ["CHAT_SESSION_BACKEND"] = "memory"
+os.environ["ANSWER_CACHE_PATH"] = ""
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from app.db import migrations  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.models.place import Place  # noqa: E402
+from app.models.place_accessibility import PlaceAccessibility  # noqa: E402
+from app.models.place_photo import PlacePhoto  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.feature_index import feature_index  # noqa: E402
+from app.services.place_cache import listing_cache  # noqa: E402
+from app.services.principals import principal_cache  # noqa: E402
+from app.services.search_index import search_index  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    # mesmo caminho do deploy: banco vazio -> create_all + versões marcadas
+    migrations.upgrade(engine)
+    yield
+    engine.dispose()
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """
+    Cada teste começa com o banco vazio e sem nada em memória
+    (caches e índices são por processo).
+    """
+    yield
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    listing_cache.clear()
+    principal_cache.clear()
+    feature_index._built_at = None
+    search_index._built_at = None
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+# =====================================================
+# Dados
+# =====================================================
+@pytest.fixture
+def make_user(db):
+    counter = iter(range(1, 10_000))
+
+    def _make(role: str = "user", **fields) -> User:
+        n = next(counter)
+        user = User(
+            nome=fields.pop("nome", f"Usuário {n}"),
+            email=fields.pop("email", f"user{n}@teste.com"),
+            password_hash=fields.pop("password_hash", "x"),
+            role=role,
+            **fields,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+    return _make
+
+
+@pytest.fixture
+def make_places(db, make_user):
+    """
+    n locais publicados, cada um com 1 foto e 2 recursos, do mais antigo
+    para o mais novo (created_at distintos).
+    """
+
+    def _make(n: int, cidade: str = "Recife", tipo: str = "restaurante", **fields) -> list[Place]:
+        partner = make_user(role="partner")
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        places = []
+        for i in range(n):
+            place = Place(
+                partner_id=partner.id,
+                nome=f"Local {i}",
+                tipo=tipo,
+                cidade=cidade,
+                status="APPROVED",
+                verified=True,
+                created_at=base + timedelta(minutes=i),
+                **fields,
+            )
+            db.add(place)
+            db.flush()
+            db.add(PlacePhoto(place_id=place.id, url=f"/media/uploads/{place.id}.jpg", is_cover=True))
+            db.add(PlaceAccessibility(place_id=place.id, feature_key="rampa"))
+            db.add(PlaceAccessibility(place_id=place.id, feature_key="banheiro_adaptado"))
+            places.append(place)
+        db.commit()
+        return places
+
+    return _make
+
+
+# =====================================================
+# Contagem de SQL
+# =====================================================
+class StatementLog:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def _count_statements():
+    """
+    Conta os statements de todos os engines (after_cursor_execute), como o
+    query_stats faz em produção com REQUEST_TIMING=1.
+    """
+    log = StatementLog()
+    event.listen(Engine, "after_cursor_execute", log._on_execute)
+    try:
+        yield log
+    finally:
+        event.remove(Engine, "after_cursor_execute", log._on_execute)
+
+
+@pytest.fixture
+def count_statements():
+    return _count_statements
@@ -0,0 +1,124 @@
+# backend/tests/test_avatar.py
+"""
+Upload de avatar: moderação fake (sem NudeNet), arquivos num diretório
+temporário.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.core.security import create_access_token
+from app.db.session import RequestSession, engine, run_in_session
+from app.routes import avatar as avatar_routes
+from app.services import avatar_storage
+from app.services.avatar_moderation import moderation_pool
+
+JPEG = b"\xFF\xD8\xFF" + b"avatar"
+
+
+@pytest.fixture
+def avatar_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatar_storage, "AVATAR_DIR", tmp_path)
+    monkeypatch.setattr(avatar_routes, "AVATAR_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def moderation(monkeypatch):
+    seen = []
+
+    async def fake_run(raw: bytes):
+        # a rota espera aqui sem segurar conexão do pool
+        seen.append(engine.pool.checkedout())
+        cleaned = b"limpo:" + raw
+        return cleaned, {"128.webp": cleaned, "128.jpg": cleaned}, False
+
+    monkeypatch.setattr(moderation_pool, "run", fake_run)
+    return seen
+
+
+@pytest.fixture
+def logged_in(client, make_user):
+    user = make_user()
+    client.cookies.set("vj_access_token", create_access_token({"sub": user.email}))
+    return user
+
+
+def _upload(client, content: bytes = JPEG):
+    return client.post("/users/me/avatar", files={"file": ("a.jpg", content, "image/jpeg")})
+
+
+def test_upload_avatar(client, db, logged_in, avatar_dir, moderation):
+    held = engine.pool.checkedout()  # a sessão do próprio teste (fixture db)
+    r = _upload(client)
+    assert r.status_code == 200, r.text
+
+    db.refresh(logged_in)
+    name = logged_in.avatar_filename
+    assert r.json()["avatar_url"] == avatar_storage.avatar_url(name)
+    assert (avatar_dir / name).exists()
+    assert moderation == [held]
+
+
+def test_upload_avatar_requires_login(client, avatar_dir, moderation):
+    assert _upload(client).status_code == 401
+    assert moderation == []
+
+
+def _files(avatar_dir) -> set[str]:
+    return {p.name for p in avatar_dir.iterdir() if p.is_file()}
+
+
+@pytest.fixture
+def failing_commit():
+    def fail(session):
+        if not session.in_nested_transaction():  # savepoint do acquire passa
+            raise RuntimeError("commit falhou")
+
+    event.listen(RequestSession, "before_commit", fail)
+    yield
+    event.remove(RequestSession, "before_commit", fail)
+
+
+def test_failed_commit_leaves_no_avatar_files(client, logged_in, avatar_dir, moderation, request):
+    assert _upload(client).status_code == 200
+    before = _files(avatar_dir)
+
+    request.getfixturevalue("failing_commit")
+    with pytest.raises(RuntimeError):
+        _upload(client, JPEG + b"-nova")
+    # nem .part nem avatar novo sem referência; o antigo continua
+    assert _files(avatar_dir) == before
+
+    with pytest.raises(RuntimeError):
+        client.delete("/users/me/avatar")
+    assert _files(avatar_dir) == before
+
+
+def test_upload_during_delete_keeps_the_new_avatar(client, db, make_user, logged_in, avatar_dir, moderation, monkeypatch):
+    """
+    A apaga o avatar (última referência) e, entre o commit e a limpeza do
+    disco, B envia a mesma imagem: o arquivo de B tem que sobrar.
+    """
+    assert _upload(client).status_code == 200
+    db.refresh(logged_in)
+    name = logged_in.avatar_filename
+
+    other = make_user()
+    other_token = create_access_token({"sub": other.email})
+    cleaned = b"limpo:" + JPEG
+    invalidate = avatar_routes.invalidate_user
+    raced = []
+
+    def upload_in_between(user_id):
+        invalidate(user_id)
+        if not raced:
+            raced.append(user_id)
+            run_in_session(avatar_routes._save_avatar, other_token, cleaned, {"128.jpg": cleaned})
+
+    monkeypatch.setattr(avatar_routes, "invalidate_user", upload_in_between)
+    assert client.delete("/users/me/avatar").status_code == 200
+
+    db.refresh(other)
+    assert other.avatar_filename == name
+    assert (avatar_dir / name).exists()
+    assert not any(n.endswith(".deleting") for n in _files(avatar_dir))
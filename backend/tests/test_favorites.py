@@ -0,0 +1,29 @@
+# backend/tests/test_favorites.py
+"""
+Favoritos do usuário (cookie legado user_id).
+"""
+from app.models.favorite import Favorite
+
+
+def test_favorite_ids(client, db, make_user, make_places):
+    user = make_user()
+    places = make_places(3)
+    db.add_all([Favorite(user_id=user.id, place_id=p.id) for p in places[:2]])
+    db.commit()
+
+    client.cookies.set("user_id", str(user.id))
+    r = client.get("/favorites/ids")
+    assert r.status_code == 200
+    assert sorted(r.json()) == sorted(p.id for p in places[:2])
+
+
+def test_favorite_ids_requires_a_known_user(client, make_user):
+    assert client.get("/favorites/ids").status_code == 401
+
+    client.cookies.set("user_id", "abc")
+    assert client.get("/favorites/ids").status_code == 401
+
+    client.cookies.set("user_id", str(make_user().id + 1000))
+    r = client.get("/favorites/ids")
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Usuário não encontrado."
@@ -0,0 +1,121 @@
+# backend/tests/test_metrics.py
+"""
+Métricas Prometheus: rota GET /metrics (desligada por padrão) e o
+middleware HTTP (app/core/metrics.py).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core import metrics
+from app.routes import metrics as metrics_routes
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_metrics_route_is_off_by_default(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_token_is_checked(monkeypatch):
+    monkeypatch.setattr(metrics_routes, "METRICS_TOKEN", "segredo")
+
+    with pytest.raises(HTTPException) as e:
+        metrics_routes.metrics(authorization="Bearer outro")
+    assert e.value.status_code == 401
+    assert metrics_routes.metrics(authorization="Bearer segredo").status_code == 200
+
+
+@pytest.fixture
+def instrumented():
+    """
+    App mínimo só com o middleware (no app real ele depende de
+    METRICS_ENABLED, lido no import).
+    """
+    app = FastAPI()
+    app.add_middleware(metrics.PrometheusMetrics)
+
+    @app.get("/itens/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/quebra")
+    def quebra():
+        raise ValueError("falhou")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def _value(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(f"{metrics.NAMESPACE}_{name}", labels) or 0.0
+
+
+def _routes_seen() -> set[str]:
+    return {
+        sample.labels["route"]
+        for family in metrics.HTTP_REQUESTS.collect()
+        for sample in family.samples
+    }
+
+
+def test_middleware_labels_by_route_template(instrumented):
+    labels = {"method": "GET", "route": "/itens/{item_id}"}
+    requests_before = _value("http_requests_total", status="200", **labels)
+    latency_before = _value("http_request_duration_seconds_count", **labels)
+
+    assert instrumented.get("/itens/1").status_code == 200
+    assert instrumented.get("/itens/2").status_code == 200
+
+    # uma série só, pelo template: o id nunca vira label
+    assert _value("http_requests_total", status="200", **labels) == requests_before + 2
+    assert _value("http_request_duration_seconds_count", **labels) == latency_before + 2
+    assert not {"/itens/1", "/itens/2"} & _routes_seen()
+    assert _value("http_requests_in_progress", method="GET") == 0
+
+
+def test_middleware_status_and_unmatched_paths(instrumented):
+    not_found_before = _value("http_requests_total", method="GET", route="unmatched", status="404")
+    bad_before = _value("http_requests_total", method="GET", route="/itens/{item_id}", status="422")
+    errors_before = _value("http_exceptions_total", method="GET", route="/quebra", exception="ValueError")
+
+    assert instrumented.get("/nao-existe/123").status_code == 404
+    assert instrumented.get("/itens/abc").status_code == 422
+    assert instrumented.get("/quebra").status_code == 500
+
+    assert _value("http_requests_total", method="GET", route="unmatched", status="404") == not_found_before + 1
+    assert _value("http_requests_total", method="GET", route="/itens/{item_id}", status="422") == bad_before + 1
+    assert _value("http_exceptions_total", method="GET", route="/quebra", exception="ValueError") == errors_before + 1
+    assert "/nao-existe/123" not in _routes_seen()
+
+
+def test_multiprocess_render_sums_workers(tmp_path):
+    """
+    PROMETHEUS_MULTIPROC_DIR: cada processo grava no diretório e o render()
+    de qualquer um soma todos. Processos separados (o modo é decidido no
+    import do prometheus_client).
+    """
+    script = (
+        "import sys\n"
+        "from app.core import metrics\n"
+        "c = metrics.counter('teste_multiproc', 'teste')\n"
+        "c.inc(int(sys.argv[1]))\n"
+        "sys.stdout.write(metrics.render().decode())\n"
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    def worker(n: int) -> str:
+        out = subprocess.run(
+            [sys.executable, "-c", script, str(n)],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        return out.stdout
+
+    worker(2)
+    rendered = worker(3)
+    assert f"{metrics.NAMESPACE}_teste_multiproc_total 5.0" in rendered
@@ -0,0 +1,39 @@
+# backend/tests/test_migrations.py
+"""
+Migrações: consultas quentes usam os índices; API e scripts de
+manutenção não rodam com migração pendente.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import migrations
+from app.db.session import engine
+from scripts import photos as photos_script
+from scripts import ratings as ratings_script
+from scripts.migrate import HOT_QUERIES, _plan
+
+
+@pytest.mark.parametrize("label, stmt, index", HOT_QUERIES, ids=[index for _, _, index in HOT_QUERIES])
+def test_hot_query_uses_its_index(label, stmt, index):
+    # SQLite: EXPLAIN QUERY PLAN -> "SEARCH places USING INDEX ix_..."
+    with engine.connect() as conn:
+        plan = _plan(conn, stmt)
+    assert index in plan, f"{label}:\n{plan}"
+
+
+def test_startup_fails_with_pending_migrations(monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(migrations, "pending", lambda _engine: migrations.MIGRATIONS[-1:])
+    with pytest.raises(RuntimeError, match="pendente"):
+        with TestClient(app):
+            pass
+
+
+@pytest.mark.parametrize("script, argv", [(ratings_script, ["check"]), (photos_script, ["variants"])], ids=["ratings", "photos"])
+def test_maintenance_scripts_require_migrations(script, argv, monkeypatch, capsys):
+    assert script.main(argv) == 0
+
+    monkeypatch.setattr(migrations, "pending", lambda _engine: migrations.MIGRATIONS[-1:])
+    assert script.main(argv) == 1
+    assert "scripts.migrate" in capsys.readouterr().out
@@ -0,0 +1,91 @@
+# backend/tests/test_partner_photos.py
+"""
+Fotos do local: arquivo por hash (stored_files) e versão do detalhe (ETag).
+"""
+import pytest
+
+from app.core.config import PHOTO_BATCH_MAX_FILES
+from app.core.security import create_access_token
+from app.models.partner_profile import PartnerProfile
+from app.routes import partner as partner_routes
+from app.services import photo_variants
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(partner_routes, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(photo_variants, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(photo_variants, "VARIANT_DIR", tmp_path / "variants")
+    # versões card/detail/full ficam fora destes testes
+    monkeypatch.setattr(photo_variants.photo_pipeline, "enqueue", lambda photo_id: None)
+    return tmp_path
+
+
+@pytest.fixture
+def partner_place(client, db, make_places):
+    place = make_places(1)[0]
+    db.add(PartnerProfile(user_id=place.partner_id, empresa_nome="Empresa"))
+    db.commit()
+    client.cookies.set("vj_partner_token", create_access_token({"uid": str(place.partner_id), "role": "partner"}))
+    return place
+
+
+def _upload(client, place_id: int, content: bytes) -> dict:
+    r = client.post(
+        f"/partner/places/{place_id}/photos",
+        files={"file": ("foto.jpg", content, "image/jpeg")},
+    )
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def test_shared_file_is_removed_only_with_its_last_photo(client, partner_place, upload_dir):
+    first = _upload(client, partner_place.id, b"mesmo conteudo")
+    second = _upload(client, partner_place.id, b"mesmo conteudo")
+    assert first["url"] == second["url"]
+
+    files = [p for p in upload_dir.iterdir() if p.is_file()]
+    assert len(files) == 1  # nenhum .part sobrando
+
+    client.delete(f"/partner/places/{partner_place.id}/photos/{first['photo_id']}")
+    assert files[0].exists()
+
+    client.delete(f"/partner/places/{partner_place.id}/photos/{second['photo_id']}")
+    assert not any(upload_dir.iterdir() if upload_dir.exists() else [])
+
+
+def test_failed_commit_leaves_no_file_behind(client, db, partner_place, upload_dir, monkeypatch):
+    def broken_acquire(*args, **kwargs):
+        raise RuntimeError("banco fora")
+
+    monkeypatch.setattr(partner_routes, "acquire", broken_acquire)
+    with pytest.raises(RuntimeError):
+        client.post(
+            f"/partner/places/{partner_place.id}/photos",
+            files={"file": ("foto.jpg", b"conteudo", "image/jpeg")},
+        )
+    assert [p for p in upload_dir.iterdir() if p.is_file()] == []
+
+
+def test_deleting_an_old_photo_changes_the_details_etag(client, partner_place, upload_dir):
+    old = _upload(client, partner_place.id, b"foto antiga")
+    _upload(client, partner_place.id, b"foto nova")
+    etag = client.get(f"/public/places/{partner_place.id}").headers["etag"]
+
+    client.delete(f"/partner/places/{partner_place.id}/photos/{old['photo_id']}")
+
+    r = client.get(f"/public/places/{partner_place.id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_batch_upload_and_file_limit(client, partner_place, upload_dir):
+    files = [("files", (f"{i}.jpg", f"foto {i}".encode(), "image/jpeg")) for i in range(3)]
+    r = client.post(f"/partner/places/{partner_place.id}/photos/batch", files=files, data={"cover_index": "1"})
+    assert r.status_code == 201, r.text
+    assert r.json()["created"] == 3
+    assert [res["is_cover"] for res in r.json()["results"]] == [False, True, False]
+
+    too_many = [("files", (f"{i}.jpg", b"x", "image/jpeg")) for i in range(PHOTO_BATCH_MAX_FILES + 1)]
+    r = client.post(f"/partner/places/{partner_place.id}/photos/batch", files=too_many)
+    assert r.status_code == 400
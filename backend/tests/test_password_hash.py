@@ -0,0 +1,114 @@
+# backend/tests/test_password_hash.py
+"""
+Hash de senha (PasswordHashPool) e as rotas de login/cadastro.
+"""
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from passlib.hash import pbkdf2_sha256
+
+from app.core import security
+from app.core.config import DB_MAX_OVERFLOW, DB_POOL_SIZE, PASSWORD_HASH_ROUNDS
+from app.core.security import PasswordHashPool, hash_password
+from app.db.session import engine
+
+
+def test_pool_rejects_above_max_in_flight():
+    pool = PasswordHashPool(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        busy = [asyncio.create_task(pool._run(release.wait)) for _ in range(pool.max_in_flight)]
+        await asyncio.sleep(0)  # as duas entram (1 rodando + 1 na fila)
+        try:
+            with pytest.raises(HTTPException) as e:
+                await pool.hash("senha")
+            assert e.value.status_code == 503
+            assert e.value.headers["Retry-After"]
+        finally:
+            release.set()
+            await asyncio.gather(*busy)
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert pool.busy_rejections == 1
+    assert pool.snapshot()["in_flight"] == 0
+
+
+def test_pool_rehashes_when_rounds_change():
+    pool = PasswordHashPool(workers=1)
+    old = pbkdf2_sha256.using(rounds=1000).hash("senha")
+    try:
+        ok, new_hash = asyncio.run(pool.verify("senha", old))
+        assert ok
+        assert pbkdf2_sha256.from_string(new_hash).rounds == PASSWORD_HASH_ROUNDS
+
+        # hash já com os rounds atuais: nada a refazer
+        assert asyncio.run(pool.verify("senha", new_hash)) == (True, None)
+        assert asyncio.run(pool.verify("errada", new_hash)) == (False, None)
+    finally:
+        pool.shutdown()
+    assert pool.rehashes == 1
+
+
+def test_login_saves_the_rehash(client, db, make_user):
+    user = make_user(password_hash=pbkdf2_sha256.using(rounds=1000).hash("senha-123"))
+
+    r = client.post("/auth/login", json={"email": user.email, "senha": "senha-123"})
+    assert r.status_code == 200, r.text
+
+    db.refresh(user)
+    assert pbkdf2_sha256.from_string(user.password_hash).rounds == PASSWORD_HASH_ROUNDS
+
+
+def test_public_read_gets_a_connection_while_logins_wait_for_the_hash(db, make_user, make_places, monkeypatch):
+    """
+    Logins esperando o hash não seguram conexão: com o pool inteiro em
+    logins na fila, uma leitura pública ainda é atendida.
+    """
+    from app.main import app
+
+    user = make_user(password_hash=hash_password("senha-123"))
+    place = make_places(1)[0]
+    email, place_id = user.email, place.id
+    db.close()  # devolve a conexão da fixture
+
+    logins = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    gate = asyncio.Event()
+    waiting = []
+
+    async def queued_verify(password, hashed):
+        waiting.append(1)
+        await gate.wait()
+        return True, None
+
+    monkeypatch.setattr(security.password_pool, "verify", queued_verify)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            tasks = [
+                asyncio.create_task(c.post("/auth/login", json={"email": email, "senha": "senha-123"}))
+                for _ in range(logins)
+            ]
+            try:
+                for _ in range(500):
+                    if len(waiting) == logins:
+                        break
+                    await asyncio.sleep(0.01)
+                assert len(waiting) == logins
+                assert engine.pool.checkedout() == 0
+
+                r = await asyncio.wait_for(c.get(f"/public/places/{place_id}"), timeout=5)
+                assert r.status_code == 200
+            finally:
+                gate.set()
+                results = await asyncio.gather(*tasks)
+        assert [r.status_code for r in results] == [200] * logins
+
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+# backend/tests/test_place_cache.py
+"""
+Chave do cache da listagem: mesma normalização dos filtros da rota.
+"""
+from app.services.place_cache import listing_key
+
+
+def test_cidade_todos_is_a_real_filter_not_a_wildcard(client, make_places):
+    make_places(2, cidade="Recife")
+
+    # cidade=todos filtra por uma cidade chamada "todos" (nenhum local)...
+    r = client.get("/public/places", params={"cidade": "todos"})
+    assert r.status_code == 200
+    assert r.json() == []
+
+    # ...e não pode envenenar o cache da listagem sem filtro
+    r = client.get("/public/places")
+    assert len(r.json()) == 2
+
+
+def test_tipo_todos_is_the_same_page_as_no_filter(client, make_places):
+    make_places(2)
+    assert listing_key(None, "Todos", True, None, 50) == listing_key(None, None, True, None, 50)
+    assert listing_key("todos", None, True, None, 50) != listing_key(None, None, True, None, 50)
+
+    r = client.get("/public/places", params={"tipo": "todos"})
+    assert len(r.json()) == 2
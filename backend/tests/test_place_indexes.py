@@ -0,0 +1,70 @@
+# backend/tests/test_place_indexes.py
+"""
+Índices em memória (recursos e busca): rebuild x refresh_place.
+"""
+import time
+
+import pytest
+
+from app.services.feature_index import feature_index
+from app.services.search_index import search_index
+
+
+def _refresh_during_first_load(monkeypatch, index, db, on_load):
+    """
+    Na primeira leitura do rebuild, o local muda no banco e refresh_place
+    roda antes da troca do índice (aprovação concorrente).
+    """
+    load = index._load
+    calls = []
+
+    def racing_load(session):
+        rows = load(session)
+        calls.append(1)
+        if len(calls) == 1:
+            on_load()
+        return rows
+
+    monkeypatch.setattr(index, "_load", racing_load)
+    index.rebuild(db)
+    return len(calls)
+
+
+def test_feature_rebuild_keeps_a_concurrent_refresh(db, make_places, monkeypatch):
+    place = make_places(1)[0]
+    feature_index.rebuild(db)
+
+    def reject():
+        place.status = "REJECTED"
+        db.commit()
+        feature_index.refresh_place(db, place)
+
+    assert _refresh_during_first_load(monkeypatch, feature_index, db, reject) == 2
+    assert feature_index.match(["rampa"]) == []
+
+
+def test_search_rebuild_keeps_a_concurrent_refresh(db, make_places, monkeypatch):
+    place = make_places(1)[0]
+    search_index.rebuild(db)
+
+    def rename():
+        place.nome = "Cantina Nova"
+        db.commit()
+        search_index.refresh_place(place)
+
+    assert _refresh_during_first_load(monkeypatch, search_index, db, rename) == 2
+    assert [pid for pid, _ in search_index.search("cantina")] == [place.id]
+
+
+@pytest.mark.parametrize("index", [feature_index, search_index], ids=["feature", "search"])
+def test_only_one_rebuild_at_a_time(db, make_places, monkeypatch, index):
+    make_places(1)
+    index.rebuild(db)
+    index._built_at = time.monotonic() - index.max_age_seconds - 1  # vencido
+
+    def unexpected(_db):
+        raise AssertionError("rebuild em dobro")
+
+    monkeypatch.setattr(index, "rebuild", unexpected)
+    with index._rebuild_lock:  # outra request reconstruindo
+        index.ensure_fresh(db)
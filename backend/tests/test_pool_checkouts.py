@@ -0,0 +1,47 @@
+# backend/tests/test_pool_checkouts.py
+"""
+Conexões do pool por request (RequestSession: no máximo 1 checkout).
+"""
+import pytest
+
+from app.core.security import create_access_token
+from app.db.pool import pool_stats
+
+
+@pytest.fixture
+def checkouts():
+    def _count(call) -> int:
+        before = pool_stats.checkouts
+        r = call()
+        assert r.status_code < 400, r.text
+        return pool_stats.checkouts - before
+
+    return _count
+
+
+def test_session_login(client, make_user, checkouts):
+    user = make_user()
+    assert checkouts(lambda: client.post("/session/login", params={"email": user.email})) == 1
+
+
+def test_favorites(client, make_user, make_places, checkouts):
+    user = make_user()
+    place = make_places(1)[0]
+    client.cookies.set("user_id", str(user.id))
+
+    # usuário fora do cache: usuário + favoritos na mesma conexão
+    assert checkouts(lambda: client.get("/favorites/ids")) == 1
+    assert checkouts(lambda: client.post(f"/favorites/{place.id}")) == 1
+    assert checkouts(lambda: client.get("/favorites/")) == 1
+    assert checkouts(lambda: client.delete(f"/favorites/{place.id}")) == 1
+
+
+def test_users_me(client, make_user, checkouts):
+    user = make_user()
+    client.cookies.set("vj_access_token", create_access_token({"sub": user.email}))
+
+    assert checkouts(lambda: client.get("/users/me")) == 1
+    # usuário no cache de principals: nenhuma query
+    assert checkouts(lambda: client.get("/users/me")) == 0
+    # commit + refresh continuam na conexão da sessão
+    assert checkouts(lambda: client.put("/users/me", json={"nome": "Novo nome"})) == 1
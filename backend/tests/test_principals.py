@@ -0,0 +1,45 @@
+# backend/tests/test_principals.py
+"""
+Cache de quem está logado (app/services/principals.py).
+"""
+from app.core.security import create_access_token
+from app.models.partner_profile import PartnerProfile
+from app.services.principals import principal_cache, resolve_token
+
+
+def test_admin_with_stale_uid_falls_back_to_email(client, make_user):
+    admin = make_user(role="admin")
+    token = create_access_token({"uid": str(admin.id + 1000), "sub": admin.email, "role": "admin"})
+    client.cookies.set("vj_access_token", token)
+
+    r = client.get("/admin/ping")
+    assert r.status_code == 200, r.text
+
+
+def test_partner_profile_does_not_mutate_the_cached_entry(db, make_user):
+    user = make_user(role="partner")
+    db.add(PartnerProfile(user_id=user.id, empresa_nome="Empresa"))
+    db.commit()
+    token = create_access_token({"uid": str(user.id), "role": "partner"})
+
+    resolve_token(token, db)
+    (cached,) = principal_cache.values()
+    assert "profile" not in cached
+
+    profile = resolve_token(token, db).partner_profile()
+    assert profile.empresa_nome == "Empresa"
+    assert "profile" not in cached  # dict antigo intacto
+
+    (updated,) = principal_cache.values()
+    assert updated["profile"]["empresa_nome"] == "Empresa"
+    assert resolve_token(token, db).partner_profile().id == profile.id
+
+
+def test_profile_is_not_cached_after_invalidation(db, make_user):
+    user = make_user(role="partner")
+    token = create_access_token({"uid": str(user.id), "role": "partner"})
+    principal = resolve_token(token, db)
+
+    principal_cache.clear()  # ex: invalidate_user no meio da request
+    assert principal.partner_profile() is None
+    assert principal_cache.values() == []
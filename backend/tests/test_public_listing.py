@@ -0,0 +1,81 @@
+# backend/tests/test_public_listing.py
+"""
+Listagem pública (GET /public/places): nº fixo de queries por página.
+"""
+from app.models.place_accessibility import PlaceAccessibility
+from app.services.place_cache import listing_cache
+
+
+def _listing_statements(client, count_statements, **params) -> int:
+    with count_statements() as log:
+        r = client.get("/public/places", params=params)
+    assert r.status_code == 200
+    return len(log)
+
+
+def test_listing_query_count_does_not_grow_with_page_size(client, make_places, count_statements):
+    make_places(3)
+    small = _listing_statements(client, count_statements)
+
+    make_places(30, cidade="Olinda")
+    listing_cache.clear()  # inserts direto no banco não passam pelas rotas
+    big = _listing_statements(client, count_statements)
+
+    # consultas em lote: 30 locais custam o mesmo que 3 (sem N+1)
+    assert big == small
+    assert small <= 6
+
+
+def test_listing_cache_hit_does_not_touch_the_database(client, make_places, count_statements):
+    make_places(3)
+    assert _listing_statements(client, count_statements, cidade="Recife") > 0
+    assert _listing_statements(client, count_statements, cidade="Recife") == 0
+
+
+def test_cursor_pages_cover_places_without_created_at(client, db, make_places):
+    places = make_places(5)
+    for p in places[:3]:
+        p.created_at = None  # locais antigos, de antes da coluna ter default
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/public/places", params=params)
+        assert r.status_code == 200
+        seen += [item["id"] for item in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(p.id for p in places)
+    assert len(seen) == len(set(seen))
+
+
+def test_listing_etag_changes_with_accessibility_features(client, db, make_places):
+    place = make_places(2)[0]
+    etag = client.get("/public/places").headers["etag"]
+
+    listing_cache.clear()
+    assert client.get("/public/places", headers={"If-None-Match": etag}).status_code == 304
+
+    db.add(PlaceAccessibility(place_id=place.id, feature_key="elevador"))
+    db.commit()
+    listing_cache.clear()
+    r = client.get("/public/places", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_listing_filters_by_accessibility_features(client, db, make_places):
+    with_elevator = make_places(2)
+    make_places(3, cidade="Olinda")
+    for place in with_elevator:
+        db.add(PlaceAccessibility(place_id=place.id, feature_key="elevador"))
+    db.commit()
+
+    r = client.get("/public/places", params={"features": "rampa,elevador"})
+    assert sorted(item["id"] for item in r.json()) == sorted(p.id for p in with_elevator)
+
+    r = client.get("/public/places", params={"features": "elevador,piso_tatil", "features_mode": "any"})
+    assert len(r.json()) == 2
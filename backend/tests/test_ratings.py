@@ -0,0 +1,23 @@
+# backend/tests/test_ratings.py
+"""
+Resumo de avaliações (place_rating_summaries) mantido pelas escritas.
+"""
+from app.models.review import Review
+from app.services.ratings import apply_review_change, check_summaries
+
+
+def test_legacy_rating_outside_1_to_5_does_not_break_the_summary(db, make_places, make_user):
+    place = make_places(1)[0]
+    user = make_user()
+
+    # review antiga com nota 0 (de antes da validação 1–5)
+    review = Review(place_id=place.id, user_id=user.id, rating=0, comment="antiga")
+    db.add(review)
+    apply_review_change(db, place.id, None, 0)
+    db.commit()
+
+    review.rating = 4
+    apply_review_change(db, place.id, 0, 4)
+    db.commit()
+
+    assert check_summaries(db) == []
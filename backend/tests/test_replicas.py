@@ -0,0 +1,54 @@
+# backend/tests/test_replicas.py
+"""
+Leituras em réplica não alimentam o estado do processo (caches e índices).
+
+A "réplica" é um segundo SQLite com o mesmo schema e SEM os dados: o que
+vier dela aparece como lista vazia.
+"""
+import pytest
+
+from app.db import migrations, reads
+from app.db.replicas import ReplicaSet
+from app.services.feature_index import feature_index
+from app.services.place_cache import listing_cache
+from app.services.search_index import search_index
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    replicas = ReplicaSet([f"sqlite:///{tmp_path}/replica.sqlite"])
+    migrations.upgrade(replicas.replicas[0].engine)
+    monkeypatch.setattr(reads, "replica_set", replicas)
+    yield replicas.replicas[0]
+    replicas.replicas[0].engine.dispose()
+
+
+def test_replica_listing_is_not_cached(client, make_places, replica):
+    make_places(2)
+
+    r = client.get("/public/places")
+    assert r.status_code == 200
+    assert r.json() == []  # veio da réplica (vazia)
+    assert replica.reads == 1
+    assert listing_cache.values() == []
+
+
+def test_stale_feature_index_is_rebuilt_from_the_primary(client, make_places, replica):
+    places = make_places(2)
+
+    r = client.get("/public/places", params={"features": "rampa"})
+    assert r.status_code == 200
+    assert sorted(p["id"] for p in r.json()) == sorted(p.id for p in places)
+    assert feature_index._built_at is not None
+    assert feature_index.match(["rampa"]) != []
+    # refeita no primário: essa resposta pode ir para o cache
+    assert len(listing_cache.values()) == 1
+
+
+def test_stale_search_index_is_rebuilt_from_the_primary(client, make_places, replica):
+    make_places(2)
+
+    r = client.get("/public/search", params={"q": "restaurante"})
+    assert r.status_code == 200
+    assert len(r.json()) == 2
+    assert search_index._built_at is not None
@@ -1,5 +1,5 @@
 // frontend/public/js/admin-dashboard.js
-import { apiFetch, requireAdmin } from "./auth.js";
+import { apiFetch, apiFetchAllPages, requireAdmin } from "./auth.js";
 
 (function () {
   const listEl = document.getElementById("list");
@@ -46,7 +46,7 @@ import { apiFetch, requireAdmin } from "./auth.js";
   }
 
   async function apiListPlaces(status) {
-    return apiFetch(`/admin/places?status=${encodeURIComponent(status)}`);
+    return apiFetchAllPages(`/admin/places?status=${encodeURIComponent(status)}`);
   }
 
   async function apiApprove(placeId) {
@@ -4,6 +4,7 @@ const API_BASE =
   window.location.hostname === "localhost"
     ? "http://127.0.0.1:8000"                  // DEV (local)
     : "https://venha-junto-h54n.onrender.com"; // PROD (Render)
+const PAGE_SIZE = 100; // máximo aceito pelo backend por página
 /**
  * ✅ Converte qualquer tipo de erro em mensagem legível (string)
  * - suporta FastAPI: { detail: "..." } ou { detail: [...] } ou { detail: {..} }
@@ -53,7 +54,7 @@ function extractErrorMessage(data, resStatus) {
  * - SEM Bearer token
  * - COM cookies HTTPOnly (credentials: "include")
  */
-async function request(path, { method = "GET", body = null } = {}) {
+async function requestPage(path, { method = "GET", body = null } = {}) {
   const headers = { Accept: "application/json" };
   if (body) headers["Content-Type"] = "application/json";
 
@@ -77,7 +78,29 @@ async function request(path, { method = "GET", body = null } = {}) {
     throw new Error(msg);
   }
 
-  return data;
+  return { data, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+async function request(path, opts = {}) {
+  return (await requestPage(path, opts)).data;
+}
+
+/**
+ * Listagem paginada por cursor: segue o header X-Next-Cursor
+ * e devolve os itens de todas as páginas
+ */
+async function requestAllPages(path, opts = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (cursor) params.set("cursor", cursor);
+    const sep = path.includes("?") ? "&" : "?";
+    const page = await requestPage(`${path}${sep}${params}`, opts);
+    if (Array.isArray(page.data)) items.push(...page.data);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
 }
 
 /* =========================
@@ -141,7 +164,7 @@ window.apiAdminPing = () =>
   request("/admin/ping", { method: "GET" });
 
 window.apiAdminListPlaces = (status = "PENDING_REVIEW") =>
-  request(`/admin/places?status=${encodeURIComponent(status)}`, { method: "GET" });
+  requestAllPages(`/admin/places?status=${encodeURIComponent(status)}`, { method: "GET" });
 
 window.apiAdminApprovePlace = (placeId) =>
   request(`/admin/places/${placeId}/approve`, { method: "POST" });
@@ -157,7 +180,7 @@ window.apiPublicPlaces = ({ cidade = null, tipo = null, verified_first = true }
   if (cidade) qs.set("cidade", cidade);
   if (tipo && tipo !== "Todos") qs.set("tipo", tipo);
   qs.set("verified_first", String(verified_first));
-  return request(`/public/places?${qs.toString()}`, { method: "GET" });
+  return requestAllPages(`/public/places?${qs.toString()}`, { method: "GET" });
 };
 
 window.apiPublicPlaceDetails = (placeId) =>
@@ -1,10 +1,11 @@
 // frontend/public/js/auth.js
 const API_BASE = "http://127.0.0.1:8000";
+const PAGE_SIZE = 100; // máximo aceito pelo backend por página
 
 /**
  * Faz fetch com cookie HttpOnly (credentials: "include")
  */
-export async function apiFetch(path, opts = {}) {
+async function apiRequest(path, opts = {}) {
   const res = await fetch(`${API_BASE}${path}`, {
     ...opts,
     credentials: "include",
@@ -29,7 +30,29 @@ export async function apiFetch(path, opts = {}) {
     throw new Error(detail);
   }
 
-  return data;
+  return { data, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+export async function apiFetch(path, opts = {}) {
+  return (await apiRequest(path, opts)).data;
+}
+
+/**
+ * Listagem paginada por cursor: segue o header X-Next-Cursor
+ * e devolve os itens de todas as páginas
+ */
+export async function apiFetchAllPages(path, opts = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (cursor) params.set("cursor", cursor);
+    const sep = path.includes("?") ? "&" : "?";
+    const page = await apiRequest(`${path}${sep}${params}`, opts);
+    if (Array.isArray(page.data)) items.push(...page.data);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
 }
 
 /**
@@ -6,6 +6,7 @@
 
 (function () {
   const API_BASE = window.VJ_API_BASE || "http://127.0.0.1:8000";
+  const PAGE_SIZE = 100; // máximo aceito pelo backend por página
 
   function qs(id) {
     return document.getElementById(id);
@@ -52,7 +53,7 @@
   /* =========================
      HTTP helpers
   ========================= */
-  async function apiFetch(path, opts = {}) {
+  async function apiRequest(path, opts = {}) {
     const res = await fetch(`${API_BASE}${path}`, {
       ...opts,
       credentials: "include",
@@ -77,7 +78,26 @@
           : `HTTP ${res.status}`;
       throw new Error(detail);
     }
-    return data;
+    return { data, nextCursor: res.headers.get("X-Next-Cursor") };
+  }
+
+  async function apiFetch(path, opts = {}) {
+    return (await apiRequest(path, opts)).data;
+  }
+
+  // ✅ listagens paginadas (X-Next-Cursor): busca as páginas até a última
+  async function apiFetchAllPages(path, opts = {}) {
+    const items = [];
+    let cursor = null;
+    do {
+      const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+      if (cursor) params.set("cursor", cursor);
+      const sep = path.includes("?") ? "&" : "?";
+      const page = await apiRequest(`${path}${sep}${params}`, opts);
+      if (Array.isArray(page.data)) items.push(...page.data);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return items;
   }
 
   async function apiMe() {
@@ -93,7 +113,7 @@
 
     const q = params.toString();
     const url = q ? `/public/places?${q}` : "/public/places";
-    return apiFetch(url);
+    return apiFetchAllPages(url);
   }
 
   /* =========================
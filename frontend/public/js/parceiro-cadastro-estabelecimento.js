@@ -350,17 +350,19 @@
     const files = Array.from(fotos.files || []);
     if (files.length === 0) return;
 
-    for (let i = 0; i < files.length; i++) {
-      const f = files[i];
+    // ✅ todas as fotos num request só (lote)
+    const fd = new FormData();
+    files.forEach((f) => fd.append("files", f));
 
-      const fd = new FormData();
-      fd.append("file", f);
+    // regra: primeira foto vira capa
+    fd.append("cover_index", "0");
 
-      // regra: primeira foto vira capa
-      const isCover = i === 0;
-      fd.append("is_cover", String(isCover)); // FastAPI aceita "true"/"false" ou "True"/"False" em geral
+    const data = await apiFetchForm(`/partner/places/${placeId}/photos/batch`, fd);
 
-      await apiFetchForm(`/partner/places/${placeId}/photos`, fd);
+    const failed = (data?.results || []).filter((r) => !r.ok);
+    if (failed.length) {
+      const msg = failed.map((r) => `${r.filename}: ${r.error}`).join("\n");
+      throw new Error(`Algumas fotos não foram enviadas:\n${msg}`);
     }
   }
 
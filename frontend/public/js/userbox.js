@@ -44,22 +44,18 @@
     return { img, fallback, avatar };
   }
 
-  async function loadAvatarIntoUserBox() {
+  async function loadAvatarIntoUserBox(user) {
     const els = ensureAvatarElements();
     if (!els) return;
 
     const { img, fallback } = els;
 
-    const url = "http://127.0.0.1:8000/users/me/avatar?t=" + Date.now();
-
-    try {
-      const r = await fetch(url, { credentials: "include" });
-      if (!r.ok) throw new Error("Sem avatar");
-
-      img.src = url;
+    // ✅ URL imutável (muda a cada upload): o navegador pode guardar em cache
+    if (user && user.avatar_url) {
+      img.src = "http://127.0.0.1:8000" + user.avatar_url;
       img.style.display = "block";
       fallback.style.display = "none";
-    } catch (e) {
+    } else {
       img.src = "";
       img.style.display = "none";
       fallback.style.display = "inline";
@@ -82,7 +78,7 @@
       userName.textContent = user.nome || "Usuário";
       userEmail.textContent = user.email || "";
 
-      await loadAvatarIntoUserBox();
+      await loadAvatarIntoUserBox(user);
 
       userBox.title = "Abrir perfil";
       userBox.onclick = () => {